@@ -1,12 +1,35 @@
 # Import FastAPI framework and middleware components
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 # Import custom route modules for authentication and products
-from app.routes import auth, product
+from app.routes import admin, auth, live, metrics, product, upload
+from app.core.log import LogContextMiddleware, setup_logging, shutdown_logging
+from app.core.openapi import install_component_schemas
+from app.core.profiling import ProfilingMiddleware
+from app.core.tracing import setup_tracing, shutdown_tracing
+from app.core.process_pool import shutdown_process_pool
+from app.core.database import enable_change_stream_pre_images, ensure_indexes
+from app.core.live import product_change_hub
+from app.routes.ai_enrichment.Prefetcher import prefetcher
+
+# Start and stop process-wide services (span exporter, CPU process pool, change stream, ...) together with the app
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    setup_logging()
+    setup_tracing()
+    await ensure_indexes()
+    await enable_change_stream_pre_images()
+    yield
+    await product_change_hub.close()
+    await prefetcher.close()
+    shutdown_process_pool()
+    shutdown_tracing()
+    shutdown_logging()
 
 # Create FastAPI app instance
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Define allowed origins for CORS (Cross-Origin Resource Sharing) policy
 origins = [
@@ -25,6 +48,12 @@ app.add_middleware(
     allow_headers=["*"]           # Allow all headers in the request
 )
 
+# Add middleware for on-demand profiling (admin header or sampling) and slow-request capture
+app.add_middleware(ProfilingMiddleware)
+
+# Tag every log record of a request with its request ID and user ID (outermost, so it covers the others)
+app.add_middleware(LogContextMiddleware)
+
 # Root endpoint for the API to confirm that the service is running
 @app.get("/", tags=["root"])
 async def read_root():
@@ -34,3 +63,10 @@ async def read_root():
 # It's good practice to group related endpoints using routers for modularity
 app.include_router(auth.router, prefix="/api", tags=["auth"])    # Auth routes under '/api/auth'
 app.include_router(product.router, prefix="/api", tags=["products"])  # Product routes under '/api/products'
+app.include_router(live.router, prefix="/api", tags=["live"])  # Live product updates WebSocket at '/api/products/live'
+app.include_router(upload.router, prefix="/api", tags=["uploads"])  # Presigned image upload routes under '/api/uploads'
+app.include_router(metrics.router, prefix="/api", tags=["metrics"])  # Pipeline statistics under '/api/metrics'
+app.include_router(admin.router, prefix="/api", tags=["admin"])  # Admin-only routes under '/api/admin'
+
+# Document the models of request bodies that routes validate themselves (see app.core.openapi)
+install_component_schemas(app)
@@ -1,9 +1,10 @@
+import hmac
 from datetime import datetime, timedelta
 from jose import jwt, JWTError
-from fastapi import Depends, HTTPException
+from fastapi import Depends, Header, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from passlib.context import CryptContext
-from app.core.config import SECRET_KEY, ALGORITHM
+from app.core.config import SECRET_KEY, ALGORITHM, ADMIN_TOKEN
 
 # OAuth2PasswordBearer instance to extract token from the request
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/login")
@@ -55,10 +56,10 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
     to_encode.update({"exp": expire})  # Add expiration time to the token data
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
-# Dependency to get the current user from the token
-async def get_current_user(token: str = Depends(oauth2_scheme)):
+# Function to decode an access token, shared by HTTP and WebSocket authentication
+def decode_access_token(token: str) -> dict:
     """
-    Decode the JWT token to retrieve the current user's data.
+    Decode and verify a JWT access token.
 
     Args:
         token (str): The JWT token provided by the user.
@@ -76,3 +77,48 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     except JWTError:
         # Raise an HTTP exception if the token is invalid
         raise HTTPException(status_code=401, detail="Invalid token")
+
+# Dependency to get the current user from the token
+async def get_current_user(token: str = Depends(oauth2_scheme)):
+    """
+    Decode the JWT token to retrieve the current user's data.
+
+    Args:
+        token (str): The JWT token provided by the user.
+
+    Raises:
+        HTTPException: If token is invalid or expired.
+
+    Returns:
+        dict: The decoded payload from the JWT token.
+    """
+    return decode_access_token(token)
+
+# Check an admin token against the configured ADMIN_TOKEN
+def is_admin_token(token: str | None) -> bool:
+    """
+    Check whether the provided token matches the configured admin token.
+
+    Args:
+        token (str | None): The token sent by the client.
+
+    Returns:
+        bool: True if admin access is configured and the token matches.
+    """
+    if not ADMIN_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode())
+
+# Dependency restricting an endpoint to admins
+async def require_admin(x_admin_token: str | None = Header(default=None)):
+    """
+    Ensure the request carries a valid `X-Admin-Token` header.
+
+    Args:
+        x_admin_token (str | None): The value of the `X-Admin-Token` header.
+
+    Raises:
+        HTTPException: If the token is missing or invalid.
+    """
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin access required")
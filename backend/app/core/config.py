@@ -9,3 +9,123 @@ SECRET_KEY = os.getenv("SECRET_KEY", "supersecret")
 
 # Define the algorithm used for encoding and decoding the JWT token
 ALGORITHM = "HS256"
+
+# Image normalization applied before product images are sent to Gemini
+IMAGE_MAX_DIMENSION = int(os.getenv("IMAGE_MAX_DIMENSION", 1024))  # Longest side in pixels after downscaling
+IMAGE_OUTPUT_FORMAT = os.getenv("IMAGE_OUTPUT_FORMAT", "WEBP").upper()  # Re-encode target: WEBP or JPEG
+IMAGE_OUTPUT_QUALITY = int(os.getenv("IMAGE_OUTPUT_QUALITY", 80))  # Lossy encoder quality (1-100)
+IMAGE_CACHE_SIZE = int(os.getenv("IMAGE_CACHE_SIZE", 256))  # Normalized images kept in memory, keyed by content hash
+
+# Object storage for product images uploaded directly by clients via presigned URLs.
+# Set S3_ENDPOINT_URL to point at a local S3-compatible server (MinIO, moto_server) in development and tests.
+S3_BUCKET = os.getenv("S3_BUCKET", "product-images")
+S3_REGION = os.getenv("S3_REGION", os.getenv("AWS_REGION", "us-east-1"))
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL") or None
+S3_PRESIGN_EXPIRES_SECONDS = int(os.getenv("S3_PRESIGN_EXPIRES_SECONDS", 900))
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", 50 * 1024 * 1024))  # Largest accepted image upload
+UPLOAD_MULTIPART_THRESHOLD = int(os.getenv("UPLOAD_MULTIPART_THRESHOLD", 16 * 1024 * 1024))  # Use multipart above this size
+UPLOAD_PART_SIZE = int(os.getenv("UPLOAD_PART_SIZE", 8 * 1024 * 1024))  # Multipart part size (S3 minimum is 5 MiB)
+
+# End-to-end deadline for one enrichment request and the per-stage budgets for each product.
+# Cloud Run kills requests at 300s by default, so the request deadline stays below that.
+ENRICH_DEADLINE_SECONDS = float(os.getenv("ENRICH_DEADLINE_SECONDS", 280))
+ENRICH_IMAGE_BUDGET_SECONDS = float(os.getenv("ENRICH_IMAGE_BUDGET_SECONDS", 20))
+ENRICH_SEARCH_BUDGET_SECONDS = float(os.getenv("ENRICH_SEARCH_BUDGET_SECONDS", 90))
+ENRICH_EXTRACTION_BUDGET_SECONDS = float(os.getenv("ENRICH_EXTRACTION_BUDGET_SECONDS", 120))
+ENRICH_REPAIR_BUDGET_SECONDS = float(os.getenv("ENRICH_REPAIR_BUDGET_SECONDS", 30))
+
+# Single-pass generation: the agents answer once (no "validate and correct your own JSON" pass),
+# values are validated locally and only the attributes that fail are asked for again
+ENRICH_SINGLE_PASS = os.getenv("ENRICH_SINGLE_PASS", "false").lower() == "true"
+
+# Opt-in variant reuse: a product whose name matches an already-enriched variant (e.g. another size)
+# reuses that variant's search grounding and its variant-invariant attribute values
+VARIANT_REUSE_ENABLED = os.getenv("VARIANT_REUSE_ENABLED", "false").lower() == "true"
+VARIANT_INDEX_MAX_AGE_SECONDS = float(os.getenv("VARIANT_INDEX_MAX_AGE_SECONDS", 600))  # Rebuild a user's index after this
+# Attributes that are the same for all variants of a product and are copied from the sibling
+VARIANT_INVARIANT_ATTRIBUTES = [
+    name.strip().lower()
+    for name in os.getenv("VARIANT_INVARIANT_ATTRIBUTES", "ingredients,material,warranty").split(",")
+    if name.strip()
+]
+
+# Opt-in hedging of Gemini calls: re-issue a call that is slower than the given latency percentile
+HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "false").lower() == "true"
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", 95))  # Percentile of recent latency after which a hedge fires
+HEDGE_MAX_RATIO = float(os.getenv("HEDGE_MAX_RATIO", 0.05))  # Max fraction of calls that may be hedged (quota cap)
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", 20))  # Latency samples needed before hedging starts
+HEDGE_WINDOW = int(os.getenv("HEDGE_WINDOW", 200))  # Number of recent latencies the percentile is computed over
+
+# Adaptive concurrency limit per Gemini model (AIMD): grows while calls are queued behind the limit,
+# shrinks when latency degrades or the API answers 429
+ADAPTIVE_LIMIT_ENABLED = os.getenv("ADAPTIVE_LIMIT_ENABLED", "true").lower() == "true"
+ADAPTIVE_LIMIT_INITIAL = int(os.getenv("ADAPTIVE_LIMIT_INITIAL", 10))  # Starting in-flight limit per model
+ADAPTIVE_LIMIT_MIN = int(os.getenv("ADAPTIVE_LIMIT_MIN", 1))
+ADAPTIVE_LIMIT_MAX = int(os.getenv("ADAPTIVE_LIMIT_MAX", 64))
+ADAPTIVE_LIMIT_LATENCY_TOLERANCE = float(os.getenv("ADAPTIVE_LIMIT_LATENCY_TOLERANCE", 2.0))  # Recent/typical latency ratio that counts as overload
+ADAPTIVE_LIMIT_BACKOFF = float(os.getenv("ADAPTIVE_LIMIT_BACKOFF", 0.5))  # Factor applied to the limit on a 429
+
+# Shared secret for admin-only headers and endpoints (admin features are disabled when unset)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN") or None
+
+# On-demand request profiling and slow-request capture
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0.0))  # Fraction of requests profiled without the admin header
+PROFILE_BUFFER_SIZE = int(os.getenv("PROFILE_BUFFER_SIZE", 50))  # Profiles / slow-request records kept in memory
+SLOW_REQUEST_THRESHOLD_MS = float(os.getenv("SLOW_REQUEST_THRESHOLD_MS", 2000))  # Requests slower than this get a stack summary
+
+# Distributed tracing: "none", "file" (JSON lines at TRACING_FILE) or "otlp" (OTLP/HTTP collector)
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "none").lower()
+TRACING_FILE = os.getenv("TRACING_FILE", "traces.jsonl")
+TRACING_OTLP_ENDPOINT = os.getenv("TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+TRACING_SERVICE_NAME = os.getenv("TRACING_SERVICE_NAME", "ai-attribute-enricher")
+
+# Serving: number of uvicorn worker processes and how long shutdown waits for in-flight requests
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", 1))
+GRACEFUL_SHUTDOWN_SECONDS = int(os.getenv("GRACEFUL_SHUTDOWN_SECONDS", 30))
+
+# Process pool for CPU-bound steps (0 disables it and runs them inline).
+# Payloads smaller than CPU_POOL_MIN_BYTES run inline because the IPC costs more than the work.
+CPU_POOL_WORKERS = int(os.getenv("CPU_POOL_WORKERS", 0))
+CPU_POOL_MIN_BYTES = int(os.getenv("CPU_POOL_MIN_BYTES", 256 * 1024))
+
+# Maximum number of products a server-side selector may pick for one enrich request
+ENRICH_SELECTOR_MAX_PRODUCTS = int(os.getenv("ENRICH_SELECTOR_MAX_PRODUCTS", 500))
+
+# Live product updates over WebSocket (MongoDB change streams, needs a replica set)
+LIVE_MAX_AWAIT_MS = int(os.getenv("LIVE_MAX_AWAIT_MS", 1000))  # How long one change-stream poll waits for new events
+LIVE_QUEUE_SIZE = int(os.getenv("LIVE_QUEUE_SIZE", 1000))  # Pending messages per connection before it is told to resync
+LIVE_READY_TIMEOUT_SECONDS = float(os.getenv("LIVE_READY_TIMEOUT_SECONDS", 10))  # Wait for the change stream to open
+LIVE_RETRY_SECONDS = float(os.getenv("LIVE_RETRY_SECONDS", 2))  # Pause before reopening a failed change stream
+
+# Fair-share scheduling of enrichment work (per process)
+ENRICH_MAX_CONCURRENCY = int(os.getenv("ENRICH_MAX_CONCURRENCY", 8))  # Products enriched at once across all users
+ENRICH_USER_MAX_CONCURRENCY = int(os.getenv("ENRICH_USER_MAX_CONCURRENCY", 4))  # Products enriched at once per user
+ENRICH_INTERACTIVE_MAX_PRODUCTS = int(os.getenv("ENRICH_INTERACTIVE_MAX_PRODUCTS", 3))  # Requests this small use the priority lane
+ENRICH_INTERACTIVE_RESERVED_SLOTS = int(os.getenv("ENRICH_INTERACTIVE_RESERVED_SLOTS", 2))  # Slots batch work cannot take
+# Relative shares of users under contention, e.g. "<user_id>=2,<user_id>=0.5" (default weight 1)
+ENRICH_USER_WEIGHTS = {
+    user_id.strip(): float(weight)
+    for user_id, weight in (item.split("=") for item in os.getenv("ENRICH_USER_WEIGHTS", "").split(",") if item.strip())
+}
+ENRICH_REQUEST_WINDOW = int(os.getenv("ENRICH_REQUEST_WINDOW", 50))  # Products of one request queued for slots at a time
+
+# How long enrich responses are kept for replay under their Idempotency-Key
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", 24 * 3600))
+
+# Speculative prefetch: new products get their search grounding and normalized images loaded in the
+# background (lowest scheduler priority), so a later enrich only runs the extraction
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "false").lower() == "true"
+PREFETCH_MAX_CONCURRENCY = int(os.getenv("PREFETCH_MAX_CONCURRENCY", 2))  # Scheduler slots prefetching may hold at once
+PREFETCH_USER_MAX_CONCURRENCY = int(os.getenv("PREFETCH_USER_MAX_CONCURRENCY", 1))  # Per user, on top of ENRICH_USER_MAX_CONCURRENCY
+PREFETCH_USER_BUDGET = int(os.getenv("PREFETCH_USER_BUDGET", 100))  # Prefetches per user per hour
+PREFETCH_TTL_SECONDS = int(os.getenv("PREFETCH_TTL_SECONDS", 6 * 3600))  # How long prefetched inputs stay usable
+
+# Logging: JSON lines written to stdout by a background thread
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()  # "json" or "text"
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))  # Records waiting for the writer thread before new ones are dropped
+# Fraction of the noisy per-product messages kept per level, e.g. "DEBUG=0.01,INFO=0.1" (unlisted levels keep all)
+LOG_SAMPLE_RATES = {
+    level.strip().upper(): float(rate)
+    for level, rate in (item.split("=") for item in os.getenv("LOG_SAMPLE_RATES", "DEBUG=0.01,INFO=0.1").split(",") if item.strip())
+}
@@ -0,0 +1,109 @@
+# CPU-bound steps that can be shipped to the process pool (see app.core.process_pool).
+# Functions here must stay module-level and only import light modules, since every
+# pool worker imports this module on startup.
+import hashlib
+import json
+
+from pydantic import ValidationError
+
+from app.models.product_model import EnrichProductsRequest, product_create_list_adapter
+from app.routes.ai_enrichment.helpers.GeneratePrompts import GeneratePrompts
+
+
+def attribute_specs(attributes: dict) -> list[dict]:
+    """
+    Convert a product's attribute dictionary into the list expected by GeneratePrompts.
+
+    Args:
+        attributes (dict): The product's attributes keyed by attribute name.
+
+    Returns:
+        list[dict]: Attribute definitions with name, type, unit and options.
+    """
+    return [
+        {
+            "name": attr_name,
+            "type": attr_data.get("type"),
+            "unit": attr_data.get("unit"),
+            "options": attr_data.get("options", [])
+        }
+        for attr_name, attr_data in attributes.items()
+    ]
+
+
+def spec_hash(attributes: dict) -> str:
+    """
+    Fingerprint a product's attribute definitions (names, types, units and options).
+
+    An enrichment checkpoint is only valid for the definitions it was produced with,
+    so changing any of them makes the product eligible for enrichment again.
+
+    Args:
+        attributes (dict): The product's attributes keyed by attribute name.
+
+    Returns:
+        str: A short hex digest.
+    """
+    specs = sorted(
+        ({**spec, "options": spec["options"] or []} for spec in attribute_specs(attributes)),
+        key=lambda spec: spec["name"]
+    )
+    return hashlib.sha256(json.dumps(specs, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def build_attributes_prompt(attributes: dict) -> str:
+    """
+    Build the attribute prompt for one product.
+    """
+    return GeneratePrompts(attribute_specs(attributes)).generate_prompt()
+
+
+def prepare_enrich_request(body: bytes) -> dict:
+    """
+    Validate a raw enrich request body and build each product's attribute prompt.
+
+    Validation runs straight from JSON bytes, and results are returned as plain
+    dictionaries, which pickle much faster than model instances.
+
+    Args:
+        body (bytes): The raw JSON request body.
+
+    Returns:
+        dict: {"request": <validated request as dict>, "prompts": [...]} on success,
+        or {"errors": [...]} with Pydantic's error list.
+    """
+    try:
+        request = EnrichProductsRequest.model_validate_json(body).model_dump()
+    except ValidationError as e:
+        return {"errors": json.loads(e.json(include_url=False))}
+
+    return {
+        "request": request,
+        "prompts": [build_attributes_prompt(product["attributes"]) for product in request["products"] or []],
+    }
+
+
+def prepare_bulk_create(body: bytes) -> dict:
+    """
+    Validate a raw bulk-create body (a JSON array of ProductCreate objects).
+
+    Args:
+        body (bytes): The raw JSON request body.
+
+    Returns:
+        dict: {"products": [...]} with each product as a dict on success,
+        or {"errors": [...]} with Pydantic's error list.
+    """
+    try:
+        products = product_create_list_adapter.validate_json(body)
+    except ValidationError as e:
+        return {"errors": json.loads(e.json(include_url=False))}
+
+    return {"products": product_create_list_adapter.dump_python(products)}
+
+
+def parse_model_json(raw_data: str) -> dict:
+    """
+    Parse the JSON object returned by the model.
+    """
+    return json.loads(raw_data)
@@ -1,7 +1,12 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import PyMongoError
+from app.core.config import IDEMPOTENCY_TTL_SECONDS, PREFETCH_TTL_SECONDS
+import logging
 import os
 from dotenv import load_dotenv
 
+logger = logging.getLogger(__name__)
+
 # Load environment variables from a .env file (if available)
 load_dotenv()
 
@@ -18,3 +23,42 @@ db = client[MONGO_DB_NAME]
 # Define references to the 'users' and 'products' collections in the MongoDB database
 users_collection = db["users"]
 products_collection = db["products"]
+
+# Per-user counters document backing the catalog statistics endpoint
+stats_collection = db["product_stats"]
+
+# Enrich requests by Idempotency-Key, with their stored responses
+enrich_requests_collection = db["enrich_requests"]
+
+# Search grounding and normalized images prefetched for new products, keyed by product ID
+prefetch_collection = db["prefetch"]
+
+# Prefetches started per user and hour, shared by all processes
+prefetch_budget_collection = db["prefetch_budget"]
+
+
+async def enable_change_stream_pre_images():
+    """
+    Record pre-images of product documents, so change streams can report the owner
+    (user_id) of updated and deleted products. Requires MongoDB 6.0+ running as a
+    replica set; without it live updates are unavailable but the API keeps working.
+    """
+    try:
+        await db.command("collMod", products_collection.name, changeStreamPreAndPostImages={"enabled": True})
+    except PyMongoError as e:
+        logger.warning("Could not enable change stream pre-images, live updates will not work: %s", e)
+
+
+async def ensure_indexes():
+    """
+    Create the indexes the application relies on (a no-op when they already exist).
+    """
+    try:
+        # Expire idempotency records once their replay window has passed
+        await enrich_requests_collection.create_index("created_at", expireAfterSeconds=IDEMPOTENCY_TTL_SECONDS)
+        # Drop prefetched inputs once they are too old to be trusted
+        await prefetch_collection.create_index("created_at", expireAfterSeconds=PREFETCH_TTL_SECONDS)
+        # Drop prefetch budget counters once their hour is over
+        await prefetch_budget_collection.create_index("expires_at", expireAfterSeconds=0)
+    except PyMongoError as e:
+        logger.error("Could not create indexes: %s", e)
@@ -0,0 +1,105 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.core.config import ENRICH_DEADLINE_SECONDS
+from app.core.database import enrich_requests_collection
+from app.core.tracing import mongo_span
+
+# Longest accepted Idempotency-Key header
+MAX_KEY_LENGTH = 255
+
+# A "running" record older than this belongs to an attempt that died; a retry may take it over
+LEASE_SECONDS = ENRICH_DEADLINE_SECONDS + 60
+
+
+def record_id(user_id: str, key: str) -> str:
+    # Keys are scoped per user, so two users can pick the same key
+    return f"{user_id}:{key}"
+
+
+def body_hash(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+async def begin(user_id: str, key: str, body: bytes) -> dict | None:
+    """
+    Claim an idempotency key for a request, or return the response stored under it.
+
+    Args:
+        user_id (str): The current user.
+        key (str): The client's Idempotency-Key.
+        body (bytes): The raw request body (a key may only be reused with the same body).
+
+    Returns:
+        dict | None: The stored response of a completed earlier request, or None if this
+        request now owns the key and should run.
+
+    Raises:
+        HTTPException: 400 for an invalid key, 422 if the key was used with a different
+            body, 409 if a request with the same key is still running.
+    """
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail=f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters")
+
+    now = datetime.now(timezone.utc)
+    record = {
+        "_id": record_id(user_id, key),
+        "user_id": user_id,
+        "body_hash": body_hash(body),
+        "status": "running",
+        "created_at": now,
+        "started_at": now,
+    }
+
+    try:
+        with mongo_span("insert_one", enrich_requests_collection):
+            await enrich_requests_collection.insert_one(record)
+        return None
+    except DuplicateKeyError:
+        pass
+
+    with mongo_span("find_one", enrich_requests_collection):
+        existing = await enrich_requests_collection.find_one({"_id": record["_id"]})
+    if existing is None:
+        # Expired between the two calls; claim it again
+        return await begin(user_id, key, body)
+
+    if existing["body_hash"] != record["body_hash"]:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request body")
+    if existing["status"] == "completed":
+        return existing["response"]
+
+    # Take over the key if the attempt holding it is past its lease
+    stale_before = now - timedelta(seconds=LEASE_SECONDS)
+    with mongo_span("find_one_and_update", enrich_requests_collection):
+        claimed = await enrich_requests_collection.find_one_and_update(
+            {"_id": record["_id"], "status": "running", "started_at": {"$lt": stale_before}},
+            {"$set": {"started_at": now}},
+            return_document=ReturnDocument.AFTER
+        )
+    if claimed is None:
+        raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+    return None
+
+
+async def complete(user_id: str, key: str, response: dict) -> None:
+    """
+    Store the response of a finished request for replay.
+    """
+    with mongo_span("update_one", enrich_requests_collection):
+        await enrich_requests_collection.update_one(
+            {"_id": record_id(user_id, key)},
+            {"$set": {"status": "completed", "response": response, "completed_at": datetime.now(timezone.utc)}}
+        )
+
+
+async def release(user_id: str, key: str) -> None:
+    """
+    Drop the claim of a request that failed, so the client can retry with the same key.
+    """
+    with mongo_span("delete_one", enrich_requests_collection):
+        await enrich_requests_collection.delete_one({"_id": record_id(user_id, key), "status": "running"})
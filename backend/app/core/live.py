@@ -0,0 +1,261 @@
+import asyncio
+import logging
+
+from fastapi.encoders import jsonable_encoder
+from pymongo.errors import OperationFailure, PyMongoError
+
+from app.core.config import LIVE_MAX_AWAIT_MS, LIVE_QUEUE_SIZE, LIVE_RETRY_SECONDS
+from app.core.database import products_collection
+
+logger = logging.getLogger(__name__)
+
+# Server error codes meaning a resume token can no longer be used
+# (InvalidResumeToken, ChangeStreamFatalError, ChangeStreamHistoryLost)
+RESUME_FAILED_CODES = {260, 280, 286}
+
+# Sent when a client may have missed changes and must reload its products
+RESYNC_MESSAGE = {"type": "resync"}
+
+# Stored search grounding, never sent to clients
+GROUNDING_FIELD = "enrichment.grounding"
+
+
+def without_grounding(fields: dict) -> dict:
+    """
+    Drop the search grounding from the updated fields of an update event, whether it was
+    set as a nested field ({"enrichment": {"grounding": ...}}) or as a dotted key
+    ("enrichment.grounding"), which the pipeline's `$unset` cannot address.
+    """
+    fields = {field: value for field, value in fields.items() if field != GROUNDING_FIELD}
+    if isinstance(fields.get("enrichment"), dict):
+        fields["enrichment"] = {key: value for key, value in fields["enrichment"].items() if key != "grounding"}
+    return fields
+
+
+def change_pipeline(user_id: str | None = None) -> list:
+    """
+    Build the change-stream pipeline that reduces each event to a compact delta.
+
+    Only the changed fields of updates are kept, the pre-image (which can be as large
+    as the product) is reduced to its owner's user_id on the server, and the stored
+    search grounding of enriched products is dropped (from updates that set it as a
+    dotted key, by `to_message`).
+
+    Args:
+        user_id (str, optional): Only keep changes to this user's products.
+
+    Returns:
+        list: The change-stream aggregation pipeline.
+    """
+    pipeline = [
+        {"$match": {"operationType": {"$in": ["insert", "replace", "update", "delete"]}}},
+        {"$project": {
+            "operationType": 1,
+            "documentKey": 1,
+            "updateDescription.updatedFields": 1,
+            "updateDescription.removedFields": 1,
+            "user_id": {"$ifNull": ["$fullDocument.user_id", "$fullDocumentBeforeChange.user_id"]},
+            "fullDocument": {
+                "$cond": [{"$in": ["$operationType", ["insert", "replace"]]}, "$fullDocument", "$$REMOVE"]
+            },
+        }},
+        {"$unset": ["fullDocument.enrichment.grounding", "updateDescription.updatedFields.enrichment.grounding"]},
+    ]
+    if user_id is not None:
+        pipeline.append({"$match": {"user_id": user_id}})
+    return pipeline
+
+
+def watch(pipeline: list, resume_after: dict | None = None):
+    return products_collection.watch(
+        pipeline,
+        full_document_before_change="whenAvailable",
+        resume_after=resume_after,
+        max_await_time_ms=LIVE_MAX_AWAIT_MS,
+    )
+
+
+def to_message(change: dict) -> dict:
+    """
+    Convert a projected change event into the message sent to the browser.
+
+    Args:
+        change (dict): The change event produced by `change_pipeline`.
+
+    Returns:
+        dict: {"type", "id", "resume_token", ...} with the new product for inserts and
+        replaces, and the changed and removed fields (dotted paths) for updates.
+    """
+    message = {
+        "type": change["operationType"],
+        "id": str(change["documentKey"]["_id"]),
+        "resume_token": change["_id"]["_data"],
+    }
+    if "fullDocument" in change:
+        product = dict(change["fullDocument"])
+        product.pop("_id", None)
+        message["product"] = product
+    elif message["type"] == "update":
+        message["set"] = without_grounding(change["updateDescription"].get("updatedFields", {}))
+        message["unset"] = change["updateDescription"].get("removedFields", [])
+
+    return jsonable_encoder(message)
+
+
+async def catch_up(user_id: str, resume_token: str):
+    """
+    Replay the user's changes after `resume_token` up to the present.
+
+    Args:
+        user_id (str): The user whose changes are replayed.
+        resume_token (str): The `resume_token` of the last message the client received.
+
+    Yields:
+        dict: Messages in change order.
+
+    Raises:
+        PyMongoError: If the token is invalid or too old to resume from.
+    """
+    async with watch(change_pipeline(user_id), resume_after={"_data": resume_token}) as stream:
+        while True:
+            change = await stream.try_next()
+            if change is None:
+                return
+            yield to_message(change)
+
+
+class ProductChangeHub:
+    def __init__(self):
+        """
+        Fans a single change stream on the products collection out to per-user queues.
+
+        One stream per process instead of one per connection: Motor polls each open
+        change stream from its thread pool, so per-connection streams would tie up a
+        thread per idle browser tab. The stream is opened with the first subscriber
+        and closed once the last one leaves.
+        """
+        self.subscribers: dict[str, set[asyncio.Queue]] = {}
+        self.resume_token = None
+        self.ready = asyncio.Event()
+        self._task = None
+        self.stats = {"events": 0, "dispatched": 0, "unrouted": 0, "overflows": 0, "restarts": 0}
+
+    def subscribe(self, user_id: str) -> asyncio.Queue:
+        """
+        Register a connection for the user's changes, starting the stream if needed.
+
+        Returns:
+            asyncio.Queue: Queue receiving the user's messages.
+        """
+        queue = asyncio.Queue(maxsize=LIVE_QUEUE_SIZE)
+        self.subscribers.setdefault(user_id, set()).add(queue)
+        if self._task is None:
+            self.ready = asyncio.Event()
+            self._task = asyncio.create_task(self._run(self.ready))
+        return queue
+
+    def unsubscribe(self, user_id: str, queue: asyncio.Queue) -> None:
+        queues = self.subscribers.get(user_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self.subscribers[user_id]
+
+    async def wait_ready(self, timeout: float) -> bool:
+        """
+        Wait until the change stream is open, so no later change can be missed.
+
+        Returns:
+            bool: False if the stream did not open in time.
+        """
+        try:
+            await asyncio.wait_for(self.ready.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def _push(self, queue: asyncio.Queue, message: dict) -> None:
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # The client is too slow to keep up: drop its backlog and make it reload
+            self.stats["overflows"] += 1
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(RESYNC_MESSAGE)
+
+    def dispatch(self, change: dict) -> None:
+        self.stats["events"] += 1
+        user_id = change.get("user_id")
+        if user_id is None:
+            # No pre-image was recorded for this update/delete (see enable_change_stream_pre_images)
+            self.stats["unrouted"] += 1
+            return
+
+        queues = self.subscribers.get(user_id)
+        if not queues:
+            return
+
+        message = to_message(change)
+        for queue in list(queues):
+            self._push(queue, message)
+        self.stats["dispatched"] += len(queues)
+
+    def broadcast(self, message: dict) -> None:
+        for queues in self.subscribers.values():
+            for queue in list(queues):
+                self._push(queue, message)
+
+    async def _run(self, ready: asyncio.Event):
+        while True:
+            try:
+                async with watch(change_pipeline(), resume_after=self.resume_token) as stream:
+                    while True:
+                        change = await stream.try_next()
+                        self.resume_token = stream.resume_token
+                        ready.set()
+                        if change is not None:
+                            self.dispatch(change)
+                        elif not self.subscribers:
+                            # Detach before the stream is closed, so a new subscriber starts a fresh task
+                            self._task = None
+                            self.resume_token = None
+                            return
+            except asyncio.CancelledError:
+                raise
+            except PyMongoError as e:
+                logger.warning("Product change stream failed: %s", e)
+                ready.clear()
+                self.stats["restarts"] += 1
+                if isinstance(e, OperationFailure) and e.code in RESUME_FAILED_CODES:
+                    # Changes were lost; every client has to reload
+                    self.resume_token = None
+                    self.broadcast(RESYNC_MESSAGE)
+                await asyncio.sleep(LIVE_RETRY_SECONDS)
+                if not self.subscribers:
+                    self._task = None
+                    self.resume_token = None
+                    return
+
+    async def close(self) -> None:
+        """
+        Stop the change stream (on application shutdown).
+        """
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "connections": sum(len(queues) for queues in self.subscribers.values()),
+            "users": len(self.subscribers),
+        }
+
+
+# Shared hub for all WebSocket connections of this process
+product_change_hub = ProductChangeHub()
@@ -0,0 +1,190 @@
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+from app.core.config import LOG_FORMAT, LOG_LEVEL, LOG_QUEUE_SIZE, LOG_SAMPLE_RATES
+from app.core.profiling import header, user_from_scope
+
+# Correlation IDs of the request being handled (inherited by the tasks it starts)
+request_id_var: ContextVar[str | None] = ContextVar("request_id", default=None)
+user_id_var: ContextVar[str | None] = ContextVar("user_id", default=None)
+
+# Longest accepted client-supplied X-Request-ID
+MAX_REQUEST_ID_LENGTH = 128
+
+# Attributes every LogRecord has; anything else was passed via `extra` and is emitted as a field
+RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+
+class ContextFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        # Handler filters run in the caller, where the request's context variables are set
+        record.request_id = request_id_var.get()
+        record.user_id = user_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    def __init__(self, rates: dict[str, float] = LOG_SAMPLE_RATES):
+        """
+        Keeps a fraction of the records logged with `extra={"sampled": True}` (the noisy
+        per-product messages), by level. Other records always pass.
+
+        Args:
+            rates (dict[str, float]): Fraction kept per level name (unlisted levels keep all).
+        """
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "sampled", False):
+            return True
+        rate = self.rates.get(record.levelname, 1.0)
+        if rate < 1.0 and random.random() >= rate:
+            return False
+        record.sample_rate = rate
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        """
+        Render a record as one JSON line, with the fields Cloud Logging recognizes
+        (severity, message, time) plus the correlation IDs and any `extra` fields.
+        """
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "severity": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRIBUTES and key != "sampled" and value is not None:
+                entry[key] = value
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    def __init__(self, log_queue: queue.Queue):
+        """
+        QueueHandler that drops records (and counts them) instead of blocking when the
+        writer thread falls behind.
+        """
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge the arguments and render the traceback in the caller, so the writer thread
+        # never touches objects the caller may still change
+        record = copy.copy(record)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_handler: NonBlockingQueueHandler | None = None
+_listener: logging.handlers.QueueListener | None = None
+
+
+def setup_logging() -> None:
+    """
+    Route all application logging through a bounded queue to a background writer thread,
+    so logging never blocks the event loop on stdout. Records carry the request and user
+    IDs of the request that logged them. Calling it again is a no-op.
+    """
+    global _handler, _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(
+        JSONFormatter() if LOG_FORMAT == "json"
+        else logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(request_id)s %(user_id)s] %(message)s")
+    )
+
+    _handler = NonBlockingQueueHandler(queue.Queue(maxsize=LOG_QUEUE_SIZE))
+    _handler.addFilter(SamplingFilter())
+    _handler.addFilter(ContextFilter())
+
+    app_logger = logging.getLogger("app")
+    app_logger.setLevel(LOG_LEVEL)
+    app_logger.addHandler(_handler)
+    app_logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(_handler.queue, output)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """
+    Flush the queued records and stop the writer thread.
+    """
+    global _handler, _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    logging.getLogger("app").removeHandler(_handler)
+    _handler = _listener = None
+
+
+def get_stats() -> dict:
+    """
+    Report the writer queue's depth and the records dropped because it was full.
+    """
+    if _handler is None:
+        return {"enabled": False}
+    return {"enabled": True, "queued": _handler.queue.qsize(), "dropped": _handler.dropped}
+
+
+class LogContextMiddleware:
+    def __init__(self, app):
+        """
+        ASGI middleware that assigns each request an ID (the client's `X-Request-ID`, or a
+        new one), returns it in the `X-Request-ID` response header and makes it and the
+        authenticated user's ID available to every log record of the request.
+
+        Args:
+            app: The wrapped ASGI application.
+        """
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            return await self.app(scope, receive, send)
+
+        request_id = header(scope, b"x-request-id")
+        if not request_id or len(request_id) > MAX_REQUEST_ID_LENGTH:
+            request_id = uuid.uuid4().hex
+
+        request_token = request_id_var.set(request_id)
+        user_token = user_id_var.set(user_from_scope(scope))
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = [*message["headers"], (b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_var.reset(request_token)
+            user_id_var.reset(user_token)
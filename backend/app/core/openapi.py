@@ -0,0 +1,45 @@
+from fastapi import FastAPI
+
+# Where hand-built request body schemas point their model references
+REF_TEMPLATE = "#/components/schemas/{model}"
+
+# Model definitions referenced by `request_body` schemas, added to the OpenAPI components
+component_schemas: dict[str, dict] = {}
+
+
+def request_body(schema: dict) -> dict:
+    """
+    Build the `openapi_extra` documenting the JSON body of a route that reads and
+    validates its body itself (so FastAPI does not know its model).
+
+    The schema's `$defs` are registered as OpenAPI components (see `install_component_schemas`).
+
+    Args:
+        schema (dict): The body's JSON schema, generated with `ref_template=REF_TEMPLATE`.
+
+    Returns:
+        dict: The `openapi_extra` for the route decorator.
+    """
+    schema = dict(schema)
+    component_schemas.update(schema.pop("$defs", {}))
+    return {"requestBody": {"required": True, "content": {"application/json": {"schema": schema}}}}
+
+
+def install_component_schemas(app: FastAPI) -> None:
+    """
+    Add the definitions collected by `request_body` to the app's generated OpenAPI schema,
+    so the references in those request bodies resolve.
+
+    Args:
+        app (FastAPI): The application.
+    """
+    generate = app.openapi
+
+    def openapi() -> dict:
+        if app.openapi_schema is None:
+            schemas = generate().setdefault("components", {}).setdefault("schemas", {})
+            for name, definition in component_schemas.items():
+                schemas.setdefault(name, definition)
+        return app.openapi_schema
+
+    app.openapi = openapi
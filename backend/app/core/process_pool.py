@@ -0,0 +1,53 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from app.core.config import CPU_POOL_MIN_BYTES, CPU_POOL_WORKERS
+
+_executor = None
+
+
+def get_executor() -> ProcessPoolExecutor | None:
+    """
+    Create (once) the process pool used for CPU-bound work.
+
+    Workers are started with "spawn" so they do not inherit the parent's threads
+    (Motor, span exporter, ...) in a half-copied state.
+
+    Returns:
+        ProcessPoolExecutor | None: The pool, or None when CPU_POOL_WORKERS is 0.
+    """
+    global _executor
+    if _executor is None and CPU_POOL_WORKERS > 0:
+        _executor = ProcessPoolExecutor(max_workers=CPU_POOL_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+
+async def run_cpu_bound(fn, *args, size: int = 0):
+    """
+    Run a CPU-bound function in the process pool so it does not block the event loop.
+
+    Small jobs (and every job when the pool is disabled) run inline.
+
+    Args:
+        fn: A picklable, module-level function.
+        *args: Picklable arguments for `fn`.
+        size (int): Approximate payload size in bytes, compared to CPU_POOL_MIN_BYTES.
+
+    Returns:
+        Any: The function's return value.
+    """
+    executor = get_executor() if size >= CPU_POOL_MIN_BYTES else None
+    if executor is None:
+        return fn(*args)
+    return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+
+
+def shutdown_process_pool() -> None:
+    """
+    Stop the pool's worker processes, waiting for running jobs to finish.
+    """
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,252 @@
+import asyncio
+import cProfile
+import io
+import marshal
+import pstats
+import random
+import sys
+import threading
+import time
+import traceback
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+
+from jose import JWTError, jwt
+
+from app.core.auth import is_admin_token
+from app.core.config import (
+    ALGORITHM,
+    PROFILE_BUFFER_SIZE,
+    PROFILE_SAMPLE_RATE,
+    SECRET_KEY,
+    SLOW_REQUEST_THRESHOLD_MS,
+)
+
+# Number of functions listed in a profile summary, and frames kept in a stack summary
+PROFILE_SUMMARY_LINES = 25
+STACK_SUMMARY_FRAMES = 20
+
+# How often the watchdog thread looks for requests that crossed the latency threshold
+WATCHDOG_INTERVAL_SECONDS = 0.1
+
+
+class ProfileStore:
+    def __init__(self, size: int = PROFILE_BUFFER_SIZE):
+        """
+        Bounded in-memory ring buffer of request profiles and slow-request records.
+        The oldest record is dropped once `size` records are stored.
+
+        Args:
+            size (int): Maximum number of records kept.
+        """
+        self.records = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, record: dict) -> None:
+        with self._lock:
+            self.records.append(record)
+
+    def list(self) -> list[dict]:
+        """
+        Returns:
+            list[dict]: Metadata of all stored records, newest first (without profile data).
+        """
+        with self._lock:
+            records = list(self.records)
+        return [{k: v for k, v in record.items() if k != "data"} for record in reversed(records)]
+
+    def get(self, record_id: str) -> dict | None:
+        with self._lock:
+            return next((record for record in self.records if record["id"] == record_id), None)
+
+
+def format_frames(frames: list, limit: int = STACK_SUMMARY_FRAMES) -> list[str]:
+    """
+    Render frames as compact "file:line in function" strings, innermost last.
+    """
+    summary = traceback.StackSummary.extract(((frame, frame.f_lineno) for frame in frames), lookup_lines=False)
+    return [f"{entry.filename}:{entry.lineno} in {entry.name}" for entry in summary][-limit:]
+
+
+class SlowRequestWatchdog:
+    def __init__(self, threshold_ms: float = SLOW_REQUEST_THRESHOLD_MS):
+        """
+        Background thread that snapshots the stacks of requests still running after
+        `threshold_ms`. Running on its own thread, it also catches requests that block
+        the event loop, which a loop callback could not.
+
+        Args:
+            threshold_ms (float): Latency threshold in milliseconds.
+        """
+        self.threshold = threshold_ms / 1000
+        self.in_flight = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def _ensure_started(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="slow-request-watchdog", daemon=True)
+            self._thread.start()
+
+    def register(self, task: asyncio.Task | None) -> dict:
+        """
+        Start tracking a request.
+
+        Returns:
+            dict: The tracking entry; its "stack" is filled once the request turns slow.
+        """
+        self._ensure_started()
+        entry = {
+            "started": time.monotonic(),
+            "thread_id": threading.get_ident(),
+            "task": task,
+            "stack": None,
+        }
+        with self._lock:
+            self.in_flight[id(entry)] = entry
+        return entry
+
+    def unregister(self, entry: dict) -> None:
+        with self._lock:
+            self.in_flight.pop(id(entry), None)
+
+    def _snapshot(self, entry: dict) -> dict:
+        """
+        Capture what the event-loop thread is executing and where the request's task is suspended.
+        """
+        thread_frame = sys._current_frames().get(entry["thread_id"])
+        thread_frames = []
+        while thread_frame is not None:
+            thread_frames.append(thread_frame)
+            thread_frame = thread_frame.f_back
+
+        task_frames = []
+        if entry["task"] is not None:
+            try:
+                task_frames = entry["task"].get_stack()
+            except Exception:
+                task_frames = []
+
+        return {
+            "sampled_after_ms": round((time.monotonic() - entry["started"]) * 1000, 1),
+            "loop_thread": format_frames(list(reversed(thread_frames))),
+            "request_task": format_frames(task_frames),
+        }
+
+    def _run(self):
+        while True:
+            time.sleep(WATCHDOG_INTERVAL_SECONDS)
+            now = time.monotonic()
+            with self._lock:
+                due = [e for e in self.in_flight.values() if e["stack"] is None and now - e["started"] >= self.threshold]
+            for entry in due:
+                entry["stack"] = self._snapshot(entry)
+
+
+def user_from_scope(scope) -> str | None:
+    """
+    Best-effort extraction of the user ID from the request's bearer token.
+    """
+    for name, value in scope.get("headers", []):
+        if name == b"authorization" and value[:7].lower() == b"bearer ":
+            try:
+                return jwt.decode(value[7:].decode(), SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+            except (JWTError, UnicodeDecodeError):
+                return None
+    return None
+
+
+def header(scope, name: bytes) -> str | None:
+    for key, value in scope.get("headers", []):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class ProfilingMiddleware:
+    def __init__(self, app, store: ProfileStore | None = None, sample_rate: float = PROFILE_SAMPLE_RATE,
+                 watchdog: SlowRequestWatchdog | None = None):
+        """
+        ASGI middleware that profiles selected requests with cProfile and records a stack
+        summary for every request slower than SLOW_REQUEST_THRESHOLD_MS.
+
+        A request is profiled when it sends `X-Profile: 1` together with a valid
+        `X-Admin-Token`, or when it is picked by `sample_rate`. cProfile profiles the whole
+        event-loop thread, so concurrent requests show up in the profile as well; only
+        one request is profiled at a time.
+
+        Args:
+            app: The wrapped ASGI application.
+            store (ProfileStore, optional): Where records are kept (defaults to the shared store).
+            sample_rate (float): Fraction of requests profiled without the admin header.
+            watchdog (SlowRequestWatchdog, optional): Slow-request tracker (defaults to the shared one).
+        """
+        self.app = app
+        self.store = store or profile_store
+        self.sample_rate = sample_rate
+        self.watchdog = watchdog or slow_request_watchdog
+        self._profiling = False
+
+    def should_profile(self, scope) -> bool:
+        if header(scope, b"x-profile") == "1" and is_admin_token(header(scope, b"x-admin-token")):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        profiler = None
+        if self.should_profile(scope) and not self._profiling:
+            self._profiling = True
+            profiler = cProfile.Profile()
+
+        entry = self.watchdog.register(asyncio.current_task())
+        started_at = datetime.now(timezone.utc)
+        started = time.perf_counter()
+        try:
+            if profiler:
+                profiler.enable()
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if profiler:
+                profiler.disable()
+                self._profiling = False
+            duration_ms = (time.perf_counter() - started) * 1000
+            self.watchdog.unregister(entry)
+
+            slow = duration_ms >= self.watchdog.threshold * 1000
+            if profiler or slow:
+                route = scope.get("route")
+                record = {
+                    "id": uuid.uuid4().hex,
+                    "kind": "profile" if profiler else "slow",
+                    "method": scope.get("method"),
+                    "route": getattr(route, "path", None) or scope.get("path"),
+                    "path": scope.get("path"),
+                    "user_id": user_from_scope(scope),
+                    "status": status["code"],
+                    "duration_ms": round(duration_ms, 1),
+                    "started_at": started_at.isoformat(),
+                }
+                if slow:
+                    record["stack"] = entry["stack"] or {"note": "request finished before the watchdog sampled it"}
+                if profiler:
+                    stats = pstats.Stats(profiler, stream=io.StringIO())
+                    stats.sort_stats("cumulative").print_stats(PROFILE_SUMMARY_LINES)
+                    record["summary"] = stats.stream.getvalue()
+                    record["data"] = marshal.dumps(stats.stats)  # Same format as pstats.dump_stats
+                self.store.add(record)
+
+
+# Shared store and watchdog used by the middleware and the admin endpoints
+profile_store = ProfileStore()
+slow_request_watchdog = SlowRequestWatchdog()
@@ -0,0 +1,264 @@
+import asyncio
+import itertools
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+from app.core.config import (
+    ENRICH_INTERACTIVE_RESERVED_SLOTS,
+    ENRICH_MAX_CONCURRENCY,
+    ENRICH_USER_MAX_CONCURRENCY,
+    ENRICH_USER_WEIGHTS,
+    PREFETCH_MAX_CONCURRENCY,
+    PREFETCH_USER_MAX_CONCURRENCY,
+)
+
+# Number of recent wait times kept per user for the percentile
+WAIT_WINDOW = 200
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+BACKGROUND = "background"
+LANES = (INTERACTIVE, BATCH, BACKGROUND)
+
+
+@dataclass
+class Job:
+    """
+    A request for one enrichment slot, waiting in a user's lane.
+    """
+    user_id: str
+    lane: str
+    finish_tag: float
+    seq: int
+    future: asyncio.Future
+    enqueued: float = field(default_factory=time.monotonic)
+
+
+class UserState:
+    def __init__(self):
+        self.lanes = {lane: deque() for lane in LANES}
+        self.running = 0
+        self.background_running = 0
+        self.finish_tag = 0.0
+        self.background_finish_tag = 0.0
+        self.completed = 0
+        self.timeouts = 0
+        self.waits_ms = deque(maxlen=WAIT_WINDOW)
+
+    def idle(self) -> bool:
+        return not self.running and not self.background_running and not any(self.lanes.values())
+
+
+class FairScheduler:
+    def __init__(
+        self,
+        capacity: int = ENRICH_MAX_CONCURRENCY,
+        user_limit: int = ENRICH_USER_MAX_CONCURRENCY,
+        interactive_reserved: int = ENRICH_INTERACTIVE_RESERVED_SLOTS,
+        weights: dict | None = None,
+        background_capacity: int = PREFETCH_MAX_CONCURRENCY,
+        background_user_limit: int = PREFETCH_USER_MAX_CONCURRENCY,
+    ):
+        """
+        Hands out enrichment slots so that one large request cannot starve other users.
+
+        - At most `capacity` slots are in use at once, and at most `user_limit` per user.
+        - Waiting batch work is served by weighted fair queuing (self-clocked): each job is
+          tagged with its user's virtual finish time, advancing by 1 / weight per job, and the
+          smallest tag goes first. A user with twice the weight gets twice the slots under
+          contention, and an idle user does not bank credit.
+        - Small interactive requests use a priority lane that is always served first and may
+          also use the `interactive_reserved` slots that batch work cannot take.
+        - Speculative background work (prefetching) only gets a slot when no other work is
+          waiting, and holds at most `background_capacity` slots, `background_user_limit` per
+          user (counted separately from `user_limit`, so a user's prefetches never take the
+          slots of their own enrichment). It is queued fairly among users on its own virtual
+          clock, so queued prefetches do not push back the user's batch work.
+
+        Args:
+            capacity (int): Total concurrent slots.
+            user_limit (int): Concurrent slots per user.
+            interactive_reserved (int): Slots kept free for the interactive lane.
+            weights (dict, optional): Per-user weights (default 1).
+            background_capacity (int): Slots the background lane may hold at once.
+            background_user_limit (int): Background slots per user.
+        """
+        self.capacity = capacity
+        self.user_limit = user_limit
+        self.batch_capacity = max(1, capacity - interactive_reserved)
+        self.background_capacity = min(background_capacity, self.batch_capacity)
+        self.background_user_limit = background_user_limit
+        self.weights = ENRICH_USER_WEIGHTS if weights is None else weights
+
+        self.users: dict[str, UserState] = {}
+        self.running = 0
+        self.background_running = 0
+        self.virtual_time = 0.0
+        self.background_virtual_time = 0.0
+        self._seq = itertools.count()
+
+    def _user(self, user_id: str) -> UserState:
+        state = self.users.get(user_id)
+        if state is None:
+            state = self.users[user_id] = UserState()
+        return state
+
+    def _pick(self, lane: str) -> Job | None:
+        """
+        Return the waiting job of `lane` with the smallest finish tag among users below their cap.
+        """
+        best = None
+        for state in self.users.values():
+            queue = state.lanes[lane]
+            if lane == BACKGROUND:
+                below_cap = state.background_running < self.background_user_limit
+            else:
+                below_cap = state.running < self.user_limit
+            if queue and below_cap:
+                job = queue[0]
+                if best is None or (job.finish_tag, job.seq) < (best.finish_tag, best.seq):
+                    best = job
+        return best
+
+    def _dispatch(self) -> None:
+        while self.running < self.capacity:
+            job = self._pick(INTERACTIVE)
+            if job is None and self.running < self.batch_capacity:
+                job = self._pick(BATCH)
+            if job is None and self.running < self.batch_capacity and self.background_running < self.background_capacity:
+                # Only reached when no batch job can run either
+                job = self._pick(BACKGROUND)
+            if job is None:
+                return
+
+            state = self.users[job.user_id]
+            state.lanes[job.lane].popleft()
+            self.running += 1
+            if job.lane == BACKGROUND:
+                state.background_running += 1
+                self.background_running += 1
+                self.background_virtual_time = max(self.background_virtual_time, job.finish_tag)
+            else:
+                state.running += 1
+                # An earlier-tagged interactive job must not move the clock back
+                self.virtual_time = max(self.virtual_time, job.finish_tag)
+            state.waits_ms.append((time.monotonic() - job.enqueued) * 1000)
+            job.future.set_result(None)
+
+    async def acquire(
+        self,
+        user_id: str,
+        interactive: bool = False,
+        timeout: float | None = None,
+        background: bool = False
+    ) -> None:
+        """
+        Wait for an enrichment slot. Every successful call must be paired with `release`
+        (with the same `background` flag).
+
+        Args:
+            user_id (str): The user the work is done for.
+            interactive (bool): Use the priority lane (small interactive requests).
+            timeout (float, optional): Give up after this many seconds.
+            background (bool): Use the background lane (speculative work).
+
+        Raises:
+            asyncio.TimeoutError: If no slot was granted within `timeout`.
+        """
+        state = self._user(user_id)
+        weight = self.weights.get(user_id, 1.0)
+        if background:
+            finish_tag = max(self.background_virtual_time, state.background_finish_tag) + 1 / weight
+            state.background_finish_tag = finish_tag
+        else:
+            finish_tag = max(self.virtual_time, state.finish_tag) + 1 / weight
+            state.finish_tag = finish_tag
+
+        job = Job(
+            user_id=user_id,
+            lane=BACKGROUND if background else INTERACTIVE if interactive else BATCH,
+            finish_tag=finish_tag,
+            seq=next(self._seq),
+            future=asyncio.get_running_loop().create_future(),
+        )
+        state.lanes[job.lane].append(job)
+        self._dispatch()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(job.future), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if job.future.done():
+                # The slot was granted just as the caller gave up
+                self.release(user_id, background)
+            else:
+                job.future.cancel()
+                state.lanes[job.lane].remove(job)
+                self._forget_if_idle(user_id)
+            if isinstance(e, asyncio.TimeoutError):
+                state.timeouts += 1
+            raise
+
+    def release(self, user_id: str, background: bool = False) -> None:
+        state = self.users[user_id]
+        state.completed += 1
+        self.running -= 1
+        if background:
+            state.background_running -= 1
+            self.background_running -= 1
+        else:
+            state.running -= 1
+        self._forget_if_idle(user_id)
+        self._dispatch()
+
+    def _forget_if_idle(self, user_id: str) -> None:
+        # Idle users restart from the current virtual time anyway; only their counters are kept
+        state = self.users[user_id]
+        if state.idle():
+            state.finish_tag = 0.0
+            state.background_finish_tag = 0.0
+
+    def get_stats(self, user_id: str | None = None) -> dict:
+        """
+        Report slot usage, and queue depth and wait times per user.
+
+        Args:
+            user_id (str, optional): Only include this user's entry.
+
+        Returns:
+            dict: Global counters and a "users" mapping of per-user statistics.
+        """
+        users = {}
+        for uid, state in self.users.items():
+            if user_id is not None and uid != user_id:
+                continue
+            waits = sorted(state.waits_ms)
+            users[uid] = {
+                "queued_interactive": len(state.lanes[INTERACTIVE]),
+                "queued_batch": len(state.lanes[BATCH]),
+                "queued_background": len(state.lanes[BACKGROUND]),
+                "running": state.running,
+                "running_background": state.background_running,
+                "completed": state.completed,
+                "timeouts": state.timeouts,
+                "weight": self.weights.get(uid, 1.0),
+                "wait_ms_avg": round(sum(waits) / len(waits), 1) if waits else 0.0,
+                "wait_ms_p95": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 1) if waits else 0.0,
+                "wait_ms_max": round(waits[-1], 1) if waits else 0.0,
+            }
+
+        return {
+            "capacity": self.capacity,
+            "user_limit": self.user_limit,
+            "background_user_limit": self.background_user_limit,
+            "batch_capacity": self.batch_capacity,
+            "background_capacity": self.background_capacity,
+            "running": self.running,
+            "background_running": self.background_running,
+            "queued": sum(len(queue) for s in self.users.values() for queue in s.lanes.values()),
+            "users": users,
+        }
+
+
+# Shared scheduler for all enrichment requests of this process
+enrichment_scheduler = FairScheduler()
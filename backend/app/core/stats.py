@@ -0,0 +1,294 @@
+from typing import Any, Dict, Optional
+
+from app.core.database import products_collection, stats_collection
+from app.core.tracing import mongo_span
+
+# Attribute values that count as "not filled" for fill-rate purposes
+EMPTY_VALUES = (None, "", [], "Not Found")
+
+
+def is_filled(value: Any) -> bool:
+    """
+    Check whether an attribute value counts as filled.
+
+    Args:
+        value (Any): The attribute value stored on the product.
+
+    Returns:
+        bool: True if the value is considered filled, False otherwise.
+    """
+    return not any(value == empty for empty in EMPTY_VALUES)
+
+
+def product_counters(product: Optional[dict]) -> Dict[str, int]:
+    """
+    Compute the flat counter contributions of a single product document.
+
+    The keys are dotted field paths of the user's stats document, so the result
+    can be fed straight into a MongoDB `$inc`.
+
+    Args:
+        product (dict | None): The product document (or None for "no document").
+
+    Returns:
+        dict: Mapping of counter path to its contribution (0 or 1).
+    """
+    if not product:
+        return {}
+
+    counters = {
+        "total": 1,
+        "enriched": 1 if product.get("isEnriched") else 0,
+    }
+    for name, attribute in (product.get("attributes") or {}).items():
+        counters[f"attributes.{name}.count"] = 1
+        counters[f"attributes.{name}.filled"] = 1 if is_filled((attribute or {}).get("value")) else 0
+
+    return counters
+
+
+def counters_delta(before: Optional[dict], after: Optional[dict]) -> Dict[str, int]:
+    """
+    Compute the counter increments needed to move a product from one state to another.
+
+    Args:
+        before (dict | None): The product document before the write (None on insert).
+        after (dict | None): The product document after the write (None on delete).
+
+    Returns:
+        dict: Non-zero counter increments.
+    """
+    delta = dict(product_counters(after))
+    for key, value in product_counters(before).items():
+        delta[key] = delta.get(key, 0) - value
+
+    return {key: value for key, value in delta.items() if value}
+
+
+def apply_update(product: dict, update: dict) -> dict:
+    """
+    Apply a flat `$set` dictionary (with dotted paths) to a copy of a product document.
+
+    Args:
+        product (dict): The product document before the update.
+        update (dict): The `$set` dictionary used for the MongoDB update.
+
+    Returns:
+        dict: The product document as it looks after the update.
+    """
+    updated = {
+        **product,
+        "attributes": {name: dict(attr or {}) for name, attr in (product.get("attributes") or {}).items()},
+    }
+    for path, value in update.items():
+        keys = path.split(".")
+        target = updated
+        for key in keys[:-1]:
+            target = target.setdefault(key, {})
+        target[keys[-1]] = value
+
+    return updated
+
+
+async def record_change(user_id: str, before: Optional[dict], after: Optional[dict]) -> None:
+    """
+    Atomically update the user's stats counters for a single product write.
+
+    Args:
+        user_id (str): The owner of the product.
+        before (dict | None): The product document before the write.
+        after (dict | None): The product document after the write.
+    """
+    await increment(user_id, counters_delta(before, after))
+
+
+async def increment(user_id: str, delta: Dict[str, int]) -> None:
+    """
+    Apply counter increments to the user's stats document. If the user has no stats
+    document yet (e.g. a catalog created before the counters existed), it is seeded
+    from a full aggregation instead, which already includes the write being counted.
+
+    Args:
+        user_id (str): The owner of the stats document.
+        delta (dict): Counter increments keyed by dotted field path.
+    """
+    if delta:
+        with mongo_span("update_one", stats_collection):
+            result = await stats_collection.update_one({"_id": user_id}, {"$inc": delta})
+        if not result.matched_count:
+            await seed_stats(user_id)
+
+
+async def seed_stats(user_id: str) -> dict:
+    """
+    Create the user's counters document from a full aggregation of their products.
+
+    Callers run this after their own product write, so the aggregation includes it.
+
+    Args:
+        user_id (str): The user whose counters are seeded.
+
+    Returns:
+        dict: The stored stats document.
+    """
+    computed = await compute_stats(user_id)
+    with mongo_span("replace_one", stats_collection):
+        await stats_collection.replace_one({"_id": user_id}, computed, upsert=True)
+    return computed
+
+
+def merge_deltas(*deltas: Dict[str, int]) -> Dict[str, int]:
+    """
+    Sum several counter deltas into one, so a bulk write needs a single `$inc`.
+
+    Returns:
+        dict: The combined non-zero counter increments.
+    """
+    merged: Dict[str, int] = {}
+    for delta in deltas:
+        for key, value in delta.items():
+            merged[key] = merged.get(key, 0) + value
+
+    return {key: value for key, value in merged.items() if value}
+
+
+def format_stats(document: Optional[dict]) -> dict:
+    """
+    Turn a raw stats document into the response returned by the stats endpoint.
+
+    Args:
+        document (dict | None): The stats document (None if the user has no products yet).
+
+    Returns:
+        dict: Totals, enriched / not enriched counts and per-attribute fill rates.
+    """
+    document = document or {}
+    total = document.get("total", 0)
+    enriched = document.get("enriched", 0)
+
+    attributes = {}
+    for name, counts in sorted((document.get("attributes") or {}).items()):
+        count = counts.get("count", 0)
+        if count <= 0:
+            continue
+        filled = counts.get("filled", 0)
+        attributes[name] = {
+            "count": count,
+            "filled": filled,
+            "fill_rate": round(filled / count, 4),
+        }
+
+    return {
+        "total": total,
+        "enriched": enriched,
+        "not_enriched": total - enriched,
+        "attributes": attributes,
+    }
+
+
+async def get_stats(user_id: str) -> dict:
+    """
+    Read the user's catalog statistics from the counters document (a single lookup).
+    The document is seeded from the products on first read if it does not exist yet.
+
+    Args:
+        user_id (str): The user whose statistics are requested.
+
+    Returns:
+        dict: The formatted statistics.
+    """
+    document = await stats_collection.find_one({"_id": user_id})
+    if document is None:
+        document = await seed_stats(user_id)
+    return format_stats(document)
+
+
+def stats_pipeline(user_id: str) -> list:
+    """
+    Build the aggregation pipeline that recomputes a user's counters from scratch.
+
+    Args:
+        user_id (str): The user whose products are aggregated.
+
+    Returns:
+        list: The MongoDB aggregation pipeline.
+    """
+    filled = {"$not": [{"$in": [{"$ifNull": ["$attributes.v.value", None]}, list(EMPTY_VALUES)]}]}
+
+    return [
+        {"$match": {"user_id": user_id}},
+        {"$project": {
+            "isEnriched": 1,
+            "attributes": {"$objectToArray": {"$ifNull": ["$attributes", {}]}},
+        }},
+        {"$facet": {
+            "totals": [
+                {"$group": {
+                    "_id": None,
+                    "total": {"$sum": 1},
+                    "enriched": {"$sum": {"$cond": [{"$eq": ["$isEnriched", True]}, 1, 0]}},
+                }},
+            ],
+            "attributes": [
+                {"$unwind": "$attributes"},
+                {"$group": {
+                    "_id": "$attributes.k",
+                    "count": {"$sum": 1},
+                    "filled": {"$sum": {"$cond": [filled, 1, 0]}},
+                }},
+            ],
+        }},
+    ]
+
+
+async def compute_stats(user_id: str) -> dict:
+    """
+    Recompute the user's counters document with the aggregation pipeline.
+
+    Args:
+        user_id (str): The user whose products are aggregated.
+
+    Returns:
+        dict: A stats document in the same shape as the stored counters.
+    """
+    result = await products_collection.aggregate(stats_pipeline(user_id)).to_list(length=1)
+    facets = result[0] if result else {"totals": [], "attributes": []}
+    totals = facets["totals"][0] if facets["totals"] else {}
+
+    return {
+        "_id": user_id,
+        "total": totals.get("total", 0),
+        "enriched": totals.get("enriched", 0),
+        "attributes": {
+            row["_id"]: {"count": row["count"], "filled": row["filled"]}
+            for row in facets["attributes"]
+        },
+    }
+
+
+async def rebuild_stats(user_id: str, verify_only: bool = False) -> dict:
+    """
+    Verify the incrementally maintained counters against a full aggregation and
+    optionally replace them with the recomputed values.
+
+    Args:
+        user_id (str): The user whose counters are rebuilt.
+        verify_only (bool): If True, only report drift without writing.
+
+    Returns:
+        dict: Whether the counters were consistent, plus the recomputed statistics.
+    """
+    computed = await compute_stats(user_id)
+    stored = format_stats(await stats_collection.find_one({"_id": user_id}))
+    expected = format_stats(computed)
+    consistent = stored == expected
+
+    if not consistent and not verify_only:
+        await stats_collection.replace_one({"_id": user_id}, computed, upsert=True)
+
+    return {
+        "consistent": consistent,
+        "rebuilt": not consistent and not verify_only,
+        "stored": stored,
+        "computed": expected,
+    }
@@ -0,0 +1,239 @@
+import os
+import time
+import uuid
+from functools import lru_cache
+from typing import Iterable
+
+import boto3
+from botocore.config import Config
+
+from app.core.config import (
+    ENRICH_IMAGE_BUDGET_SECONDS,
+    S3_BUCKET,
+    S3_ENDPOINT_URL,
+    S3_PRESIGN_EXPIRES_SECONDS,
+    S3_REGION,
+    UPLOAD_MAX_BYTES,
+)
+
+# Prefix used by products to reference uploaded images, e.g. "s3://bucket/users/<id>/images/<uuid>.jpg"
+S3_SCHEME = "s3://"
+
+# Size of the chunks streamed image downloads are read in
+READ_CHUNK_BYTES = 64 * 1024
+
+
+@lru_cache(maxsize=1)
+def get_s3_client():
+    """
+    Create (once) the S3 client used for presigning and reading uploaded images.
+
+    Path-style addressing is used when a custom endpoint is configured, which is
+    what local S3-compatible servers expect. No single connect or read may take longer
+    than the enrichment image budget.
+
+    Returns:
+        botocore.client.S3: The S3 client.
+    """
+    config = Config(
+        signature_version="s3v4",
+        s3={"addressing_style": "path" if S3_ENDPOINT_URL else "auto"},
+        connect_timeout=ENRICH_IMAGE_BUDGET_SECONDS,
+        read_timeout=ENRICH_IMAGE_BUDGET_SECONDS,
+    )
+    return boto3.client("s3", region_name=S3_REGION, endpoint_url=S3_ENDPOINT_URL, config=config)
+
+
+def new_object_key(user_id: str, filename: str) -> str:
+    """
+    Generate a unique object key for an image uploaded by a user.
+
+    Args:
+        user_id (str): The owner of the upload; keys are namespaced per user.
+        filename (str): The client-side file name (only its extension is kept).
+
+    Returns:
+        str: The object key.
+    """
+    extension = os.path.splitext(filename)[1].lower()[:10]
+    return f"users/{user_id}/images/{uuid.uuid4().hex}{extension}"
+
+
+def image_ref(key: str) -> str:
+    """
+    Build the image reference stored in `ProductCreate.images` for an object key.
+    """
+    return f"{S3_SCHEME}{S3_BUCKET}/{key}"
+
+
+def parse_image_ref(ref: str) -> tuple[str, str]:
+    """
+    Split an "s3://bucket/key" image reference into bucket and key.
+
+    Raises:
+        ValueError: If the reference is not an S3 reference.
+    """
+    if not ref.startswith(S3_SCHEME) or "/" not in ref[len(S3_SCHEME):]:
+        raise ValueError(f"Not an S3 image reference: {ref}")
+    bucket, key = ref[len(S3_SCHEME):].split("/", 1)
+    return bucket, key
+
+
+def is_owned_key(key: str, user_id: str) -> bool:
+    """
+    Check that an object key lives in the given user's namespace.
+    """
+    return key.startswith(f"users/{user_id}/") and ".." not in key
+
+
+def is_owned_ref(ref: str, user_id: str) -> bool:
+    """
+    Check that an "s3://" image reference points into our bucket and the user's namespace.
+    """
+    try:
+        bucket, key = parse_image_ref(ref)
+    except ValueError:
+        return False
+    return bucket == S3_BUCKET and is_owned_key(key, user_id)
+
+
+def presign_put(key: str, content_type: str, size: int) -> str:
+    """
+    Create a presigned URL that lets the client PUT a single object directly to storage.
+
+    The Content-Length is part of the signature, so storage rejects an upload of any
+    other size than the one that was checked against UPLOAD_MAX_BYTES.
+
+    Args:
+        key (str): The object key to upload to.
+        content_type (str): The Content-Type the client must send with the upload.
+        size (int): The exact size in bytes the client must upload.
+
+    Returns:
+        str: The presigned PUT URL.
+    """
+    return get_s3_client().generate_presigned_url(
+        "put_object",
+        Params={"Bucket": S3_BUCKET, "Key": key, "ContentType": content_type, "ContentLength": size},
+        ExpiresIn=S3_PRESIGN_EXPIRES_SECONDS,
+    )
+
+
+def create_multipart_upload(key: str, content_type: str) -> str:
+    """
+    Start a multipart upload for a large object.
+
+    Returns:
+        str: The upload ID to pass to the part and completion calls.
+    """
+    response = get_s3_client().create_multipart_upload(Bucket=S3_BUCKET, Key=key, ContentType=content_type)
+    return response["UploadId"]
+
+
+def presign_upload_part(key: str, upload_id: str, part_number: int, size: int) -> str:
+    """
+    Create a presigned URL for uploading one part of a multipart upload.
+
+    Like `presign_put`, the part's exact size is signed.
+
+    Returns:
+        str: The presigned PUT URL for the part.
+    """
+    return get_s3_client().generate_presigned_url(
+        "upload_part",
+        Params={
+            "Bucket": S3_BUCKET,
+            "Key": key,
+            "UploadId": upload_id,
+            "PartNumber": part_number,
+            "ContentLength": size,
+        },
+        ExpiresIn=S3_PRESIGN_EXPIRES_SECONDS,
+    )
+
+
+def complete_multipart_upload(key: str, upload_id: str, parts: list[dict]) -> None:
+    """
+    Assemble the uploaded parts into the final object.
+
+    Args:
+        key (str): The object key.
+        upload_id (str): The multipart upload ID.
+        parts (list[dict]): Items with "part_number" and "etag" as returned by the part uploads.
+    """
+    get_s3_client().complete_multipart_upload(
+        Bucket=S3_BUCKET,
+        Key=key,
+        UploadId=upload_id,
+        MultipartUpload={
+            "Parts": [
+                {"PartNumber": part["part_number"], "ETag": part["etag"]}
+                for part in sorted(parts, key=lambda part: part["part_number"])
+            ]
+        },
+    )
+
+
+def abort_multipart_upload(key: str, upload_id: str) -> None:
+    """
+    Abort a multipart upload and discard any parts uploaded so far.
+    """
+    get_s3_client().abort_multipart_upload(Bucket=S3_BUCKET, Key=key, UploadId=upload_id)
+
+
+def read_stream(chunks: Iterable[bytes], source: str, expires_at: float | None = None) -> bytes:
+    """
+    Read a streamed download, giving up once it passes `expires_at` or UPLOAD_MAX_BYTES.
+
+    Downloads run in worker threads, which cancelling the awaiting task does not stop;
+    checking the time between chunks ends them at the deadline instead of whenever the
+    server finishes sending.
+
+    Args:
+        chunks (Iterable[bytes]): The body, in chunks.
+        source (str): The image reference or URL (for error messages).
+        expires_at (float, optional): `time.monotonic()` time by which the download must finish.
+
+    Returns:
+        bytes: The downloaded contents.
+
+    Raises:
+        TimeoutError: If the download did not finish by `expires_at`.
+        ValueError: If the download is larger than UPLOAD_MAX_BYTES.
+    """
+    data = bytearray()
+    for chunk in chunks:
+        data += chunk
+        if len(data) > UPLOAD_MAX_BYTES:
+            raise ValueError(f"Image {source} exceeds the {UPLOAD_MAX_BYTES} byte limit")
+        if expires_at is not None and time.monotonic() > expires_at:
+            raise TimeoutError(f"Download of {source} did not finish in time")
+    return bytes(data)
+
+
+def get_object_bytes(ref: str, timeout: float | None = None) -> bytes:
+    """
+    Read an uploaded image from storage.
+
+    Args:
+        ref (str): The "s3://bucket/key" image reference.
+        timeout (float, optional): Total time allowed for the download, in seconds.
+
+    Returns:
+        bytes: The object contents.
+
+    Raises:
+        TimeoutError: If the download took longer than `timeout`.
+        ValueError: If the object is larger than UPLOAD_MAX_BYTES (e.g. written by a
+            storage server that does not enforce signed Content-Length).
+    """
+    expires_at = time.monotonic() + timeout if timeout is not None else None
+    bucket, key = parse_image_ref(ref)
+    response = get_s3_client().get_object(Bucket=bucket, Key=key)
+    body = response["Body"]
+    try:
+        if response["ContentLength"] > UPLOAD_MAX_BYTES:
+            raise ValueError(f"Image {ref} exceeds the {UPLOAD_MAX_BYTES} byte limit")
+        return read_stream(body.iter_chunks(READ_CHUNK_BYTES), ref, expires_at)
+    finally:
+        body.close()
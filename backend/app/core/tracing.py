@@ -0,0 +1,96 @@
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+from opentelemetry.trace import SpanKind
+
+from app.core.config import TRACING_EXPORTER, TRACING_FILE, TRACING_OTLP_ENDPOINT, TRACING_SERVICE_NAME
+
+# Tracer used across the enrichment path (a no-op until setup_tracing installs a provider)
+tracer = trace.get_tracer("app.enrichment")
+
+_provider = None
+_trace_file = None  # Output of the "file" exporter, closed on shutdown
+
+
+def setup_tracing() -> None:
+    """
+    Install the tracer provider with a batching exporter chosen by TRACING_EXPORTER.
+
+    Spans are queued in memory and exported by the BatchSpanProcessor's background
+    thread, so ending a span never blocks the request on I/O.
+    """
+    global _provider, _trace_file
+    if _provider is not None or TRACING_EXPORTER == "none":
+        return
+
+    if TRACING_EXPORTER == "file":
+        _trace_file = open(TRACING_FILE, "a", encoding="utf-8")
+        exporter = ConsoleSpanExporter(
+            out=_trace_file,
+            formatter=lambda span: span.to_json(indent=None) + "\n",
+        )
+    elif TRACING_EXPORTER == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        exporter = OTLPSpanExporter(endpoint=TRACING_OTLP_ENDPOINT)
+    else:
+        raise ValueError(f"Unknown TRACING_EXPORTER: {TRACING_EXPORTER}")
+
+    _provider = TracerProvider(resource=Resource.create({"service.name": TRACING_SERVICE_NAME}))
+    _provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(_provider)
+
+
+def shutdown_tracing() -> None:
+    """
+    Flush queued spans, stop the exporter thread and close the trace file.
+    """
+    global _trace_file
+    if _provider is not None:
+        _provider.shutdown()
+    if _trace_file is not None:
+        _trace_file.close()
+        _trace_file = None
+
+
+def mongo_span(operation: str, collection):
+    """
+    Start a client span around a MongoDB (Motor) operation.
+
+    Args:
+        operation (str): The command name (e.g. "find_one_and_update").
+        collection: The Motor collection the operation runs on.
+
+    Returns:
+        A context manager yielding the span.
+    """
+    return tracer.start_as_current_span(
+        f"mongo.{operation}",
+        kind=SpanKind.CLIENT,
+        attributes={
+            "db.system": "mongodb",
+            "db.operation": operation,
+            "db.collection.name": collection.name,
+        },
+    )
+
+
+def record_token_usage(span, response) -> None:
+    """
+    Attach the model's token usage to a span, if the response reports it.
+
+    Args:
+        span: The span to annotate.
+        response: A Gemini response (google-genai or Vertex AI SDK).
+    """
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return
+    for attribute, field in (
+        ("gen_ai.usage.input_tokens", "prompt_token_count"),
+        ("gen_ai.usage.output_tokens", "candidates_token_count"),
+        ("gen_ai.usage.total_tokens", "total_token_count"),
+    ):
+        value = getattr(usage, field, None)
+        if value is not None:
+            span.set_attribute(attribute, value)
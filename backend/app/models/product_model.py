@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, TypeAdapter, model_validator
 from typing import Optional, List, Dict, Union
 
 
@@ -50,3 +50,54 @@ class ProductUpdate(ProductCreate):
         id (str): The unique identifier of the product to be updated.
     """
     id: str
+
+
+# Compiled validator for bulk payloads: validates a whole JSON array of products
+# straight from the raw bytes, without building an intermediate Python object first
+product_create_list_adapter = TypeAdapter(List[ProductCreate])
+
+
+class EnrichSelector(BaseModel):
+    """
+    Model to represent a server-side selection of the user's products to enrich.
+
+    Attributes:
+        isEnriched (Optional[bool]): Only pick products with this enrichment status.
+        brand (Optional[str]): Only pick products of this brand.
+        limit (Optional[int]): Maximum number of products to pick
+            (capped at ENRICH_SELECTOR_MAX_PRODUCTS).
+    """
+    isEnriched: Optional[bool] = None
+    brand: Optional[str] = None
+    limit: Optional[int] = Field(default=None, gt=0)
+
+
+class EnrichProductsRequest(BaseModel):
+    """
+    Model to represent a product enrichment request.
+
+    Exactly one of `products`, `ids` or `selector` must be given. With `ids` or
+    `selector` the server loads the products itself, so clients do not need to
+    upload (possibly stale) full product objects.
+
+    Attributes:
+        products (Optional[List[ProductUpdate]]): The full Product objects to be enriched.
+        ids (Optional[List[str]]): IDs of the user's products to be enriched.
+        selector (Optional[EnrichSelector]): A filter over the user's products to be enriched.
+        deadline_seconds (Optional[float]): End-to-end deadline for the request
+            (capped at ENRICH_DEADLINE_SECONDS).
+        force (bool): Re-enrich products even if they were already enriched with the
+            same attribute definitions.
+    """
+    products: Optional[List[ProductUpdate]] = None
+    ids: Optional[List[str]] = None
+    selector: Optional[EnrichSelector] = None
+    deadline_seconds: Optional[float] = Field(default=None, gt=0)
+    force: bool = False
+
+    @model_validator(mode="after")
+    def check_single_source(self):
+        sources = [source for source in (self.products, self.ids, self.selector) if source is not None]
+        if len(sources) != 1:
+            raise ValueError("Provide exactly one of 'products', 'ids' or 'selector'")
+        return self
@@ -0,0 +1,54 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+
+class UploadRequest(BaseModel):
+    """
+    Model to represent a request for presigned image upload URL(s).
+
+    Attributes:
+        filename (str): The client-side file name (used for the object extension).
+        content_type (str): The MIME type of the image (e.g., "image/jpeg").
+        size (int): The size of the file in bytes, used to choose single vs multipart upload.
+    """
+    filename: str
+    content_type: str
+    size: int = Field(gt=0)
+
+
+class UploadedPart(BaseModel):
+    """
+    Model to represent one uploaded part of a multipart upload.
+
+    Attributes:
+        part_number (int): The 1-based part number.
+        etag (str): The ETag header returned by storage for the part upload.
+    """
+    part_number: int = Field(ge=1, le=10000)
+    etag: str
+
+
+class CompleteUploadRequest(BaseModel):
+    """
+    Model to represent the completion of a multipart upload.
+
+    Attributes:
+        key (str): The object key returned by the presign endpoint.
+        upload_id (str): The multipart upload ID returned by the presign endpoint.
+        parts (List[UploadedPart]): The uploaded parts with their ETags.
+    """
+    key: str
+    upload_id: str
+    parts: List[UploadedPart]
+
+
+class AbortUploadRequest(BaseModel):
+    """
+    Model to represent the cancellation of a multipart upload.
+
+    Attributes:
+        key (str): The object key returned by the presign endpoint.
+        upload_id (str): The multipart upload ID returned by the presign endpoint.
+    """
+    key: str
+    upload_id: str
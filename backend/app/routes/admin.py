@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import Response
+
+from app.core.auth import require_admin
+from app.core.profiling import profile_store
+from app.core.scheduler import enrichment_scheduler
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+@router.get("/admin/profiles")
+async def list_profiles():
+    """
+    Endpoint to list captured request profiles and slow-request records, newest first.
+
+    Returns:
+        list: Metadata (route, user, timing, summary) of each record.
+    """
+    return profile_store.list()
+
+@router.get("/admin/profiles/{record_id}/download")
+async def download_profile(record_id: str):
+    """
+    Endpoint to download a captured cProfile profile.
+
+    The file has the same format as `pstats.dump_stats`, so it can be opened with
+    `python -m pstats <file>` or visualisers such as snakeviz.
+
+    Args:
+        record_id (str): The record ID from the listing.
+
+    Returns:
+        Response: The binary profile.
+
+    Raises:
+        HTTPException: If the record does not exist or holds no profile data.
+    """
+    record = profile_store.get(record_id)
+    if not record or "data" not in record:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    return Response(
+        content=record["data"],
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{record_id}.prof"'}
+    )
+
+@router.get("/admin/scheduler")
+async def get_scheduler_stats():
+    """
+    Endpoint to inspect the enrichment scheduler across all users.
+
+    Returns:
+        dict: Slot usage, plus queue depth and wait times per user.
+    """
+    return enrichment_scheduler.get_stats()
@@ -1,18 +1,50 @@
 import re
 import json
-from .helpers.GeneratePrompts import GeneratePrompts
+import time
+import asyncio
+import logging
 from .helpers.GoogleSearchAgent import GoogleSearchAgent
 from .helpers.ProductAgent import ProductAgent
+from .helpers.AttributeValidator import NOT_FOUND, AttributeValidator
+from .helpers.GeneratePrompts import GeneratePrompts
+from .helpers.ImageNormalizer import image_normalizer
+from .helpers.Deadline import Deadline
+from app.core import storage
+from app.core.cpu_tasks import attribute_specs, build_attributes_prompt, parse_model_json
+from app.core.process_pool import run_cpu_bound
+from app.core.tracing import tracer
+from opentelemetry import trace
+from app.core.config import (
+    ENRICH_EXTRACTION_BUDGET_SECONDS,
+    ENRICH_IMAGE_BUDGET_SECONDS,
+    ENRICH_REPAIR_BUDGET_SECONDS,
+    ENRICH_SEARCH_BUDGET_SECONDS,
+    ENRICH_SINGLE_PASS,
+    VARIANT_INVARIANT_ATTRIBUTES,
+)
 from vertexai.preview.generative_models import Part
 import requests
 
+logger = logging.getLogger(__name__)
+
 class AttributeEnricher:
-    def __init__(self, product_json: dict):
+    def __init__(
+        self,
+        product_json: dict,
+        attributes_prompt: str | None = None,
+        sibling: dict | None = None,
+        prefetched: dict | None = None
+    ):
         """
         Initializes the AttributeEnricher with product information, preparing attributes for enrichment.
 
         Args:
             product_json (dict): A dictionary containing the product information such as name, brand, attributes, etc.
+            attributes_prompt (str, optional): A prompt already built for the attributes (e.g. in the process pool).
+            sibling (dict, optional): An already-enriched variant of the product; its search grounding
+                is used instead of a new search, and its invariant attribute values are copied.
+            prefetched (dict, optional): Search grounding and normalized images loaded ahead of time
+                (see Prefetcher); they take precedence over the sibling's grounding.
         """
         self.product_json = product_json
         self.product_name = product_json["product_name"]
@@ -20,18 +52,73 @@ class AttributeEnricher:
         self.images = product_json.get("images", [])
         self.barcode = product_json.get("barcode", "")
 
-        # Prepare attributes list as expected by GeneratePrompts (already adapted)
-        attributes_to_enrich = [
-            {
-                "name": attr_name,
-                "type": attr_data.get("type"),
-                "unit": attr_data.get("unit"),
-                "options": attr_data.get("options", [])
-            }
-            for attr_name, attr_data in product_json["attributes"].items()
-        ]
+        # Values copied from the sibling; only the remaining attributes are asked for
+        self.sibling = sibling
+        self.reused_values = self.reusable_values(sibling) if sibling else {}
+        self.model_attributes = {
+            name: attribute for name, attribute in product_json["attributes"].items() if name not in self.reused_values
+        }
+
+        # Prepare the attribute prompt unless it was built ahead of time for all attributes
+        if attributes_prompt and not self.reused_values:
+            self.attributes_prompt = attributes_prompt
+        else:
+            self.attributes_prompt = build_attributes_prompt(self.model_attributes)
+
+        # Inputs loaded ahead of time, used instead of searching and downloading again
+        self.prefetched = prefetched
+        self.prefetched_images = {image["uri"]: image for image in (prefetched or {}).get("images", [])}
+
+        # Search grounding the result is based on (stored for variants) and the sibling it came from
+        self.grounding = None
+        self.grounded_by = sibling["id"] if sibling and not prefetched else None
+        if prefetched:
+            self.reused_grounding = prefetched["grounding"]
+        elif sibling:
+            self.reused_grounding = sibling["enrichment"]["grounding"]
+        else:
+            self.reused_grounding = None
 
-        self.attributes_prompt = GeneratePrompts(attributes_to_enrich).generate_prompt()
+        # Stages that timed out or failed and were skipped, making the result partial
+        self.degraded_stages = []
+
+        # Single-pass mode: answer once, validate locally and re-ask only for failed attributes
+        self.single_pass = ENRICH_SINGLE_PASS
+        self.repaired_attributes = []
+        self.rejected_attributes = []
+
+    def reusable_values(self, sibling: dict) -> dict:
+        """
+        Picks the sibling's values for variant-invariant attributes (VARIANT_INVARIANT_ATTRIBUTES)
+        that are defined the same way (type, unit, options) on this product. Each value is
+        validated like a model answer; one that fails is asked for instead of copied.
+
+        Args:
+            sibling (dict): The enriched variant, with its attributes.
+
+        Returns:
+            dict: The reusable values keyed by attribute name.
+        """
+        def definition(attribute: dict) -> tuple:
+            return attribute.get("type"), attribute.get("unit") or None, list(attribute.get("options") or [])
+
+        sibling_attributes = sibling.get("attributes") or {}
+        validator = AttributeValidator(attribute_specs(self.product_json["attributes"]))
+        values = {}
+        for name, attribute in self.product_json["attributes"].items():
+            other = sibling_attributes.get(name) or {}
+            value = other.get("value")
+            if (
+                name.lower() in VARIANT_INVARIANT_ATTRIBUTES
+                and value not in (None, "", [], NOT_FOUND)
+                and definition(attribute) == definition(other)
+            ):
+                try:
+                    values[name] = validator.validate_value(name, value)
+                except ValueError as e:
+                    logger.info("Not reusing %s of variant %s: %s", name, sibling.get("id"), e)
+
+        return values
 
     def get_mime_from_uri(self, image_uri: str) -> str:
         """
@@ -50,29 +137,90 @@ class AttributeEnricher:
         else:
             return "image/jpeg"
 
-    def retrieve_image_part(self, image_uri: str) -> Part:
+    def image_part_from_bytes(self, image_uri: str, image_bytes: bytes) -> Part:
+        """
+        Normalizes downloaded image bytes (format sniffing, downscaling, re-encoding,
+        metadata stripping) and wraps the result in a Part.
+
+        Args:
+            image_uri (str): The URI the bytes were loaded from (used for logging).
+            image_bytes (bytes): The raw image bytes.
+
+        Returns:
+            Part: A Part object representing the normalized image.
+        """
+        image = image_normalizer.normalize(image_bytes)
+        trace.get_current_span().set_attributes({
+            "image.original_bytes": image.original_bytes,
+            "image.bytes": image.num_bytes,
+            "image.original_tokens": image.original_tokens,
+            "image.tokens": image.tokens,
+        })
+        logger.info(
+            "Normalized image %s: %d -> %d bytes, ~%d -> ~%d tokens",
+            image_uri, image.original_bytes, image.num_bytes, image.original_tokens, image.tokens,
+            extra={"sampled": True}
+        )
+        return Part.from_data(image.data, mime_type=image.mime_type)
+
+    def retrieve_image_part(self, image_uri: str, timeout: float | None = None) -> Part:
         """
-        Retrieves an image part either from a Google Cloud Storage URI, HTTP(s) URL, or local file.
+        Retrieves an image part either from a Google Cloud Storage URI, an uploaded object
+        ("s3://" reference), HTTP(s) URL, or local file.
+        Downloaded, uploaded and local images are normalized before being wrapped.
 
         Args:
             image_uri (str): The URI or path to the image.
+            timeout (float, optional): Total time allowed for the download, in seconds.
 
         Returns:
             Part: A Part object representing the image.
         """
+        with tracer.start_as_current_span("retrieve_image_part", attributes={"image.scheme": image_uri.split(":", 1)[0]}):
+            prefetched = self.prefetched_images.get(image_uri)
+            if prefetched is not None:
+                return Part.from_data(prefetched["data"], mime_type=prefetched["mime_type"])
+            return self._retrieve_image_part(image_uri, timeout)
+
+    def _retrieve_image_part(self, image_uri: str, timeout: float | None = None) -> Part:
         if image_uri.startswith("gs://"):
             return Part.from_uri(image_uri, mime_type=self.get_mime_from_uri(image_uri))
+
+        image_bytes = self.load_image_bytes(image_uri, timeout)
+        return self.image_part_from_bytes(image_uri, image_bytes) if image_bytes is not None else None
+
+    def load_image_bytes(self, image_uri: str, timeout: float | None = None) -> bytes | None:
+        """
+        Loads the raw bytes of an uploaded ("s3://" reference), HTTP(s) or local image.
+
+        `timeout` bounds the whole download, not just each socket read, so the worker
+        thread running it ends by then even though the awaiting task was cancelled.
+
+        Args:
+            image_uri (str): The URI or path to the image.
+            timeout (float, optional): Total time allowed for the download, in seconds.
+
+        Returns:
+            bytes | None: The image bytes, or None if the download failed.
+
+        Raises:
+            TimeoutError: If the download took longer than `timeout`.
+        """
+        if image_uri.startswith(storage.S3_SCHEME):
+            return storage.get_object_bytes(image_uri, timeout)
         elif image_uri.startswith("http://") or image_uri.startswith("https://"):
-            response = requests.get(image_uri)
-            if response.status_code == 200:
-                image_bytes = response.content
-                return Part.from_data(image_bytes, mime_type=self.get_mime_from_uri(image_uri))
-            else:
-                print(f"Fetch image failed for {image_uri}, status code: {response.status_code}")
-                return None
+            expires_at = time.monotonic() + timeout if timeout is not None else None
+            with requests.get(image_uri, timeout=timeout, stream=True) as response:
+                if response.status_code == 200:
+                    # read1 returns whatever has arrived, so a slow sender is checked against the deadline between reads
+                    chunks = iter(lambda: response.raw.read1(storage.READ_CHUNK_BYTES, decode_content=True), b"")
+                    return storage.read_stream(chunks, image_uri, expires_at)
+                else:
+                    logger.warning("Fetch image failed for %s, status code: %s", image_uri, response.status_code)
+                    return None
         else:
-            image_bytes = open(image_uri, "rb").read()
-            return Part.from_data(image_bytes, mime_type=self.get_mime_from_uri(image_uri))
+            with open(image_uri, "rb") as image_file:
+                return image_file.read()
 
     def parse_json_from_markdown(self, answer: str) -> dict:
         """
@@ -111,6 +259,18 @@ class AttributeEnricher:
             self.barcode
         )
 
+        return self.response_text(response)
+
+    def response_text(self, response) -> str:
+        """
+        Concatenates the text parts of a Google Search agent response.
+
+        Args:
+            response: The response returned by the GoogleSearchAgent.
+
+        Returns:
+            str: The text of the first candidate.
+        """
         response_string = ""
         for part in response.candidates[0].content.parts:
             if hasattr(part, 'text') and part.text:
@@ -118,6 +278,275 @@ class AttributeEnricher:
 
         return response_string
 
+    async def retrieve_image_parts_async(self, timeout: float) -> list:
+        """
+        Fetches all product images concurrently in worker threads. Images that fail to
+        load are skipped, and the image stage is then recorded in `degraded_stages`.
+
+        Args:
+            timeout (float): Total time allowed for each download, in seconds.
+
+        Returns:
+            list: The successfully loaded image parts.
+        """
+        with tracer.start_as_current_span("image_fetch", attributes={"product.image_count": len(self.images)}) as span:
+            results = await asyncio.gather(
+                *(asyncio.to_thread(self.retrieve_image_part, uri, timeout) for uri in self.images),
+                return_exceptions=True
+            )
+
+            image_parts = []
+            for uri, result in zip(self.images, results):
+                if isinstance(result, Exception):
+                    logger.warning("Fetch image failed for %s: %s", uri, result)
+                elif result is not None:
+                    image_parts.append(result)
+
+            span.set_attribute("image.loaded_count", len(image_parts))
+            if len(image_parts) < len(self.images):
+                # Extraction runs without some of the images; do not treat the result as complete
+                self.degraded_stages.append("images")
+
+        return image_parts
+
+    async def normalize_images_async(self, timeout: float, max_bytes: int) -> list[dict]:
+        """
+        Downloads and normalizes the product images for storage. "gs://" images are
+        referenced by URI at enrichment time and are skipped, as are images that fail to
+        load or would take the total over `max_bytes`.
+
+        Args:
+            timeout (float): Total time allowed for each download, in seconds.
+            max_bytes (int): Maximum total size of the normalized images.
+
+        Returns:
+            list[dict]: The normalized images as {"uri", "data", "mime_type"}.
+        """
+        uris = [uri for uri in self.images if not uri.startswith("gs://")]
+        results = await asyncio.gather(
+            *(asyncio.to_thread(self.load_image_bytes, uri, timeout) for uri in uris),
+            return_exceptions=True
+        )
+
+        images, total = [], 0
+        for uri, result in zip(uris, results):
+            if isinstance(result, Exception) or result is None:
+                logger.warning("Prefetch image failed for %s: %s", uri, result)
+                continue
+            image = await asyncio.to_thread(image_normalizer.normalize, result)
+            if total + image.num_bytes > max_bytes:
+                continue
+            total += image.num_bytes
+            images.append({"uri": uri, "data": image.data, "mime_type": image.mime_type})
+
+        return images
+
+    async def prefetch_inputs_async(self, deadline: Deadline, max_image_bytes: int) -> dict:
+        """
+        Runs the grounded search and normalizes the images ahead of enrichment, within
+        the same stage budgets as `enrich_attributes_async`.
+
+        Args:
+            deadline (Deadline): The deadline of the prefetch.
+            max_image_bytes (int): Maximum total size of the normalized images.
+
+        Returns:
+            dict: The search grounding and the normalized images.
+
+        Raises:
+            StageTimeout: If the search runs out of time.
+        """
+        budget = deadline.budget(ENRICH_IMAGE_BUDGET_SECONDS)
+        grounding, images = await asyncio.gather(
+            deadline.run("search", self.google_product_info_async(), ENRICH_SEARCH_BUDGET_SECONDS),
+            deadline.run("image fetch", self.normalize_images_async(budget, max_image_bytes), budget),
+            return_exceptions=True
+        )
+
+        # The grounding is what makes a prefetch worth storing; images are optional
+        if isinstance(grounding, Exception):
+            raise grounding
+        if isinstance(images, Exception):
+            logger.warning("Prefetch image stage failed for %s: %s", self.product_name, images)
+            images = []
+
+        return {"grounding": grounding, "images": images}
+
+    async def google_product_info_async(self) -> str:
+        """
+        Async variant of `google_product_info`.
+
+        Returns:
+            str: A string containing the information retrieved from Google Search.
+        """
+        response = await GoogleSearchAgent(single_pass=self.single_pass).generate_response_async(
+            self.product_name,
+            self.brand,
+            self.attributes_prompt,
+            self.barcode
+        )
+
+        return self.response_text(response)
+
+    async def enrich_attributes_async(self, deadline: Deadline) -> dict:
+        """
+        Enriches the attributes of the product under a deadline.
+
+        Image fetching and the grounded search run concurrently, each within its own
+        budget. If either stage times out or fails it is dropped (recorded in
+        `degraded_stages`) and extraction proceeds with what is available, so a hung
+        search degrades to image-only extraction instead of failing the product.
+
+        Args:
+            deadline (Deadline): The end-to-end deadline of the enrichment request.
+
+        Returns:
+            dict: A dictionary containing enriched attribute data.
+
+        Raises:
+            StageTimeout: If the extraction stage itself runs out of time.
+        """
+        with tracer.start_as_current_span(
+            "enrich_attributes",
+            attributes={
+                "product.attribute_count": len(self.product_json["attributes"]),
+                "product.image_count": len(self.images),
+            }
+        ) as span:
+            result = await self._enrich_attributes_async(deadline)
+            span.set_attributes({
+                "enrichment.degraded_stages": self.degraded_stages,
+                "enrichment.single_pass": self.single_pass,
+                "enrichment.repaired_attributes": self.repaired_attributes,
+                "enrichment.rejected_attributes": self.rejected_attributes,
+                "enrichment.sibling_id": self.grounded_by or "",
+                "enrichment.prefetched": self.prefetched is not None,
+                "enrichment.reused_attributes": list(self.reused_values),
+            })
+
+        return result
+
+    async def _enrich_attributes_async(self, deadline: Deadline) -> dict:
+        if self.sibling is not None and not self.model_attributes:
+            # Every attribute was copied from the sibling; there is nothing to ask for
+            self.grounding = self.reused_grounding
+            return dict(self.reused_values)
+
+        async def fetch_images():
+            if not self.images:
+                return []
+            budget = deadline.budget(ENRICH_IMAGE_BUDGET_SECONDS)
+            return await deadline.run("image fetch", self.retrieve_image_parts_async(budget), budget)
+
+        async def search():
+            if self.reused_grounding is not None:
+                # Prefetched, or a variant's (variants share their search results)
+                return self.reused_grounding
+            return await deadline.run("search", self.google_product_info_async(), ENRICH_SEARCH_BUDGET_SECONDS)
+
+        image_result, search_result = await asyncio.gather(
+            fetch_images(),
+            search(),
+            return_exceptions=True
+        )
+
+        if isinstance(image_result, Exception):
+            logger.warning("Image stage degraded for %s: %s", self.product_name, image_result)
+            self.degraded_stages.append("images")
+            image_result = []
+
+        if isinstance(search_result, Exception):
+            logger.warning("Search stage degraded for %s: %s", self.product_name, search_result)
+            self.degraded_stages.append("search")
+            search_result = "Not available."
+        else:
+            self.grounding = search_result
+
+        if self.grounded_by:
+            search_result = (
+                f"(Found for the variant \"{self.sibling['product_name']}\" of this product; "
+                f"size, colour and quantity may differ.)\n{search_result}"
+            )
+
+        productagent = ProductAgent(gemini_model_version="gemini-2.5-pro-exp-03-25", temperature=0, single_pass=self.single_pass)
+        response = await deadline.run(
+            "extraction",
+            productagent.generate_response_async(
+                self.brand,
+                self.product_name,
+                search_result,
+                self.attributes_prompt,
+                image_result,
+                self.barcode
+            ),
+            ENRICH_EXTRACTION_BUDGET_SECONDS
+        )
+
+        # Parse the raw data into JSON (in the process pool for very large outputs)
+        raw_data = response.candidates[0].content.parts[0].text
+        parsed_data = await run_cpu_bound(parse_model_json, raw_data, size=len(raw_data))
+
+        if self.single_pass:
+            parsed_data = await self.validate_and_repair(parsed_data, productagent, deadline, search_result, image_result)
+        return {**parsed_data, **self.reused_values}
+
+    async def validate_and_repair(
+        self,
+        values: dict,
+        productagent: ProductAgent,
+        deadline: Deadline,
+        search_result: str,
+        image_parts: list
+    ) -> dict:
+        """
+        Validate a single-pass answer locally and ask again, once, for the attributes
+        that failed. Values that still fail are replaced by "Not Found" so they are not stored.
+
+        Args:
+            values (dict): The parsed model answer.
+            productagent (ProductAgent): The agent used for the follow-up request.
+            deadline (Deadline): The end-to-end deadline of the enrichment request.
+            search_result (str): The search information the answer was based on (sent again).
+            image_parts (list): The image parts the answer was based on (sent again).
+
+        Returns:
+            dict: The validated (and normalized) attribute values.
+        """
+        specs = attribute_specs(self.model_attributes)
+        valid, failures = AttributeValidator(specs).validate(values)
+
+        if failures:
+            failed_specs = [spec for spec in specs if spec["name"] in failures]
+            try:
+                response = await deadline.run(
+                    "repair",
+                    productagent.repair_async(
+                        self.brand,
+                        self.product_name,
+                        search_result,
+                        GeneratePrompts(failed_specs).generate_prompt(),
+                        failures,
+                        image_parts,
+                        self.barcode
+                    ),
+                    ENRICH_REPAIR_BUDGET_SECONDS
+                )
+                repaired, failures = AttributeValidator(failed_specs).validate(
+                    parse_model_json(response.candidates[0].content.parts[0].text)
+                )
+                valid.update(repaired)
+                self.repaired_attributes = [name for name, value in repaired.items() if value != NOT_FOUND]
+            except Exception as e:
+                # Keep the rejected attributes unset and let a retry ask again
+                logger.warning("Repair stage degraded for %s: %s", self.product_name, e)
+                self.degraded_stages.append("repair")
+
+        self.rejected_attributes = list(failures)
+        for name in failures:
+            valid[name] = NOT_FOUND
+
+        return valid
+
     def enrich_attributes(self) -> dict:
         """
         Enriches the attributes of the product by generating responses using the ProductAgent and Google search information.
@@ -143,4 +572,4 @@ class AttributeEnricher:
         raw_data = response.candidates[0].content.parts[0].text
         parsed_data = json.loads(raw_data)
 
-        return parsed_data
+        return {**parsed_data, **self.reused_values}
@@ -0,0 +1,232 @@
+import asyncio
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+from .AttributeEnricher import AttributeEnricher
+from .helpers.Deadline import Deadline
+from app.core.config import (
+    ENRICH_IMAGE_BUDGET_SECONDS,
+    ENRICH_SEARCH_BUDGET_SECONDS,
+    PREFETCH_ENABLED,
+    PREFETCH_TTL_SECONDS,
+    PREFETCH_USER_BUDGET,
+)
+from app.core.cpu_tasks import spec_hash
+from app.core.database import prefetch_budget_collection, prefetch_collection
+from app.core.scheduler import enrichment_scheduler
+from app.core.tracing import mongo_span, tracer
+
+logger = logging.getLogger(__name__)
+
+# The user budget is counted per window of this length (clock hours)
+BUDGET_WINDOW_SECONDS = 3600
+
+# Normalized images stored per product (keeps the document well below MongoDB's 16 MB limit)
+MAX_IMAGE_BYTES = 8 * 1024 * 1024
+
+
+def prefetch_key(product: dict) -> str:
+    """
+    Hash the product fields the prefetched inputs depend on (name, brand, barcode, images
+    and attribute definitions), so inputs for a product that changed since are not used.
+    """
+    key = json.dumps([
+        product.get("product_name"),
+        product.get("brand"),
+        product.get("barcode") or "",
+        product.get("images") or [],
+        spec_hash(product.get("attributes") or {}),
+    ])
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+class Prefetcher:
+    def __init__(self, enabled: bool = PREFETCH_ENABLED, user_budget: int = PREFETCH_USER_BUDGET):
+        """
+        Initializes the Prefetcher, which speculatively runs the grounded search and image
+        normalization for newly created products in the background, so that enriching
+        them later only needs the extraction.
+
+        Prefetches run in the scheduler's background lane (after all waiting enrichment
+        work), at most `user_budget` per user per clock hour, counted in MongoDB across
+        processes and instances; products over the budget are simply enriched in full later. Results are stored in the `prefetch` collection
+        and expire after PREFETCH_TTL_SECONDS. A product's prefetch that has not finished
+        when it is enriched (or deleted) is cancelled, since the enrichment searches anyway.
+
+        Args:
+            enabled (bool): Whether new products are prefetched at all.
+            user_budget (int): Prefetches started per user per hour.
+        """
+        self.enabled = enabled
+        self.user_budget = user_budget
+        self.tasks: dict[tuple[str, str], asyncio.Task] = {}
+        self.stats = {"scheduled": 0, "over_budget": 0, "stored": 0, "failed": 0, "cancelled": 0, "hits": 0, "misses": 0}
+
+    @staticmethod
+    def _budget_window() -> tuple[str, datetime]:
+        # Start of the current window, and when its counter can be dropped
+        now = datetime.now(timezone.utc)
+        start = datetime.fromtimestamp(now.timestamp() // BUDGET_WINDOW_SECONDS * BUDGET_WINDOW_SECONDS, timezone.utc)
+        return start.isoformat(), start + timedelta(seconds=BUDGET_WINDOW_SECONDS)
+
+    async def _take_budget(self, user_id: str, count: int) -> int:
+        """
+        Take up to `count` prefetches from the user's budget for the current window.
+
+        Returns:
+            int: How many prefetches may be started.
+        """
+        window, expires_at = self._budget_window()
+        with mongo_span("find_one_and_update", prefetch_budget_collection):
+            counter = await prefetch_budget_collection.find_one_and_update(
+                {"_id": f"{user_id}:{window}"},
+                {"$inc": {"started": count}, "$setOnInsert": {"user_id": user_id, "expires_at": expires_at}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        used_before = counter["started"] - count
+        return max(0, min(count, self.user_budget - used_before))
+
+    async def _budget_used(self, user_id: str) -> int:
+        window, _ = self._budget_window()
+        with mongo_span("find_one", prefetch_budget_collection):
+            counter = await prefetch_budget_collection.find_one({"_id": f"{user_id}:{window}"})
+        return min(counter["started"], self.user_budget) if counter else 0
+
+    async def schedule(self, user_id: str, products: list[dict]) -> int:
+        """
+        Queue background prefetches for new products (those not already enriched).
+
+        Args:
+            user_id (str): The owner of the products.
+            products (list[dict]): The inserted product documents (with their "_id").
+
+        Returns:
+            int: The number of prefetches queued.
+        """
+        if not self.enabled:
+            return 0
+
+        products = [product for product in products if not product.get("isEnriched")]
+        if not products:
+            return 0
+
+        try:
+            allowed = await self._take_budget(user_id, len(products))
+        except PyMongoError as e:
+            # Prefetching is optional; the products are enriched in full later
+            logger.warning("Could not take prefetch budget for user %s: %s", user_id, e)
+            return 0
+        self.stats["over_budget"] += len(products) - allowed
+
+        queued = 0
+        for product in products[:allowed]:
+            key = (user_id, str(product["_id"]))
+            task = asyncio.create_task(self._run(user_id, {**product, "id": key[1]}))
+            self.tasks[key] = task
+            task.add_done_callback(lambda _, key=key: self.tasks.pop(key, None))
+            self.stats["scheduled"] += 1
+            queued += 1
+
+        return queued
+
+    async def _run(self, user_id: str, product: dict) -> None:
+        await enrichment_scheduler.acquire(user_id, background=True)
+        try:
+            with tracer.start_as_current_span("prefetch_product", attributes={"product.id": product["id"]}) as span:
+                enricher = AttributeEnricher(product)
+                deadline = Deadline(max(ENRICH_SEARCH_BUDGET_SECONDS, ENRICH_IMAGE_BUDGET_SECONDS))
+                inputs = await enricher.prefetch_inputs_async(deadline, MAX_IMAGE_BYTES)
+                span.set_attribute("prefetch.image_count", len(inputs["images"]))
+
+            with mongo_span("replace_one", prefetch_collection):
+                await prefetch_collection.replace_one(
+                    {"_id": ObjectId(product["id"])},
+                    {
+                        "user_id": user_id,
+                        "key": prefetch_key(product),
+                        "created_at": datetime.now(timezone.utc),
+                        **inputs,
+                    },
+                    upsert=True
+                )
+            self.stats["stored"] += 1
+        except Exception as e:
+            logger.warning("Prefetch failed for product %s: %s", product["id"], e, extra={"product_id": product["id"]})
+            self.stats["failed"] += 1
+        finally:
+            enrichment_scheduler.release(user_id, background=True)
+
+    async def load(self, user_id: str, product: dict) -> dict | None:
+        """
+        Return the prefetched inputs of a product, if they are fresh and the product has
+        not changed since they were prefetched.
+
+        Args:
+            user_id (str): The owner of the product.
+            product (dict): The product about to be enriched (with its "id").
+
+        Returns:
+            dict | None: {"grounding", "images"}, or None if nothing usable was prefetched.
+        """
+        try:
+            product_id = ObjectId(product.get("id"))
+        except (InvalidId, TypeError):
+            return None
+
+        with mongo_span("find_one", prefetch_collection):
+            prefetched = await prefetch_collection.find_one({
+                "_id": product_id,
+                "user_id": user_id,
+                "key": prefetch_key(product),
+                # The TTL monitor only runs every minute; do not trust anything older
+                "created_at": {"$gt": datetime.now(timezone.utc) - timedelta(seconds=PREFETCH_TTL_SECONDS)},
+            })
+
+        self.stats["hits" if prefetched else "misses"] += 1
+        return prefetched
+
+    def cancel(self, user_id: str, product_ids: list[str]) -> None:
+        """
+        Cancel the queued or running prefetches of products that are being enriched or deleted.
+        """
+        for product_id in product_ids:
+            task = self.tasks.get((user_id, product_id))
+            if task is not None:
+                task.cancel()
+                self.stats["cancelled"] += 1
+
+    async def discard(self, user_id: str, product_ids: list[str]) -> None:
+        """
+        Drop the prefetched inputs of products that were enriched or deleted.
+        """
+        object_ids = [ObjectId(product_id) for product_id in product_ids if ObjectId.is_valid(product_id)]
+        with mongo_span("delete_many", prefetch_collection):
+            await prefetch_collection.delete_many({"_id": {"$in": object_ids}, "user_id": user_id})
+
+    async def close(self) -> None:
+        """
+        Cancel outstanding prefetches (on shutdown).
+        """
+        tasks = list(self.tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def get_stats(self, user_id: str | None = None) -> dict:
+        """
+        Report prefetch counters, and the budget used by a user in the current window.
+        """
+        stats = {"enabled": self.enabled, "pending": len(self.tasks), **self.stats}
+        if user_id is not None:
+            stats["budget"] = {"used": await self._budget_used(user_id), "limit": self.user_budget}
+        return stats
+
+
+# Shared prefetcher for the products created in this process
+prefetcher = Prefetcher()
@@ -0,0 +1,262 @@
+import asyncio
+import math
+import statistics
+import time
+from collections import deque
+
+from app.core.config import (
+    ADAPTIVE_LIMIT_BACKOFF,
+    ADAPTIVE_LIMIT_ENABLED,
+    ADAPTIVE_LIMIT_INITIAL,
+    ADAPTIVE_LIMIT_LATENCY_TOLERANCE,
+    ADAPTIVE_LIMIT_MAX,
+    ADAPTIVE_LIMIT_MIN,
+)
+
+# Latency windows per call kind: recent calls (compared against) the typical latency of many calls
+RECENT_WINDOW = 20
+BASELINE_WINDOW = 500
+
+# Recent latencies needed before latency can lower the limit
+MIN_SAMPLES = 10
+
+# Limit changes kept for the metrics endpoint
+DECISION_LOG_SIZE = 100
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    """
+    Whether an error is a quota / rate-limit rejection (HTTP 429, RESOURCE_EXHAUSTED).
+    Covers google-genai's APIError (`code`) and google-api-core's ResourceExhausted.
+    """
+    code = getattr(error, "code", None) or getattr(error, "status_code", None)
+    try:
+        return int(code) == 429
+    except (TypeError, ValueError):
+        return type(error).__name__ in ("ResourceExhausted", "TooManyRequests")
+
+
+class AdaptiveLimiter:
+    def __init__(
+        self,
+        name: str,
+        enabled: bool = ADAPTIVE_LIMIT_ENABLED,
+        initial: float = ADAPTIVE_LIMIT_INITIAL,
+        min_limit: float = ADAPTIVE_LIMIT_MIN,
+        max_limit: float = ADAPTIVE_LIMIT_MAX,
+        tolerance: float = ADAPTIVE_LIMIT_LATENCY_TOLERANCE,
+        backoff: float = ADAPTIVE_LIMIT_BACKOFF,
+    ):
+        """
+        Initializes an AdaptiveLimiter, which caps the calls in flight to one model and
+        adapts the cap to what the backend can currently take (AIMD):
+
+        - Additive increase: every successful call that had to queue behind the limit (or
+          filled it) raises the limit by 1 / limit, i.e. about +1 per round of calls.
+        - Multiplicative decrease on a 429: the limit is multiplied by `backoff`.
+        - Gradient decrease on latency: when the median of the recent latencies exceeds
+          `tolerance` times the typical (long-window median) latency, the limit is scaled
+          by typical * tolerance / recent (but never below half). Latencies are tracked per
+          call kind (e.g. grounded search vs. extraction), since kinds sharing a model can
+          take very different times and a change in the mix of calls is not overload.
+
+        After a decrease, further decreases wait until the calls that were in flight at
+        that moment have finished, so one overload episode is only counted once.
+
+        Args:
+            name (str): Name used when reporting statistics (the model ID).
+            enabled (bool): Whether the limit is enforced; statistics are recorded either way.
+            initial (float): Starting limit.
+            min_limit (float): Lowest limit.
+            max_limit (float): Highest limit.
+            tolerance (float): Recent/typical latency ratio treated as overload.
+            backoff (float): Factor applied to the limit on a rate-limit error.
+        """
+        self.name = name
+        self.enabled = enabled
+        self.limit = float(min(max(initial, min_limit), max_limit))
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.backoff = backoff
+
+        self.in_flight = 0
+        self.waiters: deque[asyncio.Future] = deque()
+        self.recent: dict[str, deque] = {}
+        self.baseline: dict[str, deque] = {}
+        self.hold = 0  # Completions to wait for before the next decrease
+
+        self.decisions = deque(maxlen=DECISION_LOG_SIZE)
+        self.stats = {
+            "calls": 0,
+            "queued": 0,
+            "successes": 0,
+            "rate_limited": 0,
+            "errors": 0,
+            "increases": 0,
+            "decreases_latency": 0,
+            "decreases_rate_limited": 0,
+        }
+
+    def capacity(self) -> float:
+        return max(1, math.floor(self.limit)) if self.enabled else math.inf
+
+    def _grant(self) -> None:
+        while self.waiters and self.in_flight < self.capacity():
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    async def acquire(self) -> bool:
+        """
+        Wait for an in-flight slot. Every successful call must be paired with `release`.
+
+        Returns:
+            bool: Whether the limit was binding (the call queued or took the last slot).
+        """
+        self.stats["calls"] += 1
+        if self.in_flight < self.capacity() and not self.waiters:
+            self.in_flight += 1
+            return self.in_flight >= self.capacity()
+
+        self.stats["queued"] += 1
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was granted just as the caller gave up
+                self.release()
+            elif waiter in self.waiters:
+                # Not yet skipped by _grant
+                self.waiters.remove(waiter)
+            raise
+        return True
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        if self.hold:
+            self.hold -= 1
+        self._grant()
+
+    def _set_limit(self, limit: float, reason: str, **details) -> None:
+        before = self.limit
+        self.limit = min(max(limit, self.min_limit), self.max_limit)
+        if math.floor(before) != math.floor(self.limit):
+            self.decisions.append({
+                "time": time.time(),
+                "reason": reason,
+                "limit_before": round(before, 2),
+                "limit": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                **details,
+            })
+        self._grant()
+
+    def _decrease(self, factor: float, reason: str, **details) -> None:
+        if self.hold:
+            return
+        self.hold = self.in_flight
+        for recent in self.recent.values():
+            recent.clear()
+        self.stats[f"decreases_{reason}"] += 1
+        self._set_limit(self.limit * factor, reason, **details)
+
+    def on_success(self, latency: float, saturated: bool, kind: str = "default") -> None:
+        self.stats["successes"] += 1
+        recent_window = self.recent.setdefault(kind, deque(maxlen=RECENT_WINDOW))
+        baseline_window = self.baseline.setdefault(kind, deque(maxlen=BASELINE_WINDOW))
+        recent_window.append(latency)
+        baseline_window.append(latency)
+
+        if len(recent_window) >= MIN_SAMPLES:
+            recent = statistics.median(recent_window)
+            typical = statistics.median(baseline_window)
+            if recent > typical * self.tolerance:
+                self._decrease(
+                    max(0.5, typical * self.tolerance / recent), "latency",
+                    kind=kind, recent_ms=round(recent * 1000), typical_ms=round(typical * 1000)
+                )
+                return
+
+        if saturated:
+            self.stats["increases"] += 1
+            self._set_limit(self.limit + 1 / self.limit, "increase")
+
+    def on_error(self, error: BaseException) -> None:
+        if is_rate_limited(error):
+            self.stats["rate_limited"] += 1
+            self._decrease(self.backoff, "rate_limited", error=type(error).__name__)
+        else:
+            self.stats["errors"] += 1
+
+    async def call(self, factory, kind: str = "default"):
+        """
+        Run a call within the limit, and learn from its latency or error.
+
+        Args:
+            factory (Callable[[], Awaitable]): Creates the call once a slot is free.
+            kind (str): The kind of call; its latency is only compared with calls of the same kind.
+
+        Returns:
+            Any: The call's result.
+
+        Raises:
+            Exception: The call's error (cancellation is passed through without counting).
+        """
+        saturated = await self.acquire()
+        started = time.monotonic()
+        try:
+            result = await factory()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.on_error(e)
+            raise
+        else:
+            self.on_success(time.monotonic() - started, saturated, kind)
+            return result
+        finally:
+            self.release()
+
+    def get_stats(self) -> dict:
+        """
+        Returns:
+            dict: The current limit, slot usage, counters, latency summary per call kind and recent decisions.
+        """
+        return {
+            "enabled": self.enabled,
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "waiting": len(self.waiters),
+            **self.stats,
+            "latency_ms": {
+                kind: {
+                    "recent": round(statistics.median(self.recent[kind]) * 1000) if self.recent[kind] else None,
+                    "typical": round(statistics.median(baseline) * 1000),
+                }
+                for kind, baseline in self.baseline.items()
+            },
+            "decisions": list(self.decisions),
+        }
+
+
+# One limiter per model, shared by all agents calling it
+adaptive_limiters: dict[str, AdaptiveLimiter] = {}
+
+
+def get_adaptive_limiter(model_id: str) -> AdaptiveLimiter:
+    """
+    Return the shared AdaptiveLimiter for a model, creating it on first use.
+
+    Args:
+        model_id (str): The Gemini model ID.
+
+    Returns:
+        AdaptiveLimiter: The model's limiter.
+    """
+    if model_id not in adaptive_limiters:
+        adaptive_limiters[model_id] = AdaptiveLimiter(model_id)
+    return adaptive_limiters[model_id]
@@ -0,0 +1,291 @@
+import difflib
+import html
+import re
+from html.parser import HTMLParser
+
+# Value the agents use for attributes they could not determine
+NOT_FOUND = "Not Found"
+
+# Bounds matching the instructions in GeneratePrompts
+SHORT_TEXT_MAX_LENGTH = 50
+
+# Minimum similarity for a single_select answer to be mapped to one of the options
+OPTION_MATCH_CUTOFF = 0.8
+
+# Unit aliases -> (dimension, factor to the dimension's base unit)
+UNITS = {
+    "mm": ("length", 0.001), "millimeter": ("length", 0.001), "millimetre": ("length", 0.001),
+    "cm": ("length", 0.01), "centimeter": ("length", 0.01), "centimetre": ("length", 0.01),
+    "m": ("length", 1.0), "meter": ("length", 1.0), "metre": ("length", 1.0),
+    "in": ("length", 0.0254), "inch": ("length", 0.0254), "inches": ("length", 0.0254), '"': ("length", 0.0254),
+    "ft": ("length", 0.3048), "foot": ("length", 0.3048), "feet": ("length", 0.3048),
+    "mg": ("mass", 0.000001), "milligram": ("mass", 0.000001),
+    "g": ("mass", 0.001), "gram": ("mass", 0.001), "gr": ("mass", 0.001),
+    "kg": ("mass", 1.0), "kilogram": ("mass", 1.0), "kilo": ("mass", 1.0),
+    "oz": ("mass", 0.028349523), "ounce": ("mass", 0.028349523),
+    "lb": ("mass", 0.45359237), "lbs": ("mass", 0.45359237), "pound": ("mass", 0.45359237),
+    "ml": ("volume", 0.001), "milliliter": ("volume", 0.001), "millilitre": ("volume", 0.001),
+    "cl": ("volume", 0.01), "centiliter": ("volume", 0.01), "centilitre": ("volume", 0.01),
+    "l": ("volume", 1.0), "liter": ("volume", 1.0), "litre": ("volume", 1.0),
+    "fl oz": ("volume", 0.0295735), "floz": ("volume", 0.0295735),
+}
+
+# A number (with optional thousands separators or decimal comma) followed by an optional unit
+NUMBER_PATTERN = re.compile(r"(-?\d{1,3}(?:,\d{3})+(?:\.\d+)?|-?\d+(?:[.,]\d+)?)\s*(fl\.?\s?oz|[a-zA-Z]+|\")?")
+
+# What may separate the parts of a compound quantity ("1 ft 2 in", "2 lb, 3 oz", "5 ft and 4 in")
+COMPOUND_SEPARATOR = re.compile(r"\s*(?:,|\+|and)?\s*")
+
+# Tags kept by the rich_text sanitizer (all attributes are dropped)
+ALLOWED_TAGS = {"p", "br", "ul", "ol", "li", "strong", "em", "b", "i", "u", "h2", "h3", "h4", "blockquote"}
+# Tags whose content is dropped along with the tag
+DROPPED_CONTENT_TAGS = {"script", "style", "iframe", "object", "embed", "template"}
+VOID_TAGS = {"br"}
+
+
+def normalize_unit(unit: str) -> str:
+    unit = " ".join(unit.lower().replace(".", " ").split())
+    if unit not in UNITS and unit.endswith("s") and unit[:-1] in UNITS:
+        unit = unit[:-1]  # grams -> gram, liters -> liter
+    return unit
+
+
+def answer_key(name: str) -> str:
+    # "Net  Weight" and "net weight" name the same attribute
+    return " ".join(str(name).split()).casefold()
+
+
+def format_number(value: float) -> str:
+    """
+    Render a number without float noise or exponent notation (1.0 -> "1", 0.25 -> "0.25").
+    """
+    rounded = round(value, 3)
+    if rounded == int(rounded):
+        return str(int(rounded))
+    return f"{rounded:.3f}".rstrip("0").rstrip(".")
+
+
+def parse_number(number: str) -> float:
+    if re.fullmatch(r"-?\d{1,3}(?:,\d{3})+(?:\.\d+)?", number):
+        return float(number.replace(",", ""))  # 1,000 -> 1000
+    return float(number.replace(",", "."))  # 1,5 -> 1.5
+
+
+def is_compound_part(previous_unit: str, unit: str, separator: str) -> bool:
+    """
+    Whether "<number> <unit>" continues a compound quantity ending in `previous_unit`:
+    a smaller unit of the same dimension, right after it ("1 ft 2 in", not "5 in (14 cm)").
+    """
+    return (
+        previous_unit in UNITS
+        and unit in UNITS
+        and UNITS[unit][0] == UNITS[previous_unit][0]
+        and UNITS[unit][1] < UNITS[previous_unit][1]
+        and COMPOUND_SEPARATOR.fullmatch(separator) is not None
+    )
+
+
+def parse_quantity(value: str) -> tuple[float, str] | None:
+    """
+    Parse the "<number> <unit>" in a string. A compound quantity ("1 ft 2 in",
+    "2 lb 3 oz") is added up and expressed in its first unit.
+
+    Returns:
+        tuple[float, str] | None: The number and the (normalized, possibly empty) unit,
+        or None if the string holds no number.
+
+    Raises:
+        ValueError: If the string holds several quantities that are not one compound
+            quantity (e.g. "10 x 20 cm" or "250 ml (8.4 fl oz)").
+    """
+    matches = list(NUMBER_PATTERN.finditer(value))
+    if not matches:
+        return None
+
+    number = parse_number(matches[0].group(1))
+    unit = previous_unit = normalize_unit(matches[0].group(2) or "")
+    for before, match in zip(matches, matches[1:]):
+        part_unit = normalize_unit(match.group(2) or "")
+        if not is_compound_part(previous_unit, part_unit, value[before.end():match.start()]):
+            raise ValueError(f"expected a single quantity, got several in '{value}'")
+        number += parse_number(match.group(1)) * UNITS[part_unit][1] / UNITS[unit][1]
+        previous_unit = part_unit
+
+    return number, unit
+
+
+class HTMLSanitizer(HTMLParser):
+    def __init__(self):
+        """
+        Rebuilds HTML keeping only ALLOWED_TAGS (without attributes) and escaped text.
+        """
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.open_tags = []
+        self.dropping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROPPED_CONTENT_TAGS:
+            self.dropping += 1
+        elif not self.dropping and tag in ALLOWED_TAGS:
+            self.parts.append(f"<{tag}>")
+            if tag not in VOID_TAGS:
+                self.open_tags.append(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROPPED_CONTENT_TAGS:
+            self.dropping = max(0, self.dropping - 1)
+        elif not self.dropping and tag in self.open_tags:
+            # Close any unclosed tags nested inside this one
+            while self.open_tags:
+                open_tag = self.open_tags.pop()
+                self.parts.append(f"</{open_tag}>")
+                if open_tag == tag:
+                    break
+
+    def handle_data(self, data):
+        if not self.dropping:
+            self.parts.append(html.escape(data, quote=False))
+
+    def result(self) -> str:
+        self.close()
+        return "".join(self.parts) + "".join(f"</{tag}>" for tag in reversed(self.open_tags))
+
+
+def sanitize_html(value: str) -> str:
+    sanitizer = HTMLSanitizer()
+    sanitizer.feed(value)
+    return sanitizer.result().strip()
+
+
+class AttributeValidator:
+    def __init__(self, attribute_specs: list[dict]):
+        """
+        Initializes the AttributeValidator, which checks and normalizes model answers
+        locally against the attribute definitions used by GeneratePrompts.
+
+        Args:
+            attribute_specs (list[dict]): Attribute definitions with name, type, unit and options.
+        """
+        self.specs = {spec["name"]: spec for spec in attribute_specs}
+
+    def validate_measure(self, value, spec: dict) -> str:
+        """
+        Parse a measurement and convert it to the attribute's unit (e.g. "1.2 kg" -> "1200 g").
+        """
+        quantity = parse_quantity(str(value))
+        if quantity is None:
+            raise ValueError("expected a number with a unit")
+
+        number, unit = quantity
+        target = spec.get("unit")
+        if not target:
+            return f"{format_number(number)} {unit}".strip()
+
+        target_unit = normalize_unit(target)
+        if not unit or unit == target_unit:
+            return f"{format_number(number)} {target}"
+        if unit in UNITS and target_unit in UNITS and UNITS[unit][0] == UNITS[target_unit][0]:
+            converted = number * UNITS[unit][1] / UNITS[target_unit][1]
+            return f"{format_number(converted)} {target}"
+        raise ValueError(f"unit '{unit}' cannot be converted to '{target}'")
+
+    def validate_number(self, value, spec: dict) -> str:
+        if spec.get("unit"):
+            return self.validate_measure(value, spec)
+        quantity = parse_quantity(str(value))
+        if quantity is None:
+            raise ValueError("expected a number")
+        return format_number(quantity[0])
+
+    def validate_single_select(self, value, spec: dict) -> str:
+        """
+        Map the answer to one of the options, tolerating case and small spelling differences.
+        """
+        options = spec.get("options") or []
+        by_key = {option.strip().lower(): option for option in options}
+        answer = str(value).strip().lower()
+        if answer in by_key:
+            return by_key[answer]
+
+        close = difflib.get_close_matches(answer, list(by_key), n=1, cutoff=OPTION_MATCH_CUTOFF)
+        if close:
+            return by_key[close[0]]
+        raise ValueError(f"'{value}' is not one of the options: {', '.join(options)}")
+
+    def validate_short_text(self, value, spec: dict) -> str:
+        text = " ".join(str(value).split())
+        if not text:
+            raise ValueError("expected non-empty text")
+        if len(text) >= SHORT_TEXT_MAX_LENGTH:
+            raise ValueError(f"expected fewer than {SHORT_TEXT_MAX_LENGTH} characters, got {len(text)}")
+        return text
+
+    def validate_long_text(self, value, spec: dict) -> str:
+        text = "\n".join(value) if isinstance(value, list) else str(value)
+        if not text.strip():
+            raise ValueError("expected non-empty text")
+        return text.strip()
+
+    def validate_rich_text(self, value, spec: dict) -> str:
+        text = sanitize_html(str(value))
+        if not re.sub(r"<[^>]+>", "", text).strip():
+            raise ValueError("expected non-empty HTML content")
+        return text
+
+    def validate_multiple_values(self, value, spec: dict) -> list[str]:
+        items = value if isinstance(value, list) else re.split(r"[,;\n]", str(value))
+        values = list(dict.fromkeys(" ".join(str(item).split()) for item in items))
+        values = [item for item in values if item]
+        if not values:
+            raise ValueError("expected at least one value")
+        return values
+
+    def validate_value(self, name: str, value):
+        """
+        Validate and normalize one attribute value.
+
+        Returns:
+            The normalized value ("Not Found" is passed through).
+
+        Raises:
+            ValueError: With the reason the value is invalid.
+        """
+        if value is None or value == "" or value == NOT_FOUND:
+            return NOT_FOUND
+
+        spec = self.specs[name]
+        validator = getattr(self, f"validate_{(spec.get('type') or '').lower()}", None)
+        return validator(value, spec) if validator else value
+
+    def validate(self, values: dict) -> tuple[dict, dict]:
+        """
+        Validate a model answer against all attribute definitions.
+
+        Answer keys are matched to attribute names ignoring case and whitespace, since the
+        prompt shows the names title-cased ("net weight" is asked for as "Net Weight").
+
+        Args:
+            values (dict): The parsed model output keyed by attribute name.
+
+        Returns:
+            tuple[dict, dict]: The normalized valid values, and for every invalid or
+            missing attribute a {"value", "reason"} entry keyed by attribute name.
+            Keys that are not requested attributes are dropped.
+        """
+        answers = {answer_key(key): value for key, value in values.items()}
+        # An exact match wins over a differently-cased duplicate
+        answers.update({answer_key(name): values[name] for name in self.specs if name in values})
+
+        valid, failures = {}, {}
+        for name in self.specs:
+            key = answer_key(name)
+            if key not in answers:
+                failures[name] = {"value": None, "reason": "missing from the answer"}
+                continue
+            try:
+                valid[name] = self.validate_value(name, answers[key])
+            except ValueError as e:
+                failures[name] = {"value": answers[key], "reason": str(e)}
+
+        return valid, failures
@@ -0,0 +1,71 @@
+import asyncio
+import time
+
+
+class StageTimeout(Exception):
+    """
+    Raised when an enrichment stage does not finish within its budget.
+    """
+    def __init__(self, stage: str, budget: float):
+        super().__init__(f"{stage} stage exceeded its {budget:.1f}s budget")
+        self.stage = stage
+        self.budget = budget
+
+
+class Deadline:
+    def __init__(self, seconds: float):
+        """
+        Initializes an end-to-end deadline that expires `seconds` from now.
+
+        Args:
+            seconds (float): Total time available.
+        """
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        """
+        Returns:
+            float: Seconds left before the deadline (never negative).
+        """
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        """
+        Returns:
+            bool: True once the deadline has passed.
+        """
+        return self.remaining() <= 0
+
+    def budget(self, stage_seconds: float) -> float:
+        """
+        Clip a stage budget so the stage cannot outlive the overall deadline.
+
+        Args:
+            stage_seconds (float): The configured budget for the stage.
+
+        Returns:
+            float: The effective budget in seconds.
+        """
+        return min(stage_seconds, self.remaining())
+
+    async def run(self, stage: str, awaitable, stage_seconds: float):
+        """
+        Await a stage under its (clipped) budget, cancelling it when the budget runs out.
+
+        Args:
+            stage (str): Stage name used in the timeout error.
+            awaitable: The coroutine or future performing the stage.
+            stage_seconds (float): The configured budget for the stage.
+
+        Returns:
+            Any: The result of the stage.
+
+        Raises:
+            StageTimeout: If the stage did not finish within its budget.
+        """
+        budget = self.budget(stage_seconds)
+        try:
+            return await asyncio.wait_for(awaitable, timeout=budget)
+        except asyncio.TimeoutError:
+            raise StageTimeout(stage, budget) from None
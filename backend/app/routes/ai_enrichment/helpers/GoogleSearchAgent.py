@@ -4,16 +4,23 @@ from google import genai
 from google.genai.types import Tool, GenerateContentConfig, GoogleSearch
 import os
 from dotenv import load_dotenv
+from .AdaptiveLimiter import get_adaptive_limiter
+from .HedgedCaller import get_hedged_caller
+from app.core.tracing import record_token_usage, tracer
 
 # Load environment variables from .env file
 load_dotenv()
 
 class GoogleSearchAgent:
-    def __init__(self):
+    def __init__(self, single_pass: bool = False):
         """
         Initialize the GoogleSearchAgent with the required project and location.
         Sets up the Google GenAI client and defines the model ID.
+
+        Args:
+            single_pass (bool, optional): Ask for the answer once, without the self-validation pass. Default is False.
         """
+        self.single_pass = single_pass
         PROJECT_ID = os.getenv("PROJECT_ID")  # Get project ID from environment variable
         LOCATION = os.getenv("LOCATION")  # Get location from environment variable
 
@@ -59,7 +66,13 @@ class GoogleSearchAgent:
         """
 
         # Instructions for validating and correcting the response
-        prompt += """
+        if self.single_pass:
+            # Values are validated locally afterwards, so the model answers only once
+            prompt += """
+            Output the JSON only, annotated with markdown.
+        """
+        else:
+            prompt += """
             Next, treat the returned JSON as the result generated by a different model.
             Validate each key-value pair against the provided information.
             If any key-value pair is incorrect, correct it.
@@ -89,10 +102,53 @@ class GoogleSearchAgent:
         response = self.client.models.generate_content(
             model=self.model_id,
             contents=prompt,
-            config=GenerateContentConfig(
-                tools=[self.google_search_tool],  # Use the Google search tool
-                response_modalities=["TEXT"],  # Expect the response in text format
-            )
+            config=self.content_config()
         )
         
         return response
+
+    async def generate_response_async(self, product_name, brand, attribute_prompt, barcode=None):
+        """
+        Async variant of `generate_response`. Cancelling the awaiting task cancels the
+        underlying HTTP request, which is what the enrichment stage budgets rely on.
+        Slow calls are hedged when HEDGE_ENABLED is set, and every attempt waits for a
+        slot of the model's adaptive concurrency limit.
+
+        Args:
+            product_name (str): The name of the product.
+            brand (str): The brand of the product.
+            attribute_prompt (str): The list of attributes to be enriched.
+            barcode (str, optional): The barcode of the product. Defaults to None.
+
+        Returns:
+            dict: The response generated by the Google GenAI model.
+        """
+        prompt = self.format_prompt(product_name, brand, attribute_prompt, barcode)
+
+        with tracer.start_as_current_span("google_search_agent.generate", attributes={"gen_ai.request.model": self.model_id}) as span:
+            limiter = get_adaptive_limiter(self.model_id)
+            response = await get_hedged_caller("google_search").call(
+                lambda: limiter.call(
+                    lambda: self.client.aio.models.generate_content(
+                        model=self.model_id,
+                        contents=prompt,
+                        config=self.content_config()
+                    ),
+                    kind="google_search"
+                )
+            )
+            record_token_usage(span, response)
+
+        return response
+
+    def content_config(self) -> GenerateContentConfig:
+        """
+        Build the generation config shared by the sync and async calls.
+
+        Returns:
+            GenerateContentConfig: Config enabling the Google search tool with text output.
+        """
+        return GenerateContentConfig(
+            tools=[self.google_search_tool],  # Use the Google search tool
+            response_modalities=["TEXT"],  # Expect the response in text format
+        )
@@ -0,0 +1,180 @@
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+
+from app.core.config import (
+    HEDGE_ENABLED,
+    HEDGE_MAX_RATIO,
+    HEDGE_MIN_SAMPLES,
+    HEDGE_PERCENTILE,
+    HEDGE_WINDOW,
+)
+
+
+class HedgedCaller:
+    def __init__(
+        self,
+        name: str,
+        enabled: bool = HEDGE_ENABLED,
+        percentile: float = HEDGE_PERCENTILE,
+        max_ratio: float = HEDGE_MAX_RATIO,
+        min_samples: int = HEDGE_MIN_SAMPLES,
+        window: int = HEDGE_WINDOW,
+    ):
+        """
+        Initializes a HedgedCaller, which issues a duplicate ("hedge") of a slow call once it
+        has been outstanding longer than a percentile of recently observed latencies.
+        The first successful result wins and the other call is cancelled.
+
+        The latency window holds the primary attempts' latencies only. A primary that is
+        cancelled (because its hedge won, or the caller gave up) is recorded with the
+        time it had been running, a lower bound of its latency; leaving those slow calls
+        out would bias the percentile low and make hedges fire more and more often.
+
+        Args:
+            name (str): Name used when reporting statistics (e.g. the agent name).
+            enabled (bool): Whether hedging is active; latencies are recorded either way.
+            percentile (float): Latency percentile (0-100) after which a hedge is issued.
+            max_ratio (float): Maximum fraction of calls that may be hedged.
+            min_samples (int): Number of latency samples required before hedging starts.
+            window (int): Number of recent latencies kept for the percentile.
+        """
+        self.name = name
+        self.enabled = enabled
+        self.percentile = percentile
+        self.max_ratio = max_ratio
+        self.min_samples = min_samples
+
+        self.latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.stats = {
+            "calls": 0,
+            "hedges_fired": 0,
+            "hedges_won": 0,
+            "hedges_skipped_budget": 0,
+            "censored_samples": 0,
+        }
+
+    def hedge_delay(self) -> float | None:
+        """
+        Compute how long to wait before hedging, from the recent latency window.
+
+        Returns:
+            float | None: The delay in seconds, or None if there are not enough samples yet.
+        """
+        with self._lock:
+            if len(self.latencies) < self.min_samples:
+                return None
+            ordered = sorted(self.latencies)
+
+        index = min(len(ordered) - 1, math.ceil(self.percentile / 100 * len(ordered)) - 1)
+        return ordered[max(0, index)]
+
+    def _record(self, latency: float, censored: bool = False) -> None:
+        with self._lock:
+            self.latencies.append(latency)
+            if censored:
+                self.stats["censored_samples"] += 1
+
+    def _try_reserve_hedge(self) -> bool:
+        """
+        Reserve a hedge if doing so keeps hedged calls within `max_ratio` of all calls.
+        """
+        with self._lock:
+            if self.stats["hedges_fired"] + 1 > self.max_ratio * self.stats["calls"]:
+                self.stats["hedges_skipped_budget"] += 1
+                return False
+            self.stats["hedges_fired"] += 1
+            return True
+
+    def get_stats(self) -> dict:
+        """
+        Returns:
+            dict: Call and hedge counters plus the current hedge delay.
+        """
+        delay = self.hedge_delay()
+        with self._lock:
+            stats = dict(self.stats)
+        stats["enabled"] = self.enabled
+        stats["hedge_delay_seconds"] = round(delay, 3) if delay is not None else None
+        stats["hedge_rate"] = round(stats["hedges_fired"] / stats["calls"], 4) if stats["calls"] else 0.0
+        stats["hedge_win_rate"] = round(stats["hedges_won"] / stats["hedges_fired"], 4) if stats["hedges_fired"] else 0.0
+        return stats
+
+    async def call(self, factory):
+        """
+        Run a call, hedging it if it is slower than usual.
+
+        Args:
+            factory (Callable[[], Awaitable]): Creates a new attempt of the call each time it is invoked.
+
+        Returns:
+            Any: The result of the first attempt to succeed.
+
+        Raises:
+            Exception: The primary attempt's error if every attempt failed.
+        """
+        with self._lock:
+            self.stats["calls"] += 1
+
+        started = time.monotonic()
+        primary = asyncio.ensure_future(factory())
+        attempts = {primary: started}
+
+        def record_primary(attempt: asyncio.Future) -> None:
+            if not attempt.cancelled() and attempt.exception() is None:
+                self._record(time.monotonic() - started)
+
+        primary.add_done_callback(record_primary)
+
+        try:
+            delay = self.hedge_delay() if self.enabled else None
+            if delay is not None:
+                await asyncio.wait({primary}, timeout=delay)
+                if not primary.done() and self._try_reserve_hedge():
+                    attempts[asyncio.ensure_future(factory())] = time.monotonic()
+
+            pending = set(attempts)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in done:
+                    if attempt.cancelled() or attempt.exception() is not None:
+                        continue
+                    if attempt is not primary:
+                        with self._lock:
+                            self.stats["hedges_won"] += 1
+                    return attempt.result()
+
+            # Every attempt failed: surface the primary's error
+            return primary.result()
+        finally:
+            if not primary.done():
+                # Lost to the hedge or given up on: it would have taken at least this long
+                self._record(time.monotonic() - started, censored=True)
+            # Cancel the losing attempt (and everything, if the caller itself was cancelled)
+            for attempt in attempts:
+                if not attempt.done():
+                    attempt.cancel()
+                elif not attempt.cancelled():
+                    attempt.exception()  # Mark a losing attempt's error as retrieved
+
+
+# One caller per agent so latency windows and statistics are kept separately
+hedged_callers: dict[str, HedgedCaller] = {}
+
+
+def get_hedged_caller(name: str) -> HedgedCaller:
+    """
+    Return the shared HedgedCaller for an agent, creating it on first use.
+
+    Args:
+        name (str): The agent name.
+
+    Returns:
+        HedgedCaller: The agent's hedged caller.
+    """
+    if name not in hedged_callers:
+        hedged_callers[name] = HedgedCaller(name)
+    return hedged_callers[name]
@@ -0,0 +1,262 @@
+import hashlib
+import io
+import logging
+import math
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from PIL import Image, ImageOps
+
+from app.core.config import (
+    IMAGE_CACHE_SIZE,
+    IMAGE_MAX_DIMENSION,
+    IMAGE_OUTPUT_FORMAT,
+    IMAGE_OUTPUT_QUALITY,
+)
+
+logger = logging.getLogger(__name__)
+
+# Gemini bills images as 258 tokens when both sides are <= 384px,
+# otherwise as 258 tokens per 768x768 tile.
+TOKENS_PER_TILE = 258
+SMALL_IMAGE_SIDE = 384
+TILE_SIDE = 768
+
+# MIME types for the formats we can re-encode to
+OUTPUT_MIME_TYPES = {
+    "WEBP": "image/webp",
+    "JPEG": "image/jpeg",
+    "PNG": "image/png",
+}
+
+# EXIF tag holding the orientation (1 = upright)
+EXIF_ORIENTATION = 0x0112
+
+
+def sniff_mime_type(data: bytes) -> str | None:
+    """
+    Detect the image MIME type from the leading "magic" bytes of the file.
+
+    Args:
+        data (bytes): The raw image bytes.
+
+    Returns:
+        str | None: The detected MIME type, or None if the format is not recognised.
+    """
+    if data.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if data.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data[4:8] == b"ftyp" and data[8:12] in (b"heic", b"heix", b"mif1", b"msf1"):
+        return "image/heic"
+    if data.startswith(b"BM"):
+        return "image/bmp"
+    return None
+
+
+def estimate_image_tokens(width: int, height: int) -> int:
+    """
+    Estimate the number of input tokens Gemini charges for an image of the given size.
+
+    Args:
+        width (int): Image width in pixels.
+        height (int): Image height in pixels.
+
+    Returns:
+        int: The estimated token count.
+    """
+    if width <= SMALL_IMAGE_SIDE and height <= SMALL_IMAGE_SIDE:
+        return TOKENS_PER_TILE
+    return math.ceil(width / TILE_SIDE) * math.ceil(height / TILE_SIDE) * TOKENS_PER_TILE
+
+
+@dataclass
+class NormalizedImage:
+    """
+    Result of normalizing one image, with before/after sizes for reporting.
+    `passthrough` images could not be decoded and are sent as they are.
+    """
+    data: bytes
+    mime_type: str
+    original_bytes: int
+    original_tokens: int
+    tokens: int
+    passthrough: bool = False
+
+    @property
+    def num_bytes(self) -> int:
+        return len(self.data)
+
+
+class ImageNormalizer:
+    def __init__(
+        self,
+        max_dimension: int = IMAGE_MAX_DIMENSION,
+        output_format: str = IMAGE_OUTPUT_FORMAT,
+        quality: int = IMAGE_OUTPUT_QUALITY,
+        cache_size: int = IMAGE_CACHE_SIZE,
+    ):
+        """
+        Initializes the ImageNormalizer, which downscales, re-encodes and strips metadata
+        from product images before they are sent to the model (small images that are
+        already more compact than their re-encoding are sent as they are).
+
+        Args:
+            max_dimension (int): Longest allowed side in pixels.
+            output_format (str): Pillow format name to re-encode to (WEBP, JPEG or PNG).
+            quality (int): Encoder quality for lossy formats.
+            cache_size (int): Number of normalized images kept in the in-memory cache.
+        """
+        if output_format not in OUTPUT_MIME_TYPES:
+            raise ValueError(f"Unsupported image output format: {output_format}")
+
+        self.max_dimension = max_dimension
+        self.output_format = output_format
+        self.quality = quality
+        self.cache_size = cache_size
+
+        self._cache: OrderedDict[str, NormalizedImage] = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {
+            "images": 0,
+            "cache_hits": 0,
+            "passthrough": 0,
+            "bytes_in": 0,
+            "bytes_out": 0,
+            "tokens_in": 0,
+            "tokens_out": 0,
+        }
+
+    def _cache_key(self, data: bytes) -> str:
+        """
+        Key the cache by content hash plus the settings that affect the output.
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        return f"{digest}:{self.max_dimension}:{self.output_format}:{self.quality}"
+
+    def _encode(self, image: Image.Image) -> bytes:
+        """
+        Re-encode a decoded image in the configured output format, without metadata.
+
+        Args:
+            image (Image.Image): The decoded (and already downscaled) image.
+
+        Returns:
+            bytes: The encoded image.
+        """
+        has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+
+        if self.output_format == "JPEG":
+            if has_alpha:
+                # JPEG has no alpha channel: flatten transparent areas onto white
+                rgba = image.convert("RGBA")
+                background = Image.new("RGB", rgba.size, (255, 255, 255))
+                background.paste(rgba, mask=rgba.getchannel("A"))
+                image = background
+            else:
+                image = image.convert("RGB")
+        else:
+            image = image.convert("RGBA" if has_alpha else "RGB")
+
+        buffer = io.BytesIO()
+        # Saving a fresh image without exif/icc arguments drops all metadata
+        image.save(buffer, format=self.output_format, quality=self.quality, optimize=True)
+        return buffer.getvalue()
+
+    def _normalize(self, data: bytes) -> NormalizedImage:
+        """
+        Decode, downscale and re-encode an image. Keeps the original bytes if the image
+        did not need downscaling or rotating and re-encoding would not make it smaller,
+        and falls back to them (with the sniffed MIME type) if it cannot be decoded.
+        """
+        try:
+            with Image.open(io.BytesIO(data)) as opened:
+                opened.seek(0)  # Use the first frame of animated images
+                original_size = opened.size
+                reusable = (
+                    sniff_mime_type(data) in OUTPUT_MIME_TYPES.values()
+                    and getattr(opened, "n_frames", 1) == 1
+                    and opened.getexif().get(EXIF_ORIENTATION, 1) == 1
+                )
+
+                # Apply the EXIF orientation before the EXIF block is dropped
+                image = ImageOps.exif_transpose(opened)
+                image.thumbnail((self.max_dimension, self.max_dimension), Image.Resampling.LANCZOS)
+
+                encoded = self._encode(image)
+                size = image.size
+        except Exception as e:
+            logger.warning("Image normalization failed, sending original bytes: %s", e)
+            return NormalizedImage(
+                data=data,
+                mime_type=sniff_mime_type(data) or "image/jpeg",
+                original_bytes=len(data),
+                original_tokens=0,
+                tokens=0,
+                passthrough=True,
+            )
+
+        if reusable and size == original_size and len(encoded) >= len(data):
+            # Already small and well compressed (e.g. a small JPEG): re-encoding only adds bytes
+            return NormalizedImage(
+                data=data,
+                mime_type=sniff_mime_type(data),
+                original_bytes=len(data),
+                original_tokens=estimate_image_tokens(*original_size),
+                tokens=estimate_image_tokens(*size),
+            )
+
+        return NormalizedImage(
+            data=encoded,
+            mime_type=OUTPUT_MIME_TYPES[self.output_format],
+            original_bytes=len(data),
+            original_tokens=estimate_image_tokens(*original_size),
+            tokens=estimate_image_tokens(*size),
+        )
+
+    def normalize(self, data: bytes) -> NormalizedImage:
+        """
+        Normalize raw image bytes, serving repeated images from the content-hash cache.
+
+        Args:
+            data (bytes): The raw image bytes as downloaded or read from disk.
+
+        Returns:
+            NormalizedImage: The normalized image and its before/after byte and token counts.
+        """
+        key = self._cache_key(data)
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.stats["cache_hits"] += 1
+
+        if cached is None:
+            cached = self._normalize(data)
+            with self._lock:
+                self._cache[key] = cached
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        with self._lock:
+            self.stats["images"] += 1
+            if cached.passthrough:
+                # Unknown token counts: keep them out of the before/after totals
+                self.stats["passthrough"] += 1
+            else:
+                self.stats["bytes_in"] += cached.original_bytes
+                self.stats["bytes_out"] += cached.num_bytes
+                self.stats["tokens_in"] += cached.original_tokens
+                self.stats["tokens_out"] += cached.tokens
+
+        return cached
+
+
+# Shared instance so the cache and statistics span all enrichment requests
+image_normalizer = ImageNormalizer()
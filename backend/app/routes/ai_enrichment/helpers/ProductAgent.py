@@ -1,6 +1,10 @@
 from vertexai.preview.generative_models import GenerationConfig, GenerativeModel, Part
+import json
 import os
 from dotenv import load_dotenv
+from .AdaptiveLimiter import get_adaptive_limiter
+from .HedgedCaller import get_hedged_caller
+from app.core.tracing import record_token_usage, tracer
 
 # Load environment variables from .env file
 load_dotenv()
@@ -11,6 +15,7 @@ class ProductAgent:
         gemini_model_version: str, 
         temperature: float = 0.0,
         max_output_tokens: int = 8192, 
+        single_pass: bool = False,
     ):
         """
         Initializes the ProductAgent with the provided model version, temperature, and max output tokens.
@@ -20,10 +25,14 @@ class ProductAgent:
             gemini_model_version (str): The version of the Gemini model to use.
             temperature (float, optional): Sampling temperature for the model. Default is 0.0.
             max_output_tokens (int, optional): Maximum number of output tokens. Default is 8192.
+            single_pass (bool, optional): Ask for the answer once, without the self-validation pass. Default is False.
         """
+        self.single_pass = single_pass
         PROJECT_ID = os.getenv("PROJECT_ID")  # Get project ID from environment variables
         LOCATION = os.getenv("LOCATION")  # Get location from environment variables
         
+        self.model_id = gemini_model_version  # Kept for tracing and metrics
+
         import vertexai
         
         # Initialize Vertex AI with the project ID and location
@@ -85,7 +94,11 @@ class ProductAgent:
         2. Tailor your response to the specific product.
         3. If information is not available, return "Not Found". Do not speculate.
         4. Return a valid JSON object with all requested attribute keys.
-    
+        """
+
+        # In single-pass mode the values are validated locally instead of by the model
+        if not self.single_pass:
+            prompt += """
         Then:
         - Treat the output JSON as generated by a different model.
         - Validate each key-value pair.
@@ -95,6 +108,103 @@ class ProductAgent:
     
         return prompt.strip()  # Strip leading/trailing whitespace from the prompt text
 
+    def format_repair_prompt(
+        self, product_name, brand, product_info, attribute_prompt, failures: dict, has_images=False, barcode=None
+    ) -> str:
+        """
+        Format a follow-up prompt asking again for attributes whose values failed validation.
+        It carries the same evidence as the first request (search information and images),
+        so the corrected values can be read from it rather than guessed.
+
+        Args:
+            product_name (str): The name of the product.
+            brand (str): The brand of the product.
+            product_info (str): The Google Search information the first answer was based on.
+            attribute_prompt (str): The instructions for the failed attributes only.
+            failures (dict): {"value", "reason"} of each failed attribute, keyed by attribute name.
+            has_images (bool, optional): Flag to indicate if images are provided. Defaults to False.
+            barcode (str, optional): The barcode of the product. Defaults to None.
+
+        Returns:
+            str: The formatted prompt string.
+        """
+        rejected = "\n".join(
+            f"- {name}: {json.dumps(failure['value'])} ({failure['reason']})" for name, failure in failures.items()
+        )
+        prompt = f"""
+        Product Name: {product_name}
+        Product Brand: {brand}
+        """
+
+        if barcode:
+            prompt += f"\nBarcode: {barcode}\n"
+
+        prompt += f"""
+        Google Search Information:
+        {product_info}
+
+        These attribute values were rejected:
+        {rejected}
+
+        Requested Attributes:
+        {attribute_prompt}
+
+        Use the Google Search info {"and the provided image(s)" if has_images else ""} to determine corrected values that follow the instructions.
+        Return a valid JSON object with only these attribute keys.
+        If a value cannot be determined, return "Not Found". Do not speculate.
+        """
+
+        return prompt.strip()
+
+    async def repair_async(
+        self,
+        product_brand: str,
+        product_name: str,
+        product_info: str,
+        attribute_prompt: str,
+        failures: dict,
+        image_parts=None,
+        barcode=None
+    ):
+        """
+        Ask again for the attributes that failed local validation (single-pass mode).
+
+        Args:
+            product_brand (str): The brand of the product.
+            product_name (str): The name of the product.
+            product_info (str): The Google Search information the first answer was based on.
+            attribute_prompt (str): The instructions for the failed attributes only.
+            failures (dict): {"value", "reason"} of each failed attribute, keyed by attribute name.
+            image_parts (list, optional): The image parts sent with the first request. Defaults to None.
+            barcode (str, optional): The barcode of the product. Defaults to None.
+
+        Returns:
+            The generated response from the model.
+        """
+        prompt_text = self.format_repair_prompt(
+            product_name, product_brand, product_info, attribute_prompt, failures,
+            has_images=bool(image_parts), barcode=barcode
+        )
+        input_parts = (image_parts or []) + [Part.from_text(prompt_text)]
+
+        with tracer.start_as_current_span(
+            "product_agent.repair",
+            attributes={"gen_ai.request.model": self.model_id, "enrichment.repair_count": len(failures)}
+        ) as span:
+            limiter = get_adaptive_limiter(self.model_id)
+            response = await get_hedged_caller("product_repair").call(
+                lambda: limiter.call(
+                    lambda: self.gemini_model.generate_content_async(
+                        contents=input_parts,
+                        generation_config={"response_mime_type": "application/json"}
+                    ),
+                    kind="product_repair"
+                )
+            )
+            record_token_usage(span, response)
+
+        return response
+
     def generate_response(
         self,
         product_brand: str,
@@ -118,8 +228,72 @@ class ProductAgent:
         Returns:
             str: The generated response from the model.
         """
+        # Request a response from the model using the generated content
+        response = self.gemini_model.generate_content(
+            **self.request_kwargs(product_brand, product_name, product_info, attribute_prompt, image_parts, barcode)
+        )
+        
+        return response  # Return the generated response
+
+    async def generate_response_async(
+        self,
+        product_brand: str,
+        product_name: str,
+        product_info: str,
+        attribute_prompt: str,
+        image_parts=None,
+        barcode=None
+    ):
+        """
+        Async variant of `generate_response`. Cancelling the awaiting task cancels the
+        underlying request, which is what the enrichment stage budgets rely on.
+        Slow calls are hedged when HEDGE_ENABLED is set, and every attempt waits for a
+        slot of the model's adaptive concurrency limit.
+
+        Args:
+            product_brand (str): The brand of the product.
+            product_name (str): The name of the product.
+            product_info (str): Additional product information, such as description or specifications.
+            attribute_prompt (str): The list of attributes to be enriched.
+            image_parts (list, optional): List of image parts for the product (if any). Defaults to None.
+            barcode (str, optional): The barcode of the product. Defaults to None.
+
+        Returns:
+            The generated response from the model.
+        """
+        request = self.request_kwargs(product_brand, product_name, product_info, attribute_prompt, image_parts, barcode)
+
+        with tracer.start_as_current_span(
+            "product_agent.generate",
+            attributes={"gen_ai.request.model": self.model_id, "product.image_count": len(image_parts or [])}
+        ) as span:
+            limiter = get_adaptive_limiter(self.model_id)
+            response = await get_hedged_caller("product").call(
+                lambda: limiter.call(lambda: self.gemini_model.generate_content_async(**request), kind="product")
+            )
+            record_token_usage(span, response)
+
+        return response
+
+    def request_kwargs(
+        self,
+        product_brand: str,
+        product_name: str,
+        product_info: str,
+        attribute_prompt: str,
+        image_parts=None,
+        barcode=None
+    ) -> dict:
+        """
+        Build the `generate_content` arguments shared by the sync and async calls.
+
+        Returns:
+            dict: The contents and generation config for the request.
+        """
         # Format the prompt with the provided product details
-        prompt_text = self.format_prompt(product_name, product_brand, product_info, attribute_prompt, barcode)
+        prompt_text = self.format_prompt(
+            product_name, product_brand, product_info, attribute_prompt, has_images=bool(image_parts), barcode=barcode
+        )
         prompt_part = Part.from_text(prompt_text)  # Create a Part from the prompt text
 
         # Include image parts in the input if provided
@@ -142,13 +316,10 @@ class ProductAgent:
             },
         }
         
-        # Request a response from the model using the generated content
-        response = self.gemini_model.generate_content(
-            contents=input_parts,
-            generation_config={
+        return {
+            "contents": input_parts,
+            "generation_config": {
                 'response_mime_type': 'application/json',
                 'response_schema': response_schema,
             }
-        )
-        
-        return response  # Return the generated response
+        }
@@ -0,0 +1,116 @@
+import re
+import threading
+import time
+
+# Words that only distinguish variants of the same product
+VARIANT_WORDS = {
+    "red", "blue", "green", "black", "white", "yellow", "pink", "purple", "orange", "grey", "gray",
+    "brown", "beige", "navy", "silver", "gold", "transparent", "clear",
+    "xs", "s", "m", "l", "xl", "xxl", "small", "medium", "large", "mini", "travel", "size", "regular",
+    "pack",
+}
+
+# Sizes, quantities and counts such as "250ml", "1.5 kg", "pack of 6", "6x" (bare numbers
+# are kept, since they are often part of the model name)
+VARIANT_PATTERN = re.compile(
+    r"\b\d+(?:[.,]\d+)?\s*(?:fl\.?\s?oz|ml|cl|l|g|kg|mg|oz|lb|lbs|cm|mm|m|in|ct|pcs|pk|x)\b"
+    r"|\bpack\s+of\s+\d+\b|\bx\s*\d+\b"
+)
+
+
+def variant_tokens(brand: str, product_name: str) -> frozenset[str]:
+    """
+    Normalize brand and product name to the tokens shared by all variants of a product.
+
+    Example: ("Brand X", "Brand X Shampoo 250ml") -> {"brand", "x", "shampoo", "brand:brand x"}
+    """
+    text = f"{brand} {product_name}".lower()
+    text = VARIANT_PATTERN.sub(" ", text)
+    words = re.findall(r"[a-z0-9]+", text)
+    return frozenset(word for word in words if word not in VARIANT_WORDS) | {f"brand:{brand.strip().lower()}"}
+
+
+def has_name_tokens(tokens: frozenset[str]) -> bool:
+    # A name made only of variant words says nothing about which product it is
+    return any(not token.startswith("brand:") for token in tokens) and len(tokens) > 1
+
+
+class VariantIndex:
+    def __init__(self):
+        """
+        Initializes the VariantIndex, an in-memory index per user of enriched products by
+        their variant tokens, used to find already-enriched variants (e.g. "Brand X
+        Shampoo 250ml" for "Brand X Shampoo 500ml").
+
+        Products only count as variants when their tokens are equal once sizes, colours
+        and quantities are removed. A similarity score is not enough: in a long name any
+        one-word difference ("Shampoo" vs "Conditioner") still scores high.
+        """
+        # Per user: product ID -> tokens, and tokens -> product IDs
+        self.tokens: dict[str, dict[str, frozenset]] = {}
+        self.products: dict[str, dict[frozenset, set[str]]] = {}
+        self.built_at: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, user_id: str, product_id: str, brand: str, product_name: str) -> None:
+        tokens = variant_tokens(brand, product_name)
+        with self._lock:
+            self._remove(user_id, product_id)
+            if not has_name_tokens(tokens):
+                return
+            self.tokens.setdefault(user_id, {})[product_id] = tokens
+            self.products.setdefault(user_id, {}).setdefault(tokens, set()).add(product_id)
+
+    def remove(self, user_id: str, product_id: str) -> None:
+        with self._lock:
+            self._remove(user_id, product_id)
+
+    def _remove(self, user_id: str, product_id: str) -> None:
+        tokens = self.tokens.get(user_id, {}).pop(product_id, None)
+        if tokens is None:
+            return
+        products = self.products[user_id]
+        products[tokens].discard(product_id)
+        if not products[tokens]:
+            del products[tokens]
+
+    def build(self, user_id: str, products: list[dict]) -> None:
+        """
+        Replace a user's index with the given products ({"id", "brand", "product_name"}).
+        """
+        with self._lock:
+            self.tokens[user_id] = {}
+            self.products[user_id] = {}
+        for product in products:
+            self.add(user_id, product["id"], product.get("brand") or "", product.get("product_name") or "")
+        with self._lock:
+            self.built_at[user_id] = time.monotonic()
+
+    def is_stale(self, user_id: str, max_age: float) -> bool:
+        built_at = self.built_at.get(user_id)
+        return built_at is None or time.monotonic() - built_at > max_age
+
+    def find(self, user_id: str, brand: str, product_name: str, exclude: str | None = None) -> list[str]:
+        """
+        Find indexed variants of a product.
+
+        Args:
+            user_id (str): Only the user's own products are searched.
+            brand (str): The product's brand.
+            product_name (str): The product's name.
+            exclude (str, optional): Product ID to leave out (the product itself).
+
+        Returns:
+            list[str]: IDs of the products with the same variant tokens, most recently created first.
+        """
+        tokens = variant_tokens(brand, product_name)
+        if not has_name_tokens(tokens):
+            return []
+        with self._lock:
+            matches = set(self.products.get(user_id, {}).get(tokens, ()))
+        matches.discard(exclude)
+        return sorted(matches, reverse=True)
+
+
+# Shared index of enriched products for this process
+variant_index = VariantIndex()
@@ -0,0 +1,100 @@
+import asyncio
+import logging
+
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from pymongo.errors import PyMongoError
+
+from app.core.auth import decode_access_token
+from app.core.config import LIVE_READY_TIMEOUT_SECONDS
+from app.core.live import RESYNC_MESSAGE, catch_up, product_change_hub
+from app.core.log import user_id_var
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+async def push_messages(websocket: WebSocket, queue: asyncio.Queue, delivered: set[str]):
+    """
+    Forward the hub's messages to the client, skipping those already replayed.
+    """
+    while True:
+        message = await queue.get()
+        if message.get("resume_token") in delivered:
+            continue
+        await websocket.send_json(message)
+
+async def read_until_closed(websocket: WebSocket):
+    """
+    Consume (and ignore) client frames so a closed connection is noticed while idle.
+    """
+    while True:
+        await websocket.receive_text()
+
+@router.websocket("/products/live")
+async def product_updates(
+    websocket: WebSocket,
+    token: str = Query(...),
+    resume_after: str | None = Query(default=None)
+):
+    """
+    WebSocket pushing changes to the authenticated user's products as they happen.
+
+    Browsers cannot set headers on WebSocket requests, so the access token is passed as
+    the `token` query parameter. Messages are JSON objects with a `type`:
+
+    - "ready": the subscription is active; load GET /products/ now (if not resuming).
+    - "insert" / "replace": `product` holds the full product.
+    - "update": `set` maps changed fields (dotted paths) to values, `unset` lists removed ones.
+    - "delete": the product `id` was deleted.
+    - "resync": changes may have been missed; reload GET /products/.
+
+    Every change message carries a `resume_token`. Reconnecting with
+    `?resume_after=<last resume_token>` replays the changes missed in between.
+
+    Args:
+        websocket (WebSocket): The client connection.
+        token (str): The JWT access token.
+        resume_after (str, optional): Resume token of the last message received.
+    """
+    try:
+        user = decode_access_token(token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Invalid token")
+        return
+    user_id_var.set(user["sub"])
+
+    await websocket.accept()
+    queue = product_change_hub.subscribe(user["sub"])
+    try:
+        if not await product_change_hub.wait_ready(LIVE_READY_TIMEOUT_SECONDS):
+            await websocket.close(code=status.WS_1011_INTERNAL_ERROR, reason="Live updates are unavailable")
+            return
+
+        # Replay what was missed; changes arriving meanwhile are queued by the hub and de-duplicated
+        delivered = set()
+        if resume_after:
+            try:
+                async for message in catch_up(user["sub"], resume_after):
+                    delivered.add(message["resume_token"])
+                    await websocket.send_json(message)
+            except PyMongoError as e:
+                logger.warning("Could not resume product changes for user %s: %s", user["sub"], e)
+                await websocket.send_json(RESYNC_MESSAGE)
+
+        await websocket.send_json({"type": "ready"})
+
+        tasks = [
+            asyncio.create_task(push_messages(websocket, queue, delivered)),
+            asyncio.create_task(read_until_closed(websocket)),
+        ]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+        for task in done:
+            if not isinstance(task.exception(), WebSocketDisconnect):
+                raise task.exception()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        product_change_hub.unsubscribe(user["sub"], queue)
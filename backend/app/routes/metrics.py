@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends
+
+from app.core import log
+from app.core.auth import get_current_user
+from app.core.scheduler import enrichment_scheduler
+from .ai_enrichment.Prefetcher import prefetcher
+from .ai_enrichment.helpers.AdaptiveLimiter import adaptive_limiters
+from .ai_enrichment.helpers.HedgedCaller import hedged_callers
+from .ai_enrichment.helpers.ImageNormalizer import image_normalizer
+
+router = APIRouter()
+
+@router.get("/metrics/enrichment")
+async def get_enrichment_metrics(user: dict = Depends(get_current_user)):
+    """
+    Endpoint to inspect the enrichment pipeline's in-process statistics.
+
+    Args:
+        user (dict): The current authenticated user.
+
+    Returns:
+        dict: Per-agent hedging statistics, per-model adaptive concurrency limits with
+        their recent decisions, image normalization totals, the scheduler's slot usage
+        with the current user's queue depth and wait times, prefetch counters with the
+        current user's budget usage, and the log queue's state.
+    """
+    return {
+        "hedging": {name: caller.get_stats() for name, caller in hedged_callers.items()},
+        "concurrency_limits": {model: limiter.get_stats() for model, limiter in adaptive_limiters.items()},
+        "images": dict(image_normalizer.stats),
+        "scheduler": enrichment_scheduler.get_stats(user["sub"]),
+        "prefetch": await prefetcher.get_stats(user["sub"]),
+        "logging": log.get_stats(),
+    }
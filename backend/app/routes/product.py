@@ -1,26 +1,63 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
-from app.models.product_model import ProductCreate, ProductUpdate
+import asyncio
+import logging
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, HTTPException, Header, Request
+from fastapi.exceptions import RequestValidationError
+from app.models.product_model import EnrichProductsRequest, ProductCreate, product_create_list_adapter
 from app.core.auth import get_current_user
 from app.core.database import products_collection
+from app.core import idempotency, stats, storage
+from app.core.openapi import REF_TEMPLATE, request_body
 from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
 from pydantic import BaseModel
 from .ai_enrichment.AttributeEnricher import AttributeEnricher
-from fastapi.responses import JSONResponse
+from .ai_enrichment.Prefetcher import prefetcher
+from .ai_enrichment.helpers.Deadline import Deadline
+from .ai_enrichment.helpers.VariantIndex import variant_index, variant_tokens
+from app.core.config import (
+    ENRICH_DEADLINE_SECONDS,
+    ENRICH_INTERACTIVE_MAX_PRODUCTS,
+    ENRICH_REQUEST_WINDOW,
+    ENRICH_SELECTOR_MAX_PRODUCTS,
+    PREFETCH_ENABLED,
+    VARIANT_INDEX_MAX_AGE_SECONDS,
+    VARIANT_REUSE_ENABLED,
+)
+from app.core.cpu_tasks import prepare_bulk_create, prepare_enrich_request, spec_hash
+from app.core.process_pool import run_cpu_bound
+from app.core.scheduler import enrichment_scheduler
+from app.core.tracing import mongo_span, tracer
+from opentelemetry.trace import Status, StatusCode
+from fastapi.responses import JSONResponse, ORJSONResponse
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Per-user locks so concurrent enrichments build a user's variant index only once
+variant_index_locks: dict[str, asyncio.Lock] = {}
+
 class DeleteProductsRequest(BaseModel):
     """
     Pydantic model for handling product deletion requests.
     """
     ids: list[str]
 
-class EnrichProductsRequest(BaseModel):
+def ensure_owned_images(images: list[str], user: dict):
     """
-    Pydantic model for handling product enrichment requests.
-    Accepts a list of full Product objects to be enriched.
+    Ensure uploaded-image references on a product point into the user's own storage namespace.
+
+    Args:
+        images (list[str]): The product's image URLs / references.
+        user (dict): The current authenticated user.
+
+    Raises:
+        HTTPException: If a storage reference belongs to another user or bucket.
     """
-    products: list[ProductUpdate]
+    for image in images:
+        if image.startswith(storage.S3_SCHEME) and not storage.is_owned_ref(image, user["sub"]):
+            raise HTTPException(status_code=403, detail=f"Image {image} does not belong to the current user")
 
 @router.post("/products/")
 async def create_product(
@@ -30,6 +67,9 @@ async def create_product(
     """
     Endpoint to create a new product.
 
+    With PREFETCH_ENABLED, the product's search grounding and images are prefetched in
+    the background so a later enrich is faster.
+
     Args:
         product (ProductCreate): Product data to be inserted.
         user (dict): The current authenticated user.
@@ -40,31 +80,123 @@ async def create_product(
     product_dict = product.model_dump()
     product_dict["user_id"] = user["sub"]
 
+    ensure_owned_images(product_dict.get("images") or [], user)
+
     result = await products_collection.insert_one(product_dict)
     if result.inserted_id:
+        await stats.record_change(user["sub"], None, product_dict)
+        await prefetcher.schedule(user["sub"], [product_dict])
         return {"message": "Product created", "id": str(result.inserted_id)}
     
     raise HTTPException(status_code=500, detail="Failed to create product")
 
+@router.post(
+    "/products/bulk",
+    openapi_extra=request_body(product_create_list_adapter.json_schema(ref_template=REF_TEMPLATE))
+)
+async def create_products(
+    request: Request,
+    user: dict = Depends(get_current_user)
+):
+    """
+    Endpoint to create many products in one request.
+
+    The body (a JSON array of ProductCreate objects) is validated straight from the raw
+    bytes by a compiled TypeAdapter, in the process pool for large bodies, and the
+    products are written with a single insert_many. With PREFETCH_ENABLED, prefetching
+    is queued for the new products within the user's budget.
+
+    Args:
+        request (Request): The request carrying a list of ProductCreate objects.
+        user (dict): The current authenticated user.
+
+    Returns:
+        ORJSONResponse: A response containing a success message and the new product IDs.
+
+    Raises:
+        RequestValidationError: If the body is not a valid list of products.
+    """
+    body = await request.body()
+    prepared = await run_cpu_bound(prepare_bulk_create, body, size=len(body))
+    if "errors" in prepared:
+        raise RequestValidationError([{**error, "loc": ("body", *error["loc"])} for error in prepared["errors"]])
+
+    products = prepared["products"]
+    if not products:
+        raise HTTPException(status_code=400, detail="No products to create")
+
+    for product_dict in products:
+        product_dict["user_id"] = user["sub"]
+        ensure_owned_images(product_dict.get("images") or [], user)
+
+    result = await products_collection.insert_many(products)
+    await stats.increment(user["sub"], stats.merge_deltas(
+        *(stats.counters_delta(None, product_dict) for product_dict in products)
+    ))
+    await prefetcher.schedule(user["sub"], products)
+
+    return ORJSONResponse({
+        "message": f"Created {len(result.inserted_ids)} product(s)",
+        "ids": [str(inserted_id) for inserted_id in result.inserted_ids]
+    })
+
 @router.get("/products/")
 async def get_products(user: dict = Depends(get_current_user)):
     """
     Endpoint to get all products for the authenticated user.
 
+    The documents are returned through ORJSONResponse directly, which skips FastAPI's
+    jsonable_encoder pass over every nested attribute; the JSON sent is the same.
+    The stored search grounding of enriched products is left out.
+
     Args:
         user (dict): The current authenticated user.
 
     Returns:
-        list: A list of products associated with the user.
+        ORJSONResponse: A list of products associated with the user.
     """
-    products_cursor = products_collection.find({"user_id": user["sub"]})
-    products = []
-    async for product in products_cursor:
+    products = await products_collection.find(
+        {"user_id": user["sub"]}, {"enrichment.grounding": 0}
+    ).to_list(length=None)
+    for product in products:
         product["id"] = str(product["_id"])  # Convert ObjectId to string for JSON
         del product["_id"]  # Optional: remove _id if not needed
-        products.append(product)
 
-    return products
+    return ORJSONResponse(products)
+
+@router.get("/products/stats")
+async def get_product_stats(user: dict = Depends(get_current_user)):
+    """
+    Endpoint to get catalog statistics for the authenticated user.
+
+    Reads the incrementally maintained counters document, so the cost does not
+    depend on the size of the catalog.
+
+    Args:
+        user (dict): The current authenticated user.
+
+    Returns:
+        dict: Total, enriched and not enriched counts, plus per-attribute fill rates.
+    """
+    return await stats.get_stats(user["sub"])
+
+@router.post("/products/stats/rebuild")
+async def rebuild_product_stats(
+    verify_only: bool = False,
+    user: dict = Depends(get_current_user)
+):
+    """
+    Endpoint to verify (and, unless `verify_only` is set, repair) the stats counters
+    by recomputing them with an aggregation over the user's products.
+
+    Args:
+        verify_only (bool): Only report drift, do not overwrite the counters.
+        user (dict): The current authenticated user.
+
+    Returns:
+        dict: Consistency flag, stored counters and recomputed counters.
+    """
+    return await stats.rebuild_stats(user["sub"], verify_only=verify_only)
 
 @router.delete("/products/bulk-delete")
 async def delete_products(
@@ -82,42 +214,246 @@ async def delete_products(
         JSONResponse: A response containing the number of deleted products.
     """
     object_ids = [ObjectId(id) for id in ids.ids]
-
-    result = await products_collection.delete_many({
+    query = {
         "_id": {"$in": object_ids},
         "user_id": user["sub"]  # ensures users can only delete their own products
-    })
+    }
+
+    # Load the fields the stats counters depend on before the documents are gone
+    doomed = await products_collection.find(query, {"isEnriched": 1, "attributes": 1}).to_list(length=None)
+
+    result = await products_collection.delete_many(query)
 
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="No products found to delete")
 
+    for product in doomed:
+        variant_index.remove(user["sub"], str(product["_id"]))
+    if PREFETCH_ENABLED:
+        prefetcher.cancel(user["sub"], ids.ids)
+        await prefetcher.discard(user["sub"], ids.ids)
+
+    if result.deleted_count == len(doomed):
+        await stats.increment(user["sub"], stats.merge_deltas(
+            *(stats.counters_delta(product, None) for product in doomed)
+        ))
+    else:
+        # A concurrent write changed the set of documents in between; recount from scratch
+        await stats.rebuild_stats(user["sub"])
+
     return {"message": f"Deleted {result.deleted_count} product(s)"}
 
-@router.put("/products/enrich")
-async def enrich_products(
-    enrich_request: EnrichProductsRequest, 
-    user: dict = Depends(get_current_user)
-):
+def enrichment_pipeline(match: dict, limit: int | None = None) -> list:
     """
-    Endpoint to enrich product attributes using AI-based enrichment.
+    Build the aggregation that loads only what the enricher needs from each product:
+    name, brand, barcode, images, the attribute definitions (type, unit, options) and
+    the checkpoint's spec hash, leaving out the stored attribute values, labels and
+    search grounding.
+
+    Args:
+        match (dict): The `$match` filter (always scoped to the user).
+        limit (int, optional): Maximum number of products to load.
+
+    Returns:
+        list: The MongoDB aggregation pipeline.
+    """
+    pipeline = [{"$match": match}]
+    if limit:
+        pipeline.append({"$limit": limit})
+    pipeline.append({"$project": {
+        "product_name": 1,
+        "brand": 1,
+        "barcode": 1,
+        "images": 1,
+        "enrichment.spec_hash": 1,
+        "attributes": {"$arrayToObject": {"$map": {
+            "input": {"$objectToArray": {"$ifNull": ["$attributes", {}]}},
+            "as": "attribute",
+            "in": {
+                "k": "$$attribute.k",
+                "v": {
+                    "type": "$$attribute.v.type",
+                    "unit": "$$attribute.v.unit",
+                    "options": "$$attribute.v.options",
+                },
+            },
+        }}},
+    }})
+    return pipeline
+
+async def products_to_enrich(enrich_request: dict, prompts: list[str], user: dict):
+    """
+    Yield the products of an enrich request, one at a time.
+
+    Client-supplied products are yielded as sent, with their stored enrichment
+    checkpoint attached. Products referenced by `ids` or `selector` are streamed from
+    MongoDB with the enrichment projection; IDs that are malformed or not found are
+    yielded as error entries instead.
+
+    Args:
+        enrich_request (dict): The validated EnrichProductsRequest.
+        prompts (list[str]): Pre-built attribute prompts for client-supplied products.
+        user (dict): The current authenticated user.
+
+    Yields:
+        tuple[dict, str | None, str | None]: The product, its pre-built attribute prompt
+        (if any) and an error message (if the product cannot be enriched).
+    """
+    if enrich_request["products"] is not None:
+        object_ids = [ObjectId(product["id"]) for product in enrich_request["products"] if ObjectId.is_valid(product["id"])]
+        checkpoints = {
+            str(product["_id"]): product["enrichment"]
+            async for product in products_collection.find(
+                {"_id": {"$in": object_ids}, "user_id": user["sub"], "enrichment": {"$exists": True}},
+                {"enrichment.spec_hash": 1}
+            )
+        }
+        for product_dict, attributes_prompt in zip(enrich_request["products"], prompts):
+            if product_dict["id"] in checkpoints:
+                product_dict["enrichment"] = checkpoints[product_dict["id"]]
+            yield product_dict, attributes_prompt, None
+        return
+
+    match = {"user_id": user["sub"]}
+    limit = ENRICH_SELECTOR_MAX_PRODUCTS
+    requested_ids = set()
+
+    if enrich_request["ids"] is not None:
+        object_ids = []
+        for product_id in dict.fromkeys(enrich_request["ids"]):
+            try:
+                object_ids.append(ObjectId(product_id))
+                requested_ids.add(product_id)
+            except (InvalidId, TypeError):
+                yield {"id": product_id}, None, "Invalid product ID"
+        match["_id"] = {"$in": object_ids}
+        limit = None
+    else:
+        selector = enrich_request["selector"]
+        for field in ("isEnriched", "brand"):
+            if selector[field] is not None:
+                match[field] = selector[field]
+        limit = min(selector["limit"] or limit, limit)
+
+    cursor = products_collection.aggregate(enrichment_pipeline(match, limit), batchSize=50)
+    async for product in cursor:
+        product["id"] = str(product.pop("_id"))
+        requested_ids.discard(product["id"])
+        yield product, None, None
+
+    for product_id in requested_ids:
+        yield {"id": product_id}, None, "No product found with this ID"
+
+async def find_enriched_sibling(product_dict: dict, user: dict) -> dict | None:
+    """
+    Find an already-enriched variant of a product (e.g. another size or colour of it).
+
+    Variants have the same brand and product name once sizes, colours and quantities
+    are removed (see `variant_tokens`). The user's variant index is built lazily from
+    the products that have a stored search grounding and rebuilt after
+    VARIANT_INDEX_MAX_AGE_SECONDS. Candidates are re-checked against the database,
+    since they may have been renamed or deleted.
 
     Args:
-        enrich_request (EnrichProductsRequest): A list of products to be enriched.
+        product_dict (dict): The product about to be enriched.
         user (dict): The current authenticated user.
 
     Returns:
-        JSONResponse: A response containing a success message and the enriched results.
+        dict | None: The sibling's id, brand, product_name, attributes and
+        `enrichment.grounding`, or None if there is no enriched variant.
     """
-    enriched_results = []
+    user_id = user["sub"]
+    async with variant_index_locks.setdefault(user_id, asyncio.Lock()):
+        if variant_index.is_stale(user_id, VARIANT_INDEX_MAX_AGE_SECONDS):
+            with mongo_span("find", products_collection):
+                enriched = await products_collection.find(
+                    {"user_id": user_id, "enrichment.grounding": {"$exists": True}},
+                    {"brand": 1, "product_name": 1}
+                ).to_list(length=None)
+            products = [{**product, "id": str(product["_id"])} for product in enriched]
+            await asyncio.to_thread(variant_index.build, user_id, products)
 
-    # Process each product for enrichment
-    for product in enrich_request.products:
-        product_dict = product.model_dump()
+    brand = product_dict.get("brand") or ""
+    product_name = product_dict.get("product_name") or ""
+    tokens = variant_tokens(brand, product_name)
+
+    # Try the most recent few candidates; stale index entries are dropped on the way
+    for candidate_id in variant_index.find(user_id, brand, product_name, exclude=product_dict.get("id"))[:3]:
+        with mongo_span("find_one", products_collection):
+            sibling = await products_collection.find_one(
+                {"_id": ObjectId(candidate_id), "user_id": user_id, "enrichment.grounding": {"$exists": True}},
+                {"brand": 1, "product_name": 1, "attributes": 1, "enrichment.grounding": 1}
+            )
+        if sibling is None or variant_tokens(sibling.get("brand") or "", sibling.get("product_name") or "") != tokens:
+            variant_index.remove(user_id, candidate_id)
+            continue
+
+        sibling["id"] = str(sibling.pop("_id"))
+        return sibling
+
+    return None
+
+async def enrich_product(
+    product_dict: dict,
+    user: dict,
+    deadline: Deadline,
+    attributes_prompt: str | None = None,
+    attributes_hash: str | None = None,
+    reuse_siblings: bool = True
+) -> dict | None:
+    """
+    Enrich a single product and persist the enriched attribute values.
+
+    A fully enriched product also gets a completion checkpoint (`enrichment.spec_hash`
+    and `enrichment.enriched_at`), written in the same update as the values, so retried
+    requests can skip it. With VARIANT_REUSE_ENABLED, a product whose grounding came from
+    its own search also stores it (`enrichment.grounding`) for its variants to reuse;
+    one grounded by a variant records that variant's ID (`enrichment.grounded_by`).
+
+    Args:
+        product_dict (dict): The product to enrich (must include its "id").
+        user (dict): The current authenticated user.
+        deadline (Deadline): The end-to-end deadline of the enrichment request.
+        attributes_prompt (str, optional): The product's attribute prompt, if already built.
+        attributes_hash (str, optional): The spec hash of the product's attribute definitions.
+        reuse_siblings (bool): Reuse the work of an already-enriched variant, if one exists.
+
+    Returns:
+        dict | None: An entry for the response's `enriched_results` if the product failed
+        or was only partially enriched, otherwise None.
+    """
+    product_id = product_dict.get("id")
+
+    with tracer.start_as_current_span("enrich_product", attributes={"product.id": str(product_id)}) as span:
+        # Report products that could not be started instead of letting the request time out
+        if deadline.expired():
+            return {
+                "product_id": product_id,
+                "error": "Enrichment deadline exceeded before the product was processed"
+            }
 
         try:
+            # Client-supplied products must not reference another user's uploads
+            ensure_owned_images(product_dict.get("images") or [], user)
+
+            # Look for an enriched variant whose grounding and invariant attributes can be reused
+            sibling = None
+            if reuse_siblings and VARIANT_REUSE_ENABLED:
+                try:
+                    sibling = await find_enriched_sibling(product_dict, user)
+                except Exception as e:
+                    logger.warning("Variant lookup failed for product %s: %s", product_id, e, extra={"product_id": product_id})
+
+            # Start from the grounding and images prefetched when the product was created, if any;
+            # an unfinished prefetch would only repeat the search this enrichment runs
+            prefetched = None
+            if PREFETCH_ENABLED:
+                prefetcher.cancel(user["sub"], [product_id])
+                prefetched = await prefetcher.load(user["sub"], product_dict)
+
             # Initialize AttributeEnricher to enrich product attributes
-            enricher = AttributeEnricher(product_dict)
-            enriched = enricher.enrich_attributes()
+            enricher = AttributeEnricher(product_dict, attributes_prompt, sibling, prefetched)
+            enriched = await enricher.enrich_attributes_async(deadline)
 
             # Filter out attributes that are "Not Found" and prepare update dictionary
             update_dict = {}
@@ -129,29 +465,241 @@ async def enrich_products(
             # Add the "isEnriched" field to indicate successful enrichment
             update_dict["isEnriched"] = True
 
-            # MongoDB update query
-            result = await products_collection.update_one(
-                {
-                    "_id": ObjectId(product.id),
-                    "user_id": user["sub"]  # Ensure users can only enrich their own products
-                },
-                {"$set": update_dict}  # Update individual attribute values
-            )
+            # Checkpoint complete results only; degraded ones should be retried
+            if not enricher.degraded_stages:
+                update_dict["enrichment.spec_hash"] = attributes_hash or spec_hash(product_dict["attributes"])
+                update_dict["enrichment.enriched_at"] = datetime.now(timezone.utc)
+                if VARIANT_REUSE_ENABLED and enricher.grounded_by:
+                    update_dict["enrichment.grounded_by"] = enricher.grounded_by
+                elif VARIANT_REUSE_ENABLED and enricher.grounding is not None:
+                    update_dict["enrichment.grounding"] = enricher.grounding
 
-            if result.modified_count == 0:
-                print(f"Error: No product found with ID {product.id}")
+            # MongoDB update query, returning the previous state for the stats counters
+            with mongo_span("find_one_and_update", products_collection):
+                before = await products_collection.find_one_and_update(
+                    {
+                        "_id": ObjectId(product_id),
+                        "user_id": user["sub"]  # Ensure users can only enrich their own products
+                    },
+                    {"$set": update_dict},  # Update individual attribute values
+                    projection={"isEnriched": 1, "attributes": 1},
+                    return_document=ReturnDocument.BEFORE
+                )
+
+            if before is None:
+                logger.warning("No product found with ID %s", product_id, extra={"product_id": product_id})
             else:
-                print(f"Product {product.id} enriched and updated successfully.")
+                await stats.record_change(user["sub"], before, stats.apply_update(before, update_dict))
+                if "enrichment.grounding" in update_dict:
+                    variant_index.add(user["sub"], product_id, product_dict.get("brand") or "", product_dict.get("product_name") or "")
+                if "enrichment.spec_hash" in update_dict and prefetched:
+                    await prefetcher.discard(user["sub"], [product_id])
+                logger.info(
+                    "Product %s enriched and updated successfully", product_id,
+                    extra={"product_id": product_id, "sampled": True}
+                )
+
+            # Flag results produced without some of the inputs (e.g. search timed out)
+            if enricher.degraded_stages:
+                return {
+                    "product_id": product_id,
+                    "partial": True,
+                    "degraded_stages": enricher.degraded_stages
+                }
 
         except Exception as e:
-            print(f"Error enriching product {product_dict.get('id')}: {e}")
-            enriched_results.append({
-                "product_id": product_dict.get("id"),
+            span.record_exception(e)
+            span.set_status(Status(StatusCode.ERROR, str(e)))
+            logger.error("Error enriching product %s: %s", product_id, e, exc_info=e, extra={"product_id": product_id})
+            return {
+                "product_id": product_id,
                 "error": str(e)
-            })
+            }
 
-    # Return enriched results along with success message
-    return JSONResponse(content={
+    return None
+
+async def schedule_enrich_product(
+    product_dict: dict,
+    user: dict,
+    deadline: Deadline,
+    attributes_prompt: str | None = None,
+    attributes_hash: str | None = None,
+    interactive: bool = False,
+    reuse_siblings: bool = True
+) -> dict | None:
+    """
+    Wait for a fair-share enrichment slot, then enrich the product.
+
+    Args:
+        product_dict (dict): The product to enrich (must include its "id").
+        user (dict): The current authenticated user.
+        deadline (Deadline): The end-to-end deadline of the enrichment request.
+        attributes_prompt (str, optional): The product's attribute prompt, if already built.
+        attributes_hash (str, optional): The spec hash of the product's attribute definitions.
+        interactive (bool): Whether the request qualifies for the priority lane.
+        reuse_siblings (bool): Reuse the work of an already-enriched variant, if one exists.
+
+    Returns:
+        dict | None: The product's `enriched_results` entry, if any (see enrich_product).
+    """
+    try:
+        await enrichment_scheduler.acquire(user["sub"], interactive, timeout=deadline.remaining())
+    except asyncio.TimeoutError:
+        return {
+            "product_id": product_dict.get("id"),
+            "error": "Enrichment deadline exceeded while waiting for capacity"
+        }
+
+    try:
+        return await enrich_product(product_dict, user, deadline, attributes_prompt, attributes_hash, reuse_siblings)
+    finally:
+        enrichment_scheduler.release(user["sub"])
+
+def is_interactive(enrich_request: dict) -> bool:
+    """
+    Whether an enrich request is small enough (a few SKUs) for the priority lane.
+    """
+    if enrich_request["selector"] is not None:
+        size = enrich_request["selector"]["limit"]
+    else:
+        size = len(enrich_request["products"] if enrich_request["products"] is not None else enrich_request["ids"])
+    return size is not None and size <= ENRICH_INTERACTIVE_MAX_PRODUCTS
+
+async def run_enrich_request(enrich_request: dict, prompts: list[str], user: dict) -> dict:
+    """
+    Enrich the products of a validated request, skipping those already checkpointed.
+
+    Args:
+        enrich_request (dict): The validated EnrichProductsRequest.
+        prompts (list[str]): Pre-built attribute prompts for client-supplied products.
+        user (dict): The current authenticated user.
+
+    Returns:
+        dict: The response body: message, enriched_results and the number of skipped products.
+    """
+    results = {}
+    deadline = Deadline(min(enrich_request["deadline_seconds"] or ENRICH_DEADLINE_SECONDS, ENRICH_DEADLINE_SECONDS))
+    interactive = is_interactive(enrich_request)
+    skipped = 0
+
+    async def run(index: int, product_dict: dict, attributes_prompt: str | None, attributes_hash: str):
+        # A forced re-enrichment starts from scratch instead of reusing a variant's work
+        results[index] = await schedule_enrich_product(
+            product_dict, user, deadline, attributes_prompt, attributes_hash, interactive,
+            reuse_siblings=not enrich_request["force"]
+        )
+
+    attributes = {"user.id": user["sub"], "enrich.interactive": interactive, "enrich.force": enrich_request["force"]}
+    with tracer.start_as_current_span("enrich_products", attributes=attributes) as span:
+        product_count = 0
+        pending = set()
+        try:
+            # Enrich products concurrently as they are loaded; the scheduler decides how many
+            # run at once, and at most ENRICH_REQUEST_WINDOW of them wait for a slot
+            async for product_dict, attributes_prompt, error in products_to_enrich(enrich_request, prompts, user):
+                index, product_count = product_count, product_count + 1
+                if error:
+                    results[index] = {"product_id": product_dict["id"], "error": error}
+                    continue
+
+                # Skip products already enriched with the same attribute definitions
+                attributes_hash = spec_hash(product_dict["attributes"])
+                checkpoint = product_dict.get("enrichment") or {}
+                if not enrich_request["force"] and checkpoint.get("spec_hash") == attributes_hash:
+                    skipped += 1
+                    continue
+
+                if len(pending) >= ENRICH_REQUEST_WINDOW:
+                    _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                pending.add(asyncio.create_task(run(index, product_dict, attributes_prompt, attributes_hash)))
+
+            if pending:
+                await asyncio.gather(*pending)
+        finally:
+            # Stop queued and running work if the client went away
+            for task in pending:
+                task.cancel()
+
+        span.set_attribute("product.count", product_count)
+        span.set_attribute("product.skipped", skipped)
+
+    # Report results in request order
+    enriched_results = [results[index] for index in sorted(results) if results[index]]
+
+    return {
         "message": f"Enriched {len(enriched_results)} product(s)",
-        "enriched_results": enriched_results
-    })
+        "enriched_results": enriched_results,
+        "skipped": skipped
+    }
+
+def is_complete(response: dict) -> bool:
+    """
+    Whether every product of an enrich response was enriched in full (no errors and
+    no degraded stages), so that replaying the response is the right answer to a retry.
+    """
+    return not any("error" in result or result.get("partial") for result in response["enriched_results"])
+
+@router.put(
+    "/products/enrich",
+    openapi_extra=request_body(EnrichProductsRequest.model_json_schema(ref_template=REF_TEMPLATE))
+)
+async def enrich_products(
+    request: Request,
+    idempotency_key: str | None = Header(default=None),
+    user: dict = Depends(get_current_user)
+):
+    """
+    Endpoint to enrich product attributes using AI-based enrichment.
+
+    The body (an EnrichProductsRequest) names the products either as full objects,
+    as a list of IDs, or as a selector such as {"isEnriched": false}; with IDs or a
+    selector the products are streamed from the database. The body is validated from
+    raw bytes, together with building each product's attribute prompt; large bodies
+    are handled in the process pool so the event loop stays free.
+
+    Products that were already enriched with the same attribute definitions are skipped
+    unless `force` is set. With an `Idempotency-Key` header, a retry of a request whose
+    products were all enriched in full replays its stored response instead of running
+    again. If some products failed or were only partially enriched, the key is released
+    instead, so a retry runs again and only enriches the products left unfinished.
+
+    Args:
+        request (Request): The request carrying an EnrichProductsRequest body.
+        idempotency_key (str, optional): The `Idempotency-Key` header.
+        user (dict): The current authenticated user.
+
+    Returns:
+        JSONResponse: A response containing a success message, the enriched results
+        and the number of skipped products.
+
+    Raises:
+        RequestValidationError: If the body is not a valid EnrichProductsRequest.
+        HTTPException: If the idempotency key is invalid, reused with another body or in use.
+    """
+    body = await request.body()
+    prepared = await run_cpu_bound(prepare_enrich_request, body, size=len(body))
+    if "errors" in prepared:
+        raise RequestValidationError([{**error, "loc": ("body", *error["loc"])} for error in prepared["errors"]])
+
+    if idempotency_key is not None:
+        stored = await idempotency.begin(user["sub"], idempotency_key, body)
+        if stored is not None:
+            return JSONResponse(content=stored, headers={"Idempotent-Replayed": "true"})
+
+    try:
+        response = await run_enrich_request(prepared["request"], prepared["prompts"], user)
+    except BaseException:
+        # Let the client retry with the same key; checkpoints keep the retry cheap
+        if idempotency_key is not None:
+            await idempotency.release(user["sub"], idempotency_key)
+        raise
+
+    if idempotency_key is not None:
+        if is_complete(response):
+            await idempotency.complete(user["sub"], idempotency_key, response)
+        else:
+            # Replaying the failures would stop a retry from finishing the remaining products
+            await idempotency.release(user["sub"], idempotency_key)
+
+    # Return enriched results along with success message
+    return JSONResponse(content=response)
@@ -0,0 +1,142 @@
+import math
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+from app.core import storage
+from app.core.auth import get_current_user
+from app.core.config import S3_PRESIGN_EXPIRES_SECONDS, UPLOAD_MAX_BYTES, UPLOAD_MULTIPART_THRESHOLD, UPLOAD_PART_SIZE
+from app.models.upload_model import AbortUploadRequest, CompleteUploadRequest, UploadRequest
+
+router = APIRouter()
+
+# S3 allows at most 10,000 parts per multipart upload
+MAX_PARTS = 10000
+
+
+def ensure_owned_key(key: str, user: dict) -> None:
+    """
+    Reject operations on object keys outside the current user's namespace.
+
+    Raises:
+        HTTPException: If the key does not belong to the user.
+    """
+    if not storage.is_owned_key(key, user["sub"]):
+        raise HTTPException(status_code=403, detail="Upload does not belong to the current user")
+
+def part_sizes(size: int, part_size: int) -> list[int]:
+    """
+    Split an upload of `size` bytes into parts of `part_size` bytes (the last one smaller).
+    """
+    return [min(part_size, size - offset) for offset in range(0, size, part_size)]
+
+@router.post("/uploads/presign")
+async def presign_upload(
+    upload: UploadRequest,
+    user: dict = Depends(get_current_user)
+):
+    """
+    Endpoint to issue presigned URL(s) so the client can upload an image directly to storage.
+
+    Files up to UPLOAD_MULTIPART_THRESHOLD get a single presigned PUT URL; larger files get
+    a multipart upload with one presigned URL per part. Every URL is signed for an exact
+    Content-Length (the declared size, or the part's share of it), so the client cannot
+    upload more than was checked against UPLOAD_MAX_BYTES. The returned `image_ref` is what
+    the client stores in the product's `images` list.
+
+    Args:
+        upload (UploadRequest): File name, content type and size of the image.
+        user (dict): The current authenticated user.
+
+    Returns:
+        dict: The upload mode, object key, image reference and presigned URL(s).
+
+    Raises:
+        HTTPException: If the file is not an image or is too large.
+    """
+    if not upload.content_type.startswith("image/"):
+        raise HTTPException(status_code=400, detail="Only image uploads are supported")
+    if upload.size > UPLOAD_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Image exceeds the {UPLOAD_MAX_BYTES} byte limit")
+
+    key = storage.new_object_key(user["sub"], upload.filename)
+    response = {
+        "key": key,
+        "image_ref": storage.image_ref(key),
+        "expires_in": S3_PRESIGN_EXPIRES_SECONDS,
+    }
+
+    if upload.size <= UPLOAD_MULTIPART_THRESHOLD:
+        response.update({
+            "mode": "single",
+            "url": storage.presign_put(key, upload.content_type, upload.size),
+            "headers": {"Content-Type": upload.content_type},
+        })
+        return response
+
+    part_size = max(UPLOAD_PART_SIZE, math.ceil(upload.size / MAX_PARTS))
+    upload_id = await run_in_threadpool(storage.create_multipart_upload, key, upload.content_type)
+
+    response.update({
+        "mode": "multipart",
+        "upload_id": upload_id,
+        "part_size": part_size,
+        "parts": [
+            {
+                "part_number": number,
+                "size": size,
+                "url": storage.presign_upload_part(key, upload_id, number, size),
+            }
+            for number, size in enumerate(part_sizes(upload.size, part_size), start=1)
+        ],
+    })
+    return response
+
+@router.post("/uploads/complete")
+async def complete_upload(
+    upload: CompleteUploadRequest,
+    user: dict = Depends(get_current_user)
+):
+    """
+    Endpoint to complete a multipart upload once every part has been uploaded.
+
+    Args:
+        upload (CompleteUploadRequest): Object key, upload ID and the uploaded parts' ETags.
+        user (dict): The current authenticated user.
+
+    Returns:
+        dict: A success message and the image reference to store on the product.
+    """
+    ensure_owned_key(upload.key, user)
+
+    try:
+        await run_in_threadpool(
+            storage.complete_multipart_upload,
+            upload.key,
+            upload.upload_id,
+            [part.model_dump() for part in upload.parts]
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Failed to complete upload: {e}")
+
+    return {"message": "Upload completed", "image_ref": storage.image_ref(upload.key)}
+
+@router.post("/uploads/abort")
+async def abort_upload(
+    upload: AbortUploadRequest,
+    user: dict = Depends(get_current_user)
+):
+    """
+    Endpoint to abort a multipart upload and discard its uploaded parts.
+
+    Args:
+        upload (AbortUploadRequest): Object key and upload ID.
+        user (dict): The current authenticated user.
+
+    Returns:
+        dict: A success message.
+    """
+    ensure_owned_key(upload.key, user)
+    await run_in_threadpool(storage.abort_multipart_upload, upload.key, upload.upload_id)
+
+    return {"message": "Upload aborted"}
@@ -0,0 +1,134 @@
+"""
+Simulate the adaptive concurrency limiter against a model backend whose quota and
+capacity change half-way through, and compare it with fixed limits.
+
+The simulated backend answers in `--latency` seconds while at most `capacity` calls
+are in flight and slows down proportionally beyond that; calls beyond `quota` are
+rejected with a 429. Halfway through, both drop (e.g. another service starts sharing
+the quota). `--workers` clients call it in a loop, retrying after a 429.
+
+    phase 1: quota 24, capacity 16
+    phase 2: quota 8,  capacity 6
+
+Reported per strategy and phase: successful calls per second, 429s, p50/p95 latency
+of successful calls (including the wait for a slot), and the limit at the end of the phase.
+
+Usage (from the backend directory):
+    python -m benchmarks.adaptive_limit_sim --seconds 10 --workers 48
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from app.routes.ai_enrichment.helpers.AdaptiveLimiter import AdaptiveLimiter
+
+PHASES = [{"quota": 24, "capacity": 16}, {"quota": 8, "capacity": 6}]
+
+
+class RateLimited(Exception):
+    code = 429
+
+
+class SimulatedModel:
+    def __init__(self, latency: float, rng: random.Random):
+        self.latency = latency
+        self.rng = rng
+        self.in_flight = 0
+        self.quota = PHASES[0]["quota"]
+        self.capacity = PHASES[0]["capacity"]
+
+    async def generate(self):
+        self.in_flight += 1
+        try:
+            if self.in_flight > self.quota:
+                await asyncio.sleep(self.latency * 0.1)
+                raise RateLimited("Resource exhausted")
+            slowdown = max(1.0, self.in_flight / self.capacity)
+            await asyncio.sleep(self.latency * slowdown * self.rng.lognormvariate(0, 0.2))
+        finally:
+            self.in_flight -= 1
+
+
+async def run(name: str, limiter: AdaptiveLimiter, seconds: float, workers: int, latency: float, seed: int) -> list[tuple]:
+    model = SimulatedModel(latency, random.Random(seed))
+    phase_seconds = seconds / len(PHASES)
+    phase = 0
+    results = [{"ok": 0, "rejected": 0, "latencies": []} for _ in PHASES]
+    stop = asyncio.Event()
+
+    async def worker():
+        while not stop.is_set():
+            started = time.monotonic()
+            current = phase
+            try:
+                await limiter.call(model.generate)
+                results[current]["ok"] += 1
+                results[current]["latencies"].append(time.monotonic() - started)
+            except RateLimited:
+                results[current]["rejected"] += 1
+                await asyncio.sleep(latency * 0.5)
+
+    tasks = [asyncio.create_task(worker()) for _ in range(workers)]
+    limits = []
+    for phase in range(len(PHASES)):
+        model.quota, model.capacity = PHASES[phase]["quota"], PHASES[phase]["capacity"]
+        await asyncio.sleep(phase_seconds)
+        limits.append(limiter.limit)
+    stop.set()
+    await asyncio.gather(*tasks)
+
+    rows = []
+    for index, result in enumerate(results):
+        ordered = sorted(result["latencies"]) or [0.0]
+        rows.append((
+            name,
+            index + 1,
+            result["ok"] / phase_seconds,
+            result["rejected"],
+            statistics.median(ordered) * 1000,
+            ordered[int(len(ordered) * 0.95) - 1 if len(ordered) > 1 else 0] * 1000,
+            limits[index],
+        ))
+    return rows
+
+
+async def simulate(args) -> tuple[list[tuple], dict]:
+    strategies = [
+        (f"fixed {args.low}", AdaptiveLimiter("low", initial=args.low, min_limit=args.low, max_limit=args.low)),
+        (f"fixed {args.high}", AdaptiveLimiter("high", initial=args.high, min_limit=args.high, max_limit=args.high)),
+        ("adaptive", AdaptiveLimiter("adaptive", enabled=True)),
+    ]
+    rows = []
+    for name, limiter in strategies:
+        rows += await run(name, limiter, args.seconds, args.workers, args.latency, args.seed)
+    return rows, strategies[-1][1].get_stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=10, help="Duration of each strategy's run (split across phases)")
+    parser.add_argument("--workers", type=int, default=48, help="Concurrent simulated clients")
+    parser.add_argument("--latency", type=float, default=0.05, help="Unloaded call latency in seconds")
+    parser.add_argument("--low", type=int, default=4, help="Fixed limit that is too low")
+    parser.add_argument("--high", type=int, default=32, help="Fixed limit that is too high")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rows, stats = asyncio.run(simulate(args))
+
+    print(f"{'strategy':>10}{'phase':>7}{'ok/s':>8}{'429s':>7}{'p50 ms':>9}{'p95 ms':>9}{'limit':>8}")
+    for name, phase, throughput, rejected, p50, p95, limit in rows:
+        print(f"{name:>10}{phase:>7}{throughput:>8.1f}{rejected:>7}{p50:>9.1f}{p95:>9.1f}{limit:>8.1f}")
+
+    print(
+        f"\nadaptive limiter: {stats['increases']} increases, {stats['decreases_latency']} latency decreases, "
+        f"{stats['decreases_rate_limited']} rate-limit decreases; last limit changes:"
+    )
+    for decision in stats["decisions"][-5:]:
+        print(f"  {decision['reason']:>13}: {decision['limit_before']} -> {decision['limit']}")
+
+
+if __name__ == "__main__":
+    main()
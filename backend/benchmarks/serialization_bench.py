@@ -0,0 +1,94 @@
+"""
+Compare encode and decode throughput of product payloads on the default FastAPI path
+and on the fast path used by the bulk endpoints.
+
+    decode  before: json.loads + List[ProductCreate] validation of the Python objects
+            after:  TypeAdapter(List[ProductCreate]).validate_json on the raw bytes
+    encode  before: jsonable_encoder + JSONResponse (what a plain `return products` does)
+            after:  ORJSONResponse on the documents directly
+
+The encoded bodies of both paths are checked to be byte-for-byte identical.
+
+Usage (from the backend directory):
+    python -m benchmarks.serialization_bench --sizes 1000 10000 --repeat 5
+"""
+import argparse
+import json
+import random
+import time
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+
+from app.models.product_model import ProductCreate, product_create_list_adapter
+from loadtest.data import make_product
+
+
+def best_of(repeat: int, fn) -> float:
+    """
+    Run `fn` `repeat` times and return the fastest wall time in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def stored_documents(products: list[dict]) -> list[dict]:
+    """
+    Shape products like the documents returned by GET /products/.
+    """
+    return [
+        {**product, "user_id": "benchmark-user", "id": f"{index:024x}"}
+        for index, product in enumerate(products)
+    ]
+
+
+def run(size: int, repeat: int, rng: random.Random) -> list[tuple]:
+    products = [make_product(rng) for _ in range(size)]
+    body = json.dumps(products).encode()
+    documents = stored_documents(products)
+
+    # FastAPI parses a List[ProductCreate] body with json.loads, then validates the Python objects
+    python_adapter = TypeAdapter(List[ProductCreate])
+
+    decode_before = best_of(repeat, lambda: python_adapter.validate_python(json.loads(body)))
+    decode_after = best_of(repeat, lambda: product_create_list_adapter.validate_json(body))
+
+    encode_before = best_of(repeat, lambda: JSONResponse(jsonable_encoder(documents)).body)
+    encode_after = best_of(repeat, lambda: ORJSONResponse(documents).body)
+
+    if JSONResponse(jsonable_encoder(documents)).body != ORJSONResponse(documents).body:
+        raise SystemExit("Encoded bodies differ between the default and the fast path")
+
+    megabytes = len(body) / 2**20
+    return [
+        (size, "decode", megabytes, decode_before, decode_after),
+        (size, "encode", megabytes, encode_before, encode_after),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (fastest is kept)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    rows = [row for size in args.sizes for row in run(size, args.repeat, rng)]
+
+    print(f"{'products':>9}{'op':>8}{'MB':>8}{'before ms':>11}{'after ms':>10}{'before MB/s':>13}{'after MB/s':>12}{'speedup':>9}")
+    for size, op, megabytes, before, after in rows:
+        print(
+            f"{size:>9}{op:>8}{megabytes:>8.1f}{before * 1000:>11.1f}{after * 1000:>10.1f}"
+            f"{megabytes / before:>13.1f}{megabytes / after:>12.1f}{before / after:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Measure how API throughput scales with the number of uvicorn worker processes.
+
+For each worker count the server is started with `python main.py` (WEB_CONCURRENCY=N)
+against a local MongoDB seeded once by the load-test seeder, then driven by the
+load-test harness in --base-url mode.
+
+Usage (from the backend directory):
+    python -m benchmarks.worker_scaling --workers 1 2 4 --skus 5000 --clients 64 --duration 20
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def wait_for_port(port: int, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server did not start listening on port {port}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="loadtest-scaling")
+    parser.add_argument("--users", type=int, default=4)
+    parser.add_argument("--skus", type=int, default=5000)
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--scenario", default="read-heavy")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    env = {**os.environ, "MONGO_URI": args.mongo_uri, "MONGO_DB_NAME": args.db}
+    workdir = tempfile.mkdtemp(prefix="worker-scaling-")
+    state = os.path.join(workdir, "state.json")
+
+    # Seed once; every worker count runs against the same catalogs
+    subprocess.run([
+        sys.executable, "-c",
+        "import json, sys; from loadtest.seed import seed; "
+        f"users = seed({args.mongo_uri!r}, {args.db!r}, {args.users}, {args.skus}, run_id='scaling'); "
+        f"json.dump({{'users': users}}, open({state!r}, 'w'))",
+    ], env=env, check=True)
+
+    results = []
+    for workers in args.workers:
+        server = subprocess.Popen(
+            [sys.executable, "main.py"],
+            env={**env, "WEB_CONCURRENCY": str(workers), "PORT": str(args.port)},
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_for_port(args.port)
+            output = os.path.join(workdir, f"workers-{workers}.json")
+            subprocess.run([
+                sys.executable, "-m", "loadtest.run",
+                "--base-url", f"http://127.0.0.1:{args.port}",
+                "--mongo-uri", args.mongo_uri, "--db", args.db,
+                "--reuse", "--state", state,
+                "--clients", str(args.clients), "--duration", str(args.duration),
+                "--scenario", args.scenario, "--output", output,
+            ], env=env, check=True, stdout=subprocess.DEVNULL)
+            with open(output) as report_file:
+                report = json.load(report_file)
+        finally:
+            server.terminate()  # SIGTERM exercises the graceful shutdown path
+            server.wait(timeout=60)
+
+        results.append((workers, report))
+
+    base_rps = results[0][1]["rps"] or 1
+    print(f"\n{'workers':>8}{'rps':>10}{'speedup':>10}{'max p50':>10}{'max p99':>10}")
+    for workers, report in results:
+        latencies = [op["p50_ms"] for op in report["operations"].values()] or [0]
+        tails = [op["p99_ms"] for op in report["operations"].values()] or [0]
+        print(f"{workers:>8}{report['rps']:>10}{report['rps'] / base_rps:>10.2f}{max(latencies):>10}{max(tails):>10}")
+
+
+if __name__ == "__main__":
+    main()
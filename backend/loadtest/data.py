@@ -0,0 +1,105 @@
+import random
+
+from app.core.auth import hash_password
+
+# Password shared by all synthetic users (hashed once, bcrypt is deliberately slow)
+PASSWORD = "loadtest-password"
+
+BRANDS = ["Acme", "Nordlys", "Verde", "Bluepeak", "Oakhaus", "Sunmill", "Kitori", "Maris", "Halden", "Pura"]
+PRODUCTS = [
+    "Shampoo", "Conditioner", "Body Wash", "Olive Oil", "Granola", "Dish Soap", "Toothpaste",
+    "Hand Cream", "Coffee Beans", "Green Tea", "Desk Lamp", "Water Bottle", "Yoga Mat", "Backpack",
+]
+VARIANTS = ["250ml", "500ml", "1L", "Small", "Medium", "Large", "Red", "Blue", "Black", "Pack of 6"]
+WORDS = (
+    "natural gentle everyday premium organic durable lightweight fresh classic soft rich smooth "
+    "balanced nourishing crafted sustainable refreshing essential compact versatile"
+).split()
+INGREDIENTS = ["Water", "Glycerin", "Aloe Vera", "Citric Acid", "Sodium Chloride", "Coconut Oil", "Vitamin E", "Fragrance"]
+STORAGE_OPTIONS = ["Room Temperature", "Refrigerated", "Frozen", "Cool And Dry"]
+COLOURS = ["Red", "Blue", "Green", "Black", "White", "Transparent"]
+MATERIALS = ["Plastic", "Glass", "Aluminium", "Cotton", "Bamboo", "Stainless Steel"]
+
+# Attribute definitions mirroring the types handled by GeneratePrompts
+ATTRIBUTE_SPECS = {
+    "product_description": {"label": "Product Description", "type": "rich_text"},
+    "item_weight": {"label": "Item Weight", "type": "measure", "unit": "g"},
+    "ingredients": {"label": "Ingredients", "type": "multiple_values"},
+    "storage_requirements": {"label": "Storage Requirements", "type": "single_select", "options": STORAGE_OPTIONS},
+    "items_per_package": {"label": "Items Per Package", "type": "number"},
+    "colour": {"label": "Colour", "type": "short_text"},
+    "material": {"label": "Material", "type": "short_text"},
+    "width": {"label": "Width", "type": "measure", "unit": "cm"},
+    "height": {"label": "Height", "type": "measure", "unit": "cm"},
+    "warranty": {"label": "Warranty", "type": "long_text"},
+}
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def attribute_value(rng: random.Random, name: str, spec: dict):
+    """
+    Generate a plausible filled value for an attribute definition.
+    """
+    attribute_type = spec["type"]
+    if attribute_type == "rich_text":
+        return "".join(f"<p>{sentence(rng, rng.randint(20, 40))}</p>" for _ in range(rng.randint(2, 4)))
+    if attribute_type == "long_text":
+        return sentence(rng, rng.randint(30, 60))
+    if attribute_type == "measure":
+        return f"{rng.randint(1, 1000)} {spec['unit']}"
+    if attribute_type == "number":
+        return str(rng.randint(1, 24))
+    if attribute_type == "multiple_values":
+        return rng.sample(INGREDIENTS, rng.randint(2, 5))
+    if attribute_type == "single_select":
+        return rng.choice(spec["options"])
+    if name == "colour":
+        return rng.choice(COLOURS)
+    return rng.choice(MATERIALS)
+
+
+def make_product(rng: random.Random, enriched_ratio: float = 0.5) -> dict:
+    """
+    Generate one synthetic product in the ProductCreate shape.
+
+    Args:
+        rng (random.Random): The random generator (seeded for reproducible catalogs).
+        enriched_ratio (float): Probability that the product already has enriched values.
+
+    Returns:
+        dict: The product (without user_id).
+    """
+    enriched = rng.random() < enriched_ratio
+    attributes = {}
+    for name, spec in ATTRIBUTE_SPECS.items():
+        filled = enriched and rng.random() < 0.9
+        attributes[name] = {
+            "label": spec["label"],
+            "value": attribute_value(rng, name, spec) if filled else "",
+            "type": spec["type"],
+            "unit": spec.get("unit"),
+            "options": spec.get("options", []),
+        }
+
+    return {
+        "product_name": f"{rng.choice(BRANDS)} {rng.choice(PRODUCTS)} {rng.choice(VARIANTS)}",
+        "brand": rng.choice(BRANDS),
+        "barcode": "".join(str(rng.randint(0, 9)) for _ in range(13)),
+        "images": [f"https://images.example.com/{rng.getrandbits(64):016x}.jpg"],
+        "isEnriched": enriched,
+        "attributes": attributes,
+    }
+
+
+def make_user(index: int, run_id: str, password_hash: str) -> dict:
+    """
+    Generate one synthetic user document, as stored by the register route.
+    """
+    return {"email": f"loadtest-{run_id}-{index}@example.com", "password": password_hash}
+
+
+def password_hash() -> str:
+    return hash_password(PASSWORD)
@@ -0,0 +1,101 @@
+import json
+import math
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of a list of values (0.0 for an empty list).
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize_latencies(latencies_ms: list[float]) -> dict:
+    return {
+        "p50_ms": round(percentile(latencies_ms, 50), 2),
+        "p90_ms": round(percentile(latencies_ms, 90), 2),
+        "p99_ms": round(percentile(latencies_ms, 99), 2),
+        "max_ms": round(max(latencies_ms, default=0.0), 2),
+    }
+
+
+def build_report(config: dict, operations: dict, duration: float, loop_lag_ms: list[float], memory: dict) -> dict:
+    """
+    Assemble the JSON report of a load-test run.
+
+    Args:
+        config (dict): The run parameters (scenario, clients, catalog size...).
+        operations (dict): Per operation: {"latencies_ms": [...], "errors": int}.
+        duration (float): Measured wall-clock duration of the run in seconds.
+        loop_lag_ms (list[float]): Event-loop lag samples of the server loop.
+        memory (dict): Memory figures in MB.
+
+    Returns:
+        dict: The report.
+    """
+    total = sum(len(op["latencies_ms"]) for op in operations.values())
+    return {
+        "config": config,
+        "duration_s": round(duration, 2),
+        "requests": total,
+        "rps": round(total / duration, 2) if duration else 0.0,
+        "operations": {
+            name: {
+                "count": len(op["latencies_ms"]),
+                "errors": op["errors"],
+                "rps": round(len(op["latencies_ms"]) / duration, 2) if duration else 0.0,
+                **summarize_latencies(op["latencies_ms"]),
+            }
+            for name, op in sorted(operations.items())
+        },
+        "event_loop_lag": summarize_latencies(loop_lag_ms) if loop_lag_ms else None,
+        "memory_mb": memory,
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Compare a report against a baseline report.
+
+    A regression is an operation whose throughput dropped, or whose p99 latency grew,
+    by more than `tolerance` (a fraction, e.g. 0.1 for 10%).
+
+    Returns:
+        list[str]: Human-readable regression descriptions (empty if none).
+    """
+    regressions = []
+    for name, current in report["operations"].items():
+        previous = baseline.get("operations", {}).get(name)
+        if not previous:
+            continue
+        if previous["rps"] and current["rps"] < previous["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: rps {previous['rps']} -> {current['rps']}")
+        if previous["p99_ms"] and current["p99_ms"] > previous["p99_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p99 {previous['p99_ms']}ms -> {current['p99_ms']}ms")
+    return regressions
+
+
+def print_report(report: dict, baseline: dict | None = None) -> None:
+    """
+    Print a report as a table, with the baseline's numbers alongside when given.
+    """
+    print(f"\n{report['requests']} requests in {report['duration_s']}s = {report['rps']} req/s")
+    print(f"{'operation':<14}{'count':>8}{'errors':>8}{'rps':>10}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}")
+    for name, op in report["operations"].items():
+        print(
+            f"{name:<14}{op['count']:>8}{op['errors']:>8}{op['rps']:>10}"
+            f"{op['p50_ms']:>10}{op['p90_ms']:>10}{op['p99_ms']:>10}{op['max_ms']:>10}"
+        )
+        previous = (baseline or {}).get("operations", {}).get(name)
+        if previous:
+            print(
+                f"{'  baseline':<14}{previous['count']:>8}{previous['errors']:>8}{previous['rps']:>10}"
+                f"{previous['p50_ms']:>10}{previous['p90_ms']:>10}{previous['p99_ms']:>10}{previous['max_ms']:>10}"
+            )
+    if report["event_loop_lag"]:
+        lag = report["event_loop_lag"]
+        print(f"event loop lag: p50 {lag['p50_ms']}ms, p99 {lag['p99_ms']}ms, max {lag['max_ms']}ms")
+    print(f"memory (MB): {json.dumps(report['memory_mb'])}")
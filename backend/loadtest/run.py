@@ -0,0 +1,288 @@
+"""
+Load-test the auth and product CRUD endpoints against a local MongoDB.
+
+By default the API runs in-process (uvicorn on a background thread with its own event loop),
+so the harness can sample that loop's lag and the process memory while concurrent clients
+drive a mixed workload over real HTTP. Pass --base-url to target an already running server
+instead (event-loop lag and server memory are then not reported).
+
+Usage (from the backend directory):
+    python -m loadtest.run --users 5 --skus 10000 --clients 50 --duration 30 --scenario mixed
+    python -m loadtest.run ... --save-baseline loadtest/baseline.json
+    python -m loadtest.run ... --baseline loadtest/baseline.json --tolerance 0.15
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import socket
+import sys
+import threading
+import time
+
+# Operation weights per scenario
+SCENARIOS = {
+    "mixed": {"list": 0.5, "create": 0.25, "delete": 0.1, "login": 0.1, "register": 0.05},
+    "read-heavy": {"list": 0.9, "create": 0.05, "login": 0.05},
+    "write-heavy": {"create": 0.6, "delete": 0.3, "list": 0.1},
+    "auth": {"login": 0.7, "register": 0.3},
+}
+
+# Interval between event-loop lag probes on the server loop
+LAG_PROBE_INTERVAL = 0.05
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="loadtest")
+    parser.add_argument("--users", type=int, default=5, help="Synthetic users to seed")
+    parser.add_argument("--skus", type=int, default=1000, help="Products per seeded user (1k-100k)")
+    parser.add_argument("--clients", type=int, default=20, help="Concurrent virtual clients")
+    parser.add_argument("--duration", type=float, default=30, help="Measured run time in seconds")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="mixed")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for data generation and operation mix")
+    parser.add_argument("--reset", action="store_true", help="Drop the load-test database before seeding")
+    parser.add_argument("--reuse", action="store_true", help="Reuse the users seeded by the previous run")
+    parser.add_argument("--state", default=os.path.join(os.path.dirname(__file__), ".state.json"))
+    parser.add_argument("--base-url", help="Target a running server instead of an in-process one")
+    parser.add_argument("--baseline", help="Compare against this baseline report")
+    parser.add_argument("--save-baseline", help="Write this run's report as a baseline")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Allowed regression vs baseline (fraction)")
+    parser.add_argument("--output", help="Write this run's JSON report to a file")
+    return parser.parse_args()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def rss_mb() -> float:
+    """
+    Current resident set size of this process in MB.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+class ServerThread:
+    def __init__(self, port: int):
+        """
+        Runs the API with uvicorn on a dedicated thread and event loop.
+        """
+        import uvicorn
+        from app.api import app
+
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self.server.serve())
+
+    def start(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.05)
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+
+
+async def probe_loop_lag(samples: list[float], stop: threading.Event):
+    """
+    Measure how late the server loop wakes up from a fixed sleep (runs on the server loop).
+    """
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        started = loop.time()
+        await asyncio.sleep(LAG_PROBE_INTERVAL)
+        samples.append(max(0.0, loop.time() - started - LAG_PROBE_INTERVAL) * 1000)
+
+
+class VirtualClient:
+    def __init__(self, http, email: str, rng: random.Random, weights: dict, operations: dict):
+        """
+        One simulated user session issuing a weighted mix of operations.
+        """
+        self.http = http
+        self.email = email
+        self.rng = rng
+        self.names = list(weights)
+        self.weights = list(weights.values())
+        self.operations = operations
+        self.headers = {}
+        self.created_ids = []
+
+    async def timed(self, name: str, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await self.http.request(method, url, **kwargs)
+            ok = response.status_code < 400
+        except Exception:
+            response, ok = None, False
+        self.operations[name]["latencies_ms"].append((time.perf_counter() - started) * 1000)
+        if not ok:
+            self.operations[name]["errors"] += 1
+        return response if ok else None
+
+    async def login(self):
+        from .data import PASSWORD
+
+        response = await self.timed("login", "POST", "/api/login", json={"email": self.email, "password": PASSWORD})
+        if response is not None:
+            self.headers = {"Authorization": f"Bearer {response.json()['access']}"}
+
+    async def register(self):
+        from .data import PASSWORD
+
+        email = f"loadtest-new-{self.rng.getrandbits(64):016x}@example.com"
+        await self.timed("register", "POST", "/api/register", json={"email": email, "password": PASSWORD})
+
+    async def list(self):
+        await self.timed("list", "GET", "/api/products/", headers=self.headers)
+
+    async def create(self):
+        from .data import make_product
+
+        response = await self.timed("create", "POST", "/api/products/", headers=self.headers, json=make_product(self.rng))
+        if response is not None:
+            self.created_ids.append(response.json()["id"])
+
+    async def delete(self):
+        if not self.created_ids:
+            return await self.create()
+        ids, self.created_ids = self.created_ids[:5], self.created_ids[5:]
+        await self.timed("delete", "DELETE", "/api/products/bulk-delete", headers=self.headers, json={"ids": ids})
+
+    async def run(self, until: float):
+        await self.login()
+        while time.perf_counter() < until:
+            name = self.rng.choices(self.names, self.weights)[0]
+            await getattr(self, name)()
+
+
+async def drive(base_url: str, emails: list[str], args) -> tuple[dict, float]:
+    """
+    Run the virtual clients for the configured duration.
+
+    Returns:
+        tuple[dict, float]: Per-operation samples and the measured duration.
+    """
+    import httpx
+
+    weights = SCENARIOS[args.scenario]
+    operations = {name: {"latencies_ms": [], "errors": 0} for name in [*weights, "login"]}
+    limits = httpx.Limits(max_connections=args.clients, max_keepalive_connections=args.clients)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as http:
+        started = time.perf_counter()
+        clients = [
+            VirtualClient(http, emails[index % len(emails)], random.Random(args.seed + index), weights, operations)
+            for index in range(args.clients)
+        ]
+        await asyncio.gather(*(client.run(started + args.duration) for client in clients))
+        duration = time.perf_counter() - started
+
+    return operations, duration
+
+
+def load_users(args) -> list[str]:
+    """
+    Seed fresh users (or reuse the previous run's) and return their emails.
+    """
+    if args.reuse and os.path.exists(args.state):
+        with open(args.state) as state_file:
+            return [user["email"] for user in json.load(state_file)["users"]]
+
+    from pymongo import MongoClient
+    from .seed import seed
+
+    if args.reset:
+        MongoClient(args.mongo_uri).drop_database(args.db)
+
+    print(f"Seeding {args.users} user(s) x {args.skus} SKUs into {args.db}...")
+    users = seed(args.mongo_uri, args.db, args.users, args.skus, run_id=str(int(time.time())), rng_seed=args.seed)
+    with open(args.state, "w") as state_file:
+        json.dump({"users": users, "skus": args.skus}, state_file)
+    return [user["email"] for user in users]
+
+
+def main():
+    args = parse_args()
+
+    # The app reads its database settings at import time
+    os.environ["MONGO_URI"] = args.mongo_uri
+    os.environ["MONGO_DB_NAME"] = args.db
+
+    from .report import build_report, compare, print_report
+
+    emails = load_users(args)
+
+    server, lag_samples, stop_probe = None, [], threading.Event()
+    base_url = args.base_url
+    if not base_url:
+        port = free_port()
+        server = ServerThread(port)
+        server.start()
+        asyncio.run_coroutine_threadsafe(probe_loop_lag(lag_samples, stop_probe), server.loop)
+        base_url = f"http://127.0.0.1:{port}"
+
+    rss_before = rss_mb()
+    print(f"Running '{args.scenario}' with {args.clients} client(s) for {args.duration}s against {base_url}...")
+    operations, duration = asyncio.run(drive(base_url, emails, args))
+    memory = {"rss_start": round(rss_before, 1), "rss_end": round(rss_mb(), 1), "rss_peak": round(peak_rss_mb(), 1)}
+
+    stop_probe.set()
+    if server:
+        server.stop()
+    else:
+        memory = None  # The server runs elsewhere; the client's memory is not meaningful
+
+    config = {
+        "scenario": args.scenario,
+        "clients": args.clients,
+        "users": len(emails),
+        "skus": args.skus,
+        "in_process": server is not None,
+    }
+    report = build_report(config, operations, duration, lag_samples, memory)
+
+    baseline = None
+    if args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+    print_report(report, baseline)
+
+    for path in filter(None, [args.output, args.save_baseline]):
+        with open(path, "w") as report_file:
+            json.dump(report, report_file, indent=2)
+        print(f"Report written to {path}")
+
+    if baseline:
+        if baseline.get("config") != config:
+            print("Warning: baseline was recorded with a different configuration")
+        regressions = compare(report, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} of the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Seed a local MongoDB with synthetic users and product catalogs for load testing.
+
+Usage (from the backend directory):
+    python -m loadtest.seed --mongo-uri mongodb://localhost:27017 --db loadtest --users 5 --skus 10000
+"""
+import argparse
+import random
+import time
+
+from pymongo import MongoClient
+
+from . import data
+
+# Products are inserted in batches to keep memory flat for 100k-SKU catalogs
+INSERT_BATCH_SIZE = 1000
+
+
+def seed(mongo_uri: str, db_name: str, users: int, skus: int, run_id: str, rng_seed: int = 0) -> list[dict]:
+    """
+    Insert synthetic users, their catalogs and matching stats counters.
+
+    Args:
+        mongo_uri (str): MongoDB connection string.
+        db_name (str): Database to seed (the same one the API is pointed at).
+        users (int): Number of users to create.
+        skus (int): Number of products per user.
+        run_id (str): Identifier embedded in user emails so runs do not collide.
+        rng_seed (int): Seed for the synthetic data generator.
+
+    Returns:
+        list[dict]: The seeded users' emails and ids.
+    """
+    from app.core.stats import stats_pipeline
+
+    client = MongoClient(mongo_uri)
+    db = client[db_name]
+    rng = random.Random(rng_seed)
+    password_hash = data.password_hash()
+
+    seeded = []
+    for index in range(users):
+        user = data.make_user(index, run_id, password_hash)
+        user_id = str(db["users"].insert_one(user).inserted_id)
+
+        batch = []
+        for _ in range(skus):
+            batch.append({**data.make_product(rng), "user_id": user_id})
+            if len(batch) >= INSERT_BATCH_SIZE:
+                db["products"].insert_many(batch, ordered=False)
+                batch = []
+        if batch:
+            db["products"].insert_many(batch, ordered=False)
+
+        # Build the user's stats counters with the same pipeline the rebuild endpoint uses
+        facets = next(db["products"].aggregate(stats_pipeline(user_id)))
+        totals = facets["totals"][0] if facets["totals"] else {}
+        db["product_stats"].replace_one({"_id": user_id}, {
+            "total": totals.get("total", 0),
+            "enriched": totals.get("enriched", 0),
+            "attributes": {row["_id"]: {"count": row["count"], "filled": row["filled"]} for row in facets["attributes"]},
+        }, upsert=True)
+
+        seeded.append({"email": user["email"], "id": user_id})
+
+    db["products"].create_index("user_id")
+    client.close()
+    return seeded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="loadtest")
+    parser.add_argument("--users", type=int, default=5)
+    parser.add_argument("--skus", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    users = seed(args.mongo_uri, args.db, args.users, args.skus, run_id=str(int(time.time())), rng_seed=args.seed)
+    print(f"Seeded {len(users)} user(s) x {args.skus} SKUs in {time.perf_counter() - started:.1f}s")
+    for user in users:
+        print(f"  {user['email']} ({user['id']})")
+
+
+if __name__ == "__main__":
+    main()
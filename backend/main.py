@@ -1,8 +1,17 @@
 import uvicorn
 import os
+from app.core.config import WEB_CONCURRENCY, GRACEFUL_SHUTDOWN_SECONDS
 
 if __name__ == "__main__":
     # Get the port from the environment variable, default to 8080 if not set
     port = int(os.environ.get("PORT", 8080))
-    uvicorn.run("app.api:app", host="0.0.0.0", port=port)
-    
\ No newline at end of file
+
+    # Run WEB_CONCURRENCY worker processes; on SIGTERM each worker stops accepting
+    # connections and gets GRACEFUL_SHUTDOWN_SECONDS to finish in-flight requests
+    uvicorn.run(
+        "app.api:app",
+        host="0.0.0.0",
+        port=port,
+        workers=WEB_CONCURRENCY,
+        timeout_graceful_shutdown=GRACEFUL_SHUTDOWN_SECONDS
+    )
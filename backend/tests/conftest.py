@@ -0,0 +1,48 @@
+import json
+import os
+import types
+
+import pytest
+
+# Settings read at import time; set before any app module is imported
+os.environ.setdefault("MONGO_DB_NAME", "test")
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "test")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "test")
+
+
+def model_response(text: str):
+    """
+    A minimal Gemini response carrying `text` as its only part.
+    """
+    part = types.SimpleNamespace(text=text)
+    return types.SimpleNamespace(
+        candidates=[types.SimpleNamespace(content=types.SimpleNamespace(parts=[part]))],
+        usage_metadata=None,
+    )
+
+
+class FakeGenerativeModel:
+    """
+    Stand-in for vertexai's GenerativeModel that records requests and answers with queued JSON values.
+    """
+    requests: list[dict] = []
+    answers: list[dict] = []
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    async def generate_content_async(self, **request):
+        FakeGenerativeModel.requests.append(request)
+        return model_response(json.dumps(FakeGenerativeModel.answers.pop(0)))
+
+
+@pytest.fixture
+def fake_gemini(monkeypatch):
+    import vertexai
+    from app.routes.ai_enrichment.helpers import ProductAgent
+
+    monkeypatch.setattr(vertexai, "init", lambda **kwargs: None)
+    monkeypatch.setattr(ProductAgent, "GenerativeModel", FakeGenerativeModel)
+    FakeGenerativeModel.requests = []
+    FakeGenerativeModel.answers = []
+    return FakeGenerativeModel
@@ -0,0 +1,155 @@
+import asyncio
+import types
+
+import pytest
+
+from app.routes.ai_enrichment.helpers import AdaptiveLimiter as module
+from app.routes.ai_enrichment.helpers.AdaptiveLimiter import AdaptiveLimiter
+
+
+class QuotaExceeded(Exception):
+    code = 429
+
+
+class FakeBackend:
+    """
+    A model endpoint on a fake clock: each call takes `latency` seconds, and calls
+    beyond `quota` in flight are rejected with a 429.
+    """
+
+    def __init__(self, monkeypatch, latency: float = 1.0, quota: int = 100):
+        self.now = 0.0
+        self.latency = latency
+        self.quota = quota
+        self.in_flight = 0
+        monkeypatch.setattr(module, "time", types.SimpleNamespace(monotonic=lambda: self.now, time=lambda: self.now))
+
+    async def generate(self):
+        self.in_flight += 1
+        try:
+            over_quota = self.in_flight > self.quota
+            await asyncio.sleep(0)
+            if over_quota:
+                raise QuotaExceeded()
+            self.now += self.latency
+            return "ok"
+        finally:
+            self.in_flight -= 1
+
+
+def limiter(**kwargs) -> AdaptiveLimiter:
+    options = {"enabled": True, "initial": 4, "min_limit": 1, "max_limit": 20, "tolerance": 2.0, "backoff": 0.5}
+    return AdaptiveLimiter("test-model", **{**options, **kwargs})
+
+
+async def run_calls(limiter: AdaptiveLimiter, backend: FakeBackend, count: int) -> list:
+    return await asyncio.gather(*(limiter.call(backend.generate) for _ in range(count)), return_exceptions=True)
+
+
+def test_limit_grows_while_calls_queue(monkeypatch):
+    backend = FakeBackend(monkeypatch)
+    limit = limiter()
+
+    results = asyncio.run(run_calls(limit, backend, 40))
+
+    assert results == ["ok"] * 40
+    assert limit.limit > 6
+    assert limit.stats["increases"] > 0 and limit.in_flight == 0
+
+
+def test_limit_stays_when_calls_do_not_queue(monkeypatch):
+    backend = FakeBackend(monkeypatch)
+    limit = limiter()
+
+    async def sequential():
+        for _ in range(10):
+            await limit.call(backend.generate)
+
+    asyncio.run(sequential())
+    assert limit.limit == 4
+
+
+def test_rate_limit_backs_off_once_per_episode(monkeypatch):
+    backend = FakeBackend(monkeypatch, quota=2)
+    limit = limiter(initial=8)
+
+    results = asyncio.run(run_calls(limit, backend, 8))
+
+    assert sum(isinstance(result, QuotaExceeded) for result in results) == 6
+    assert limit.stats["rate_limited"] == 6
+    assert limit.stats["decreases_rate_limited"] == 1
+    assert limit.limit == 4
+
+
+def test_latency_rise_lowers_the_limit(monkeypatch):
+    backend = FakeBackend(monkeypatch, latency=1.0)
+    limit = limiter(initial=10)
+
+    async def scenario():
+        for _ in range(50):
+            await limit.call(backend.generate)
+        backend.latency = 5.0
+        for _ in range(10):
+            await limit.call(backend.generate)
+
+    asyncio.run(scenario())
+
+    assert limit.stats["decreases_latency"] == 1
+    assert limit.limit == pytest.approx(10 * 2 / 3)
+    assert limit.decisions[-1]["reason"] == "latency"
+
+
+def test_cancelled_waiter_skipped_by_grant():
+    async def scenario():
+        limit = limiter(initial=1)
+        await limit.acquire()
+        waiter = asyncio.create_task(limit.acquire())
+        await asyncio.sleep(0)
+
+        # Cancel the waiter and free the slot before it runs again: _grant pops the cancelled future
+        waiter.cancel()
+        limit.release()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return limit
+
+    limit = asyncio.run(scenario())
+    assert limit.in_flight == 0 and not limit.waiters
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def scenario():
+        limit = limiter(initial=1)
+        await limit.acquire()
+        waiter = asyncio.create_task(limit.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        limit.release()
+        return limit
+
+    limit = asyncio.run(scenario())
+    assert limit.in_flight == 0 and not limit.waiters
+
+
+def test_change_in_call_mix_is_not_overload(monkeypatch):
+    backend = FakeBackend(monkeypatch, latency=1.0)
+    limit = limiter(initial=10)
+
+    async def scenario():
+        # A stretch of short repairs, then a burst of slow but normal searches
+        for _ in range(50):
+            await limit.call(backend.generate, kind="repair")
+        backend.latency = 5.0
+        for _ in range(20):
+            await limit.call(backend.generate, kind="search")
+
+    asyncio.run(scenario())
+
+    assert limit.stats["decreases_latency"] == 0
+    assert limit.limit == 10
+    assert limit.get_stats()["latency_ms"] == {
+        "repair": {"recent": 1000, "typical": 1000},
+        "search": {"recent": 5000, "typical": 5000},
+    }
@@ -0,0 +1,70 @@
+import pytest
+
+from app.routes.ai_enrichment.helpers.AttributeValidator import AttributeValidator, parse_quantity
+
+VALIDATOR = AttributeValidator([
+    {"name": "length", "type": "measure", "unit": "cm"},
+    {"name": "weight", "type": "measure", "unit": "g"},
+    {"name": "count", "type": "number"},
+])
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("1 ft 2 in", "35.56 cm"),
+    ("5 ft, 4 in", "162.56 cm"),
+    ("12 cm", "12 cm"),
+    ("0.5 m", "50 cm"),
+])
+def test_length_is_converted(value, expected):
+    assert VALIDATOR.validate_value("length", value) == expected
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2 lb 3 oz", "992.233 g"),
+    ("1.2 kg", "1200 g"),
+    ("1,5 kg", "1500 g"),
+])
+def test_weight_is_converted(value, expected):
+    assert VALIDATOR.validate_value("weight", value) == expected
+
+
+@pytest.mark.parametrize("value", [
+    "10 x 20 cm",
+    "5 in (14 cm)",
+    "5 ft 11",
+    "2 in 1 ft",
+])
+def test_several_quantities_are_rejected(value):
+    with pytest.raises(ValueError):
+        VALIDATOR.validate_value("length", value)
+
+
+def test_rejected_quantity_goes_to_repair():
+    valid, failures = VALIDATOR.validate({"length": "1 ft 2 in", "weight": "250 g (8.8 oz)", "count": "12"})
+    assert valid == {"length": "35.56 cm", "count": "12"}
+    assert list(failures) == ["weight"]
+
+
+def test_single_quantity_keeps_its_unit():
+    assert parse_quantity("1,000 ml") == (1000.0, "ml")
+    assert parse_quantity("no number") is None
+
+
+def test_title_cased_answer_keys_match_attribute_names():
+    validator = AttributeValidator([
+        {"name": "width", "type": "measure", "unit": "cm"},
+        {"name": "net weight", "type": "measure", "unit": "g"},
+    ])
+
+    valid, failures = validator.validate({"Width": "45 cm", " Net  Weight ": "0.25 kg", "Colour": "Red"})
+
+    assert valid == {"width": "45 cm", "net weight": "250 g"}
+    assert failures == {}
+
+
+def test_exact_answer_key_wins():
+    validator = AttributeValidator([{"name": "width", "type": "measure", "unit": "cm"}])
+
+    valid, _ = validator.validate({"Width": "oops", "width": "45 cm"})
+
+    assert valid == {"width": "45 cm"}
@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from app.routes.ai_enrichment.helpers.HedgedCaller import HedgedCaller
+
+
+def caller() -> HedgedCaller:
+    hedged = HedgedCaller("test", enabled=True, percentile=50, max_ratio=1.0, min_samples=1, window=10)
+    hedged.latencies.append(0.05)
+    return hedged
+
+
+def test_hedge_win_records_primary_elapsed_time():
+    hedged = caller()
+    delays = iter([1.0, 0.01])
+
+    async def attempt():
+        await asyncio.sleep(next(delays))
+        return "ok"
+
+    assert asyncio.run(hedged.call(attempt)) == "ok"
+
+    # The primary was cancelled after ~60 ms; the fast hedge's latency is not recorded
+    assert len(hedged.latencies) == 2
+    assert hedged.latencies[-1] >= 0.05
+    assert hedged.stats["hedges_won"] == 1
+    assert hedged.stats["censored_samples"] == 1
+
+
+def test_primary_win_records_its_latency():
+    hedged = caller()
+
+    async def attempt():
+        await asyncio.sleep(0.01)
+        return "ok"
+
+    asyncio.run(hedged.call(attempt))
+    assert len(hedged.latencies) == 2
+    assert 0.01 <= hedged.latencies[-1] < 0.05
+    assert hedged.stats["censored_samples"] == 0
+
+
+def test_cancelled_call_records_elapsed_time():
+    hedged = HedgedCaller("test", enabled=False)
+
+    async def attempt():
+        await asyncio.sleep(10)
+
+    async def main():
+        await asyncio.wait_for(hedged.call(attempt), timeout=0.05)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(main())
+    assert len(hedged.latencies) == 1
+    assert hedged.latencies[0] >= 0.05
+    assert hedged.stats["censored_samples"] == 1
+
+
+def test_failed_primary_is_not_recorded():
+    hedged = HedgedCaller("test", enabled=False)
+
+    async def attempt():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(hedged.call(attempt))
+    assert len(hedged.latencies) == 0
@@ -0,0 +1,61 @@
+import pytest
+from fastapi.testclient import TestClient
+from mongomock_motor import AsyncMongoMockClient
+
+from app.api import app
+from app.core import idempotency
+from app.core.auth import get_current_user
+from app.routes import product
+
+BODY = {"ids": ["6650f0c2a1b2c3d4e5f60718"]}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(idempotency, "enrich_requests_collection", AsyncMongoMockClient()["test"]["enrich_requests"])
+    app.dependency_overrides[get_current_user] = lambda: {"sub": "user-1"}
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def fake_enrich(results: list[list[dict]]):
+    calls = []
+
+    async def run_enrich_request(enrich_request, prompts, user):
+        calls.append(enrich_request)
+        enriched_results = results[len(calls) - 1]
+        return {"message": f"Enriched {len(enriched_results)} product(s)", "enriched_results": enriched_results, "skipped": 0}
+
+    return run_enrich_request, calls
+
+
+def test_completed_request_is_replayed(client, monkeypatch):
+    run_enrich_request, calls = fake_enrich([[]])
+    monkeypatch.setattr(product, "run_enrich_request", run_enrich_request)
+
+    first = client.put("/api/products/enrich", json=BODY, headers={"Idempotency-Key": "k1"})
+    second = client.put("/api/products/enrich", json=BODY, headers={"Idempotency-Key": "k1"})
+
+    assert first.status_code == second.status_code == 200
+    assert second.headers.get("Idempotent-Replayed") == "true"
+    assert second.json() == first.json()
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize("failure", [
+    {"product_id": "6650f0c2a1b2c3d4e5f60718", "error": "Enrichment deadline exceeded while waiting for capacity"},
+    {"product_id": "6650f0c2a1b2c3d4e5f60718", "partial": True, "degraded_stages": ["search"]},
+])
+def test_unfinished_request_is_run_again(client, monkeypatch, failure):
+    run_enrich_request, calls = fake_enrich([[failure], []])
+    monkeypatch.setattr(product, "run_enrich_request", run_enrich_request)
+
+    first = client.put("/api/products/enrich", json=BODY, headers={"Idempotency-Key": "k2"})
+    second = client.put("/api/products/enrich", json=BODY, headers={"Idempotency-Key": "k2"})
+    third = client.put("/api/products/enrich", json=BODY, headers={"Idempotency-Key": "k2"})
+
+    assert first.json()["enriched_results"] == [failure]
+    assert "Idempotent-Replayed" not in second.headers
+    assert second.json()["enriched_results"] == []
+    assert third.headers.get("Idempotent-Replayed") == "true"
+    assert len(calls) == 2
@@ -0,0 +1,82 @@
+import asyncio
+import io
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from PIL import Image
+
+from app.routes.ai_enrichment.AttributeEnricher import AttributeEnricher
+
+
+def png_bytes() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (8, 8), "red").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/missing.png":
+            self.send_error(404)
+            return
+        data = png_bytes()
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        if self.path == "/slow.png":
+            # Trickle bytes so that no single read times out but the whole download takes ~3s
+            self.send_header("Content-Length", "300")
+            self.end_headers()
+            for _ in range(30):
+                self.wfile.write(b"x" * 10)
+                self.wfile.flush()
+                time.sleep(0.1)
+        else:
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def image_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def enricher(images: list[str]) -> AttributeEnricher:
+    return AttributeEnricher({
+        "product_name": "Test Product",
+        "brand": "Brand",
+        "images": images,
+        "attributes": {"color": {"type": "short_text", "value": ""}},
+    })
+
+
+def test_download_is_bounded_by_total_timeout(image_server):
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        enricher([]).load_image_bytes(f"{image_server}/slow.png", timeout=0.5)
+    assert time.monotonic() - started < 1.5
+
+
+def test_partial_image_load_is_degraded(image_server):
+    product = enricher([f"{image_server}/ok.png", f"{image_server}/missing.png", f"{image_server}/slow.png"])
+    parts = asyncio.run(product.retrieve_image_parts_async(0.5))
+
+    assert len(parts) == 1
+    assert product.degraded_stages == ["images"]
+
+
+def test_complete_image_load_is_not_degraded(image_server):
+    product = enricher([f"{image_server}/ok.png"])
+    parts = asyncio.run(product.retrieve_image_parts_async(5))
+
+    assert len(parts) == 1
+    assert product.degraded_stages == []
@@ -0,0 +1,54 @@
+import io
+
+from PIL import Image
+
+from app.routes.ai_enrichment.helpers.ImageNormalizer import ImageNormalizer
+
+
+def jpeg(size: tuple[int, int], quality: int, orientation: int | None = None) -> bytes:
+    image = Image.effect_noise(size, 64).convert("RGB")
+    exif = Image.Exif()
+    if orientation is not None:
+        exif[0x0112] = orientation
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=quality, exif=exif)
+    return buffer.getvalue()
+
+
+def test_small_compressed_image_keeps_its_bytes():
+    data = jpeg((200, 150), quality=20)
+    normalizer = ImageNormalizer(max_dimension=1024, output_format="WEBP", quality=95)
+
+    image = normalizer.normalize(data)
+
+    assert image.data == data and image.mime_type == "image/jpeg"
+    assert image.tokens == image.original_tokens == 258
+
+
+def test_large_image_is_downscaled_and_re_encoded():
+    data = jpeg((2000, 1000), quality=95)
+    normalizer = ImageNormalizer(max_dimension=768, output_format="WEBP", quality=80)
+
+    image = normalizer.normalize(data)
+
+    assert image.mime_type == "image/webp"
+    assert image.num_bytes < len(data)
+    assert (image.original_tokens, image.tokens) == (3 * 2 * 258, 258)
+
+
+def test_rotated_image_is_re_encoded():
+    data = jpeg((200, 200), quality=20, orientation=6)
+    normalizer = ImageNormalizer(max_dimension=1024, output_format="WEBP", quality=95)
+
+    assert normalizer.normalize(data).mime_type == "image/webp"
+
+
+def test_passthrough_images_are_left_out_of_the_totals():
+    normalizer = ImageNormalizer()
+    normalizer.normalize(b"\xff\xd8\xff not really a jpeg")
+    normalizer.normalize(b"\xff\xd8\xff not really a jpeg")
+
+    assert normalizer.stats["images"] == 2
+    assert normalizer.stats["passthrough"] == 2
+    assert normalizer.stats["bytes_in"] == normalizer.stats["bytes_out"] == 0
+    assert normalizer.stats["tokens_in"] == normalizer.stats["tokens_out"] == 0
@@ -0,0 +1,42 @@
+from bson import ObjectId
+
+from app.core.live import change_pipeline, to_message
+
+PRODUCT_ID = ObjectId()
+
+
+def update_event(updated_fields: dict) -> dict:
+    return {
+        "_id": {"_data": "token-1"},
+        "operationType": "update",
+        "documentKey": {"_id": PRODUCT_ID},
+        "updateDescription": {"updatedFields": updated_fields, "removedFields": []},
+        "user_id": "user-1",
+    }
+
+
+def test_pipeline_drops_nested_grounding():
+    (unset,) = [stage["$unset"] for stage in change_pipeline("user-1") if "$unset" in stage]
+    assert "fullDocument.enrichment.grounding" in unset
+    assert "updateDescription.updatedFields.enrichment.grounding" in unset
+
+
+def test_nested_grounding_is_not_sent():
+    message = to_message(update_event({
+        "isEnriched": True,
+        "enrichment": {"spec_hash": "h", "grounding": "search text"},
+    }))
+
+    assert message["set"] == {"isEnriched": True, "enrichment": {"spec_hash": "h"}}
+    assert message["id"] == str(PRODUCT_ID)
+
+
+def test_dotted_grounding_is_not_sent():
+    message = to_message(update_event({
+        "attributes.color.value": "Red",
+        "enrichment.spec_hash": "h",
+        "enrichment.grounding": "search text",
+    }))
+
+    assert message["set"] == {"attributes.color.value": "Red", "enrichment.spec_hash": "h"}
+    assert message["unset"] == [] and message["type"] == "update"
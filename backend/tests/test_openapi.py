@@ -0,0 +1,36 @@
+import json
+import re
+
+from app.api import app
+
+
+def unresolved_refs(fragment: dict, components: dict) -> list[str]:
+    refs = set(re.findall(r'"\$ref": "([^"]+)"', json.dumps(fragment)))
+    return [
+        ref for ref in refs
+        if not ref.startswith("#/components/schemas/") or ref.rsplit("/", 1)[1] not in components
+    ]
+
+
+def test_enrich_body_references_resolve():
+    schema = app.openapi()
+    components = schema["components"]["schemas"]
+    body = schema["paths"]["/api/products/enrich"]["put"]["requestBody"]
+
+    assert body["content"]["application/json"]["schema"]["title"] == "EnrichProductsRequest"
+    assert not unresolved_refs(body, components)
+    assert not unresolved_refs(components, components)
+
+
+def test_bulk_create_body_references_resolve():
+    schema = app.openapi()
+    components = schema["components"]["schemas"]
+    body = schema["paths"]["/api/products/bulk"]["post"]["requestBody"]
+
+    assert body["content"]["application/json"]["schema"]["type"] == "array"
+    assert not unresolved_refs(body, components)
+
+
+def test_all_schema_references_resolve():
+    schema = app.openapi()
+    assert not unresolved_refs(schema, schema["components"]["schemas"])
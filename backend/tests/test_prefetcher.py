@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from app.core.scheduler import FairScheduler
+from app.routes.ai_enrichment import Prefetcher as module
+from app.routes.ai_enrichment.Prefetcher import Prefetcher
+
+PRODUCT = {"_id": "6650f0c2a1b2c3d4e5f60718", "product_name": "Shampoo", "brand": "Brand X", "attributes": {}}
+
+
+class SlowEnricher:
+    def __init__(self, product_json):
+        pass
+
+    async def prefetch_inputs_async(self, deadline, max_image_bytes):
+        await asyncio.sleep(60)
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    scheduler = FairScheduler(capacity=4, user_limit=2, interactive_reserved=0, weights={})
+    monkeypatch.setattr(module, "enrichment_scheduler", scheduler)
+    monkeypatch.setattr(module, "AttributeEnricher", SlowEnricher)
+    monkeypatch.setattr(module, "prefetch_budget_collection", AsyncMongoMockClient()["test"]["prefetch_budget"])
+    return scheduler
+
+
+def products(count: int) -> list[dict]:
+    return [{**PRODUCT, "_id": f"6650f0c2a1b2c3d4e5f607{index:02d}"} for index in range(count)]
+
+
+def test_enrich_cancels_the_pending_prefetch(scheduler):
+    async def scenario():
+        prefetcher = Prefetcher(enabled=True, user_budget=10)
+        assert await prefetcher.schedule("user-1", [PRODUCT]) == 1
+        await asyncio.sleep(0)
+        assert scheduler.get_stats()["background_running"] == 1
+
+        prefetcher.cancel("user-1", [PRODUCT["_id"]])
+        await asyncio.sleep(0)
+        return prefetcher
+
+    prefetcher = asyncio.run(scenario())
+    assert prefetcher.tasks == {}
+    assert prefetcher.stats["cancelled"] == 1
+    assert scheduler.get_stats()["background_running"] == 0
+
+
+def test_budget_is_shared_between_processes(scheduler):
+    async def scenario():
+        # Two workers of the same deployment
+        first, second = Prefetcher(enabled=True, user_budget=5), Prefetcher(enabled=True, user_budget=5)
+        queued = [
+            await first.schedule("user-1", products(3)),
+            await second.schedule("user-1", products(3)),
+            await first.schedule("user-1", products(1)),
+            await second.schedule("user-2", products(1)),
+        ]
+        stats = await second.get_stats("user-1")
+        await first.close()
+        await second.close()
+        return queued, stats
+
+    queued, stats = asyncio.run(scenario())
+    assert queued == [3, 2, 0, 1]
+    assert stats["budget"] == {"used": 5, "limit": 5}
+    assert stats["over_budget"] == 1
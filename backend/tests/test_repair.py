@@ -0,0 +1,52 @@
+import asyncio
+
+from vertexai.preview.generative_models import Part
+
+from app.routes.ai_enrichment.AttributeEnricher import AttributeEnricher
+from app.routes.ai_enrichment.helpers.Deadline import Deadline
+from app.routes.ai_enrichment.helpers.ProductAgent import ProductAgent
+
+
+def enricher() -> AttributeEnricher:
+    return AttributeEnricher({
+        "product_name": "Oak Side Table",
+        "brand": "Woodly",
+        "barcode": "4006381333931",
+        "attributes": {
+            "width": {"type": "measure", "unit": "cm", "value": ""},
+            "material": {"type": "short_text", "value": ""},
+        },
+    })
+
+
+def test_repair_sends_the_first_pass_evidence(fake_gemini):
+    fake_gemini.answers = [{"width": "45 cm"}]
+    image = Part.from_data(b"\x89PNG", mime_type="image/png")
+
+    values = asyncio.run(enricher().validate_and_repair(
+        {"width": "45 x 60 cm", "material": "Oak"},
+        ProductAgent("gemini-test"),
+        Deadline(10),
+        "The Woodly Oak Side Table is 45 cm wide and 60 cm deep.",
+        [image],
+    ))
+
+    assert values == {"width": "45 cm", "material": "Oak"}
+    contents = fake_gemini.requests[0]["contents"]
+    assert contents[0] is image
+    prompt = contents[-1].text
+    assert "45 cm wide and 60 cm deep" in prompt
+    assert "4006381333931" in prompt
+    assert "45 x 60 cm" in prompt
+
+
+def test_values_still_invalid_after_repair_are_not_stored(fake_gemini):
+    fake_gemini.answers = [{"width": "about 45 or 50 cm"}]
+    product = enricher()
+
+    values = asyncio.run(product.validate_and_repair(
+        {"width": "45 x 60 cm", "material": "Oak"}, ProductAgent("gemini-test"), Deadline(10), "Not available.", []
+    ))
+
+    assert values["width"] == "Not Found"
+    assert product.rejected_attributes == ["width"]
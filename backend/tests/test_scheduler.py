@@ -0,0 +1,97 @@
+import asyncio
+
+from app.core.scheduler import FairScheduler
+
+
+async def run_jobs(scheduler: FairScheduler, jobs: list[tuple[str, str]]) -> list[tuple[str, str]]:
+    """
+    Queue `jobs` ((user, lane) pairs) behind a held slot, then release it and
+    return the order in which the jobs got their slots.
+    """
+    order = []
+    await scheduler.acquire("blocker")
+
+    async def job(user_id: str, lane: str):
+        background = lane == "background"
+        await scheduler.acquire(user_id, background=background)
+        order.append((user_id, lane))
+        await asyncio.sleep(0)
+        scheduler.release(user_id, background)
+
+    tasks = [asyncio.create_task(job(user_id, lane)) for user_id, lane in jobs]
+    await asyncio.sleep(0)
+    scheduler.release("blocker")
+    await asyncio.gather(*tasks)
+    return order
+
+
+def test_queued_prefetches_do_not_delay_batch_work():
+    scheduler = FairScheduler(capacity=1, user_limit=1, interactive_reserved=0, weights={}, background_capacity=1)
+    jobs = [("a", "background")] * 20 + [("b", "batch")] * 5 + [("a", "batch")] * 5
+
+    order = asyncio.run(run_jobs(scheduler, jobs))
+
+    batch = [user_id for user_id, lane in order if lane == "batch"]
+    assert batch == ["b", "a"] * 5
+    assert all(lane == "background" for _, lane in order[10:])
+
+
+def test_background_lane_is_shared_fairly():
+    scheduler = FairScheduler(capacity=1, user_limit=1, interactive_reserved=0, weights={}, background_capacity=1)
+    jobs = [("a", "background")] * 4 + [("b", "background")] * 2
+
+    order = asyncio.run(run_jobs(scheduler, jobs))
+
+    assert [user_id for user_id, _ in order] == ["a", "b", "a", "b", "a", "a"]
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def scenario():
+        scheduler = FairScheduler(capacity=1, user_limit=1, interactive_reserved=0, weights={})
+        await scheduler.acquire("a")
+        waiter = asyncio.create_task(scheduler.acquire("b"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        scheduler.release("a")
+        return scheduler.get_stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["running"] == 0 and stats["queued"] == 0
+
+
+def test_prefetches_do_not_take_the_users_own_slots():
+    async def scenario():
+        scheduler = FairScheduler(
+            capacity=8, user_limit=2, interactive_reserved=0, weights={}, background_capacity=2, background_user_limit=1
+        )
+        await scheduler.acquire("a", background=True)
+        waiting_prefetch = asyncio.create_task(scheduler.acquire("a", background=True))
+        await asyncio.wait_for(asyncio.gather(scheduler.acquire("a"), scheduler.acquire("a")), 1)
+        await asyncio.sleep(0)
+        return scheduler.get_stats("a"), waiting_prefetch
+
+    stats, waiting_prefetch = asyncio.run(scenario())
+    assert stats["users"]["a"]["running"] == 2
+    assert stats["users"]["a"]["running_background"] == 1
+    assert stats["users"]["a"]["queued_background"] == 1
+
+
+def test_virtual_clock_does_not_move_back():
+    async def scenario():
+        scheduler = FairScheduler(capacity=2, user_limit=1, interactive_reserved=0, weights={})
+        # User a is at its cap, so its interactive job waits with an early tag
+        await scheduler.acquire("a")
+        interactive = asyncio.create_task(scheduler.acquire("a", interactive=True))
+        await asyncio.sleep(0)
+        # Meanwhile user b's batch jobs move the clock on
+        for _ in range(3):
+            await scheduler.acquire("b")
+            scheduler.release("b")
+        clock = scheduler.virtual_time
+        scheduler.release("a")
+        await interactive
+        return clock, scheduler.virtual_time
+
+    before, after = asyncio.run(asyncio.wait_for(scenario(), 1))
+    assert after == before
@@ -0,0 +1,96 @@
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+from fastapi.testclient import TestClient
+from moto.server import ThreadedMotoServer
+
+from app.api import app
+from app.core import storage
+from app.core.auth import get_current_user
+from app.routes import upload
+
+BUCKET = "product-images-test"
+USER = {"sub": "user-1"}
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    """
+    Local S3 stand-in (moto server) with an empty bucket.
+    """
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=0)
+    server.start()
+    host, port = server.get_host_and_port()
+    monkeypatch.setattr(storage, "S3_ENDPOINT_URL", f"http://{host}:{port}")
+    monkeypatch.setattr(storage, "S3_BUCKET", BUCKET)
+    storage.get_s3_client.cache_clear()
+    storage.get_s3_client().create_bucket(Bucket=BUCKET)
+    yield storage.get_s3_client()
+    storage.get_s3_client.cache_clear()
+    server.stop()
+
+
+@pytest.fixture
+def client():
+    app.dependency_overrides[get_current_user] = lambda: USER
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def signed_headers(url: str) -> list[str]:
+    return parse_qs(urlparse(url).query)["X-Amz-SignedHeaders"][0].split(";")
+
+
+def test_single_upload_signs_content_length(s3, client):
+    data = b"\x89PNG" + b"x" * 1020
+    response = client.post("/api/uploads/presign", json={"filename": "a.png", "content_type": "image/png", "size": len(data)})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["mode"] == "single"
+    assert "content-length" in signed_headers(body["url"])
+
+    put = requests.put(body["url"], data=data, headers=body["headers"])
+    assert put.status_code == 200
+    assert storage.get_object_bytes(body["image_ref"]) == data
+
+
+def test_multipart_upload_signs_each_part_size(s3, client, monkeypatch):
+    part_size = 5 * 1024 * 1024  # S3's minimum part size
+    monkeypatch.setattr(upload, "UPLOAD_MULTIPART_THRESHOLD", 1024)
+    monkeypatch.setattr(upload, "UPLOAD_PART_SIZE", part_size)
+    data = b"y" * (part_size + 100)
+
+    response = client.post("/api/uploads/presign", json={"filename": "b.jpg", "content_type": "image/jpeg", "size": len(data)})
+    body = response.json()
+    assert body["mode"] == "multipart"
+    assert [part["size"] for part in body["parts"]] == [part_size, 100]
+
+    uploaded = []
+    offset = 0
+    for part in body["parts"]:
+        assert "content-length" in signed_headers(part["url"])
+        put = requests.put(part["url"], data=data[offset:offset + part["size"]])
+        assert put.status_code == 200
+        uploaded.append({"part_number": part["part_number"], "etag": put.headers["ETag"]})
+        offset += part["size"]
+
+    response = client.post("/api/uploads/complete", json={"key": body["key"], "upload_id": body["upload_id"], "parts": uploaded})
+    assert response.status_code == 200
+    assert storage.get_object_bytes(body["image_ref"]) == data
+
+
+def test_declared_size_over_limit_is_rejected(s3, client, monkeypatch):
+    monkeypatch.setattr(upload, "UPLOAD_MAX_BYTES", 1000)
+    response = client.post("/api/uploads/presign", json={"filename": "c.png", "content_type": "image/png", "size": 1001})
+    assert response.status_code == 413
+
+
+def test_oversized_object_is_not_read(s3, monkeypatch):
+    # A storage server that ignores the signed Content-Length still cannot get an oversized image into enrichment
+    monkeypatch.setattr(storage, "UPLOAD_MAX_BYTES", 1000)
+    key = storage.new_object_key(USER["sub"], "d.png")
+    s3.put_object(Bucket=BUCKET, Key=key, Body=b"z" * 1001)
+
+    with pytest.raises(ValueError):
+        storage.get_object_bytes(storage.image_ref(key))
@@ -0,0 +1,157 @@
+import asyncio
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from app.routes import product
+from app.routes.ai_enrichment.AttributeEnricher import AttributeEnricher
+from app.routes.ai_enrichment.helpers.Deadline import Deadline
+from app.routes.ai_enrichment.helpers.VariantIndex import VariantIndex, variant_tokens
+
+USER = {"sub": "user-1"}
+ATTRIBUTES = {
+    "ingredients": {"type": "multiple_values"},
+    "material": {"type": "short_text"},
+    "color": {"type": "short_text"},
+}
+
+
+@pytest.mark.parametrize("first, second", [
+    (("Brand X", "Brand X Shampoo 250ml"), ("Brand X", "Brand X Shampoo 500 ml")),
+    (("Acme", "Acme T-Shirt Red XL"), ("Acme", "Acme T-Shirt Blue S")),
+    (("Acme", "Acme Batteries Pack of 4"), ("Acme", "Acme Batteries 12x")),
+])
+def test_variants_have_equal_tokens(first, second):
+    assert variant_tokens(*first) == variant_tokens(*second)
+
+
+@pytest.mark.parametrize("first, second", [
+    (
+        ("L'Oreal", "L'Oreal Paris Elvive Total Repair 5 Shampoo 400ml"),
+        ("L'Oreal", "L'Oreal Paris Elvive Total Repair 5 Conditioner 400ml"),
+    ),
+    (("Apple", "Apple iPhone 13 128GB"), ("Apple", "Apple iPhone 14 128GB")),
+    (("Brand X", "Brand X Shampoo 250ml"), ("Brand Y", "Brand X Shampoo 250ml")),
+])
+def test_near_miss_names_are_not_variants(first, second):
+    index = VariantIndex()
+    index.add("user-1", "a", *first)
+    assert index.find("user-1", *second) == []
+
+
+def test_find_is_per_user_and_excludes_the_product():
+    index = VariantIndex()
+    index.add("user-1", "a", "Brand X", "Brand X Shampoo 250ml")
+    index.add("user-2", "b", "Brand X", "Brand X Shampoo 250ml")
+
+    assert index.find("user-1", "Brand X", "Brand X Shampoo 1l") == ["a"]
+    assert index.find("user-1", "Brand X", "Brand X Shampoo 250ml", exclude="a") == []
+
+    index.remove("user-1", "a")
+    assert index.find("user-1", "Brand X", "Brand X Shampoo 1l") == []
+
+
+def test_names_of_variant_words_only_match_nothing():
+    index = VariantIndex()
+    index.add("user-1", "a", "", "Red 250ml")
+    assert index.find("user-1", "", "Blue 500ml") == []
+
+
+@pytest.fixture
+def products(monkeypatch):
+    collection = AsyncMongoMockClient()["test"]["products"]
+    monkeypatch.setattr(product, "products_collection", collection)
+    monkeypatch.setattr(product, "variant_index", VariantIndex())
+    monkeypatch.setattr(product, "variant_index_locks", {})
+    return collection
+
+
+def insert(collection, **fields):
+    document = {"user_id": USER["sub"], "brand": "L'Oreal", "attributes": ATTRIBUTES, **fields}
+    return str(asyncio.run(collection.insert_one(document)).inserted_id)
+
+
+def test_find_enriched_sibling_returns_a_variant(products):
+    sibling_id = insert(products, product_name="Elvive Shampoo 250ml", enrichment={"grounding": "found"})
+
+    sibling = asyncio.run(product.find_enriched_sibling({"brand": "L'Oreal", "product_name": "Elvive Shampoo 400ml"}, USER))
+
+    assert sibling["id"] == sibling_id
+    assert sibling["enrichment"] == {"grounding": "found"}
+
+
+def test_find_enriched_sibling_skips_near_misses_and_unenriched_products(products):
+    insert(products, product_name="Elvive Total Repair 5 Shampoo 400ml", enrichment={"grounding": "found"})
+    insert(products, product_name="Elvive Total Repair 5 Conditioner 250ml")
+
+    sibling = asyncio.run(product.find_enriched_sibling(
+        {"brand": "L'Oreal", "product_name": "Elvive Total Repair 5 Conditioner 400ml"}, USER
+    ))
+
+    assert sibling is None
+
+
+def test_find_enriched_sibling_drops_renamed_products(products):
+    sibling_id = insert(products, product_name="Elvive Shampoo 250ml", enrichment={"grounding": "found"})
+    query = {"brand": "L'Oreal", "product_name": "Elvive Shampoo 400ml"}
+    asyncio.run(product.find_enriched_sibling(query, USER))
+
+    asyncio.run(products.update_one({}, {"$set": {"product_name": "Elvive Conditioner 250ml"}}))
+
+    assert asyncio.run(product.find_enriched_sibling(query, USER)) is None
+    assert sibling_id not in product.variant_index.tokens[USER["sub"]]
+
+
+def enricher_for(sibling_attributes: dict) -> AttributeEnricher:
+    product_json = {"product_name": "Elvive Shampoo 400ml", "brand": "L'Oreal", "attributes": ATTRIBUTES}
+    sibling = {"id": "s1", "attributes": sibling_attributes, "enrichment": {"grounding": "found"}}
+    return AttributeEnricher(product_json, sibling=sibling)
+
+
+def test_reusable_values_copies_valid_invariant_values():
+    enricher = enricher_for({
+        "ingredients": {"type": "multiple_values", "value": ["Aqua ", "Aqua", "Glycerin"]},
+        "material": {"type": "short_text", "value": "Plastic"},
+        "color": {"type": "short_text", "value": "Red"},
+    })
+
+    assert enricher.reused_values == {"ingredients": ["Aqua", "Glycerin"], "material": "Plastic"}
+    assert list(enricher.model_attributes) == ["color"]
+
+
+def test_reusable_values_skips_other_definitions_and_invalid_values():
+    enricher = enricher_for({
+        "ingredients": {"type": "long_text", "value": "Aqua, Glycerin"},
+        "material": {"type": "short_text", "value": "x" * 500},
+    })
+
+    assert enricher.reused_values == {}
+
+
+class FakeEnricher:
+    def __init__(self, product_json, attributes_prompt=None, sibling=None, prefetched=None):
+        self.degraded_stages = []
+        self.grounding = "searched"
+        self.grounded_by = None
+
+    async def enrich_attributes_async(self, deadline):
+        return {"material": "Plastic"}
+
+
+def test_checkpoint_keeps_other_enrichment_fields(products, monkeypatch):
+    monkeypatch.setattr(product, "AttributeEnricher", FakeEnricher)
+    monkeypatch.setattr(product, "VARIANT_REUSE_ENABLED", True)
+
+    async def record_change(*args):
+        pass
+
+    monkeypatch.setattr(product.stats, "record_change", record_change)
+    product_id = insert(products, product_name="Elvive Shampoo 250ml", enrichment={"source": "import"})
+    product_dict = {"id": product_id, "brand": "L'Oreal", "product_name": "Elvive Shampoo 250ml", "attributes": ATTRIBUTES}
+
+    assert asyncio.run(product.enrich_product(product_dict, USER, Deadline(60), reuse_siblings=False)) is None
+
+    enrichment = asyncio.run(products.find_one({}))["enrichment"]
+    assert enrichment["source"] == "import"
+    assert enrichment["grounding"] == "searched"
+    assert "spec_hash" in enrichment and "grounded_by" not in enrichment